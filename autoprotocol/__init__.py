@@ -1,7 +1,7 @@
 from .container import Container, Well, WellGroup  # NOQA
 from .protocol import Protocol  # NOQA
 from .container_type import ContainerType  # NOQA
-from .unit import Unit  # NOQA
+from .unit import Unit, UnitArray  # NOQA
 
 
 class UserError(Exception):
@@ -1,6 +1,8 @@
 from __future__ import print_function
-from .unit import Unit
+from .unit import Unit, _volume_to_pl, _pl_to_volume
 from .util import quad_ind_to_num
+from array import array
+import bisect
 import sys
 
 if sys.version_info[0] >= 3:
@@ -14,6 +16,29 @@ if sys.version_info[0] >= 3:
 
 """
 
+
+def _volume_typecode():
+    """
+    Return the typecode of the array used for well volumes: a 64-bit
+    integer where the platform has one, as "l" is only 32 bits wide on some
+    Python 2 builds.  Doubles are used otherwise, holding volumes exactly up
+    to 2 ** 53 picoliters.
+
+    """
+    for typecode in ("q", "l"):
+        try:
+            if array(typecode).itemsize >= 8:
+                return typecode
+        except ValueError:
+            pass
+    return "d"
+
+
+_VOLUME_TYPECODE = _volume_typecode()
+
+"""Marks a well without a volume in a Container's volume array"""
+_NO_VOLUME = -2 ** 63
+
 SEAL_TYPES = ["ultra-clear", "foil"]
 COVER_TYPES = ["standard", "low_evaporation", "universal"]
 
@@ -32,18 +57,85 @@ class Well(object):
     index : integer
         The index of this well within the container.
     volume : Unit
-        Theoretical volume of this well.
+        Theoretical volume of this well.  Volumes are tracked internally as
+        integer picoliters and returned in microliters.
     properties : dict
         Additional properties of this well represented as a dictionary.
 
     """
 
+    __slots__ = ("container", "index")
+
     def __init__(self, container, index):
+        # The state of a Well is stored column-wise by its Container; a Well
+        # is a view onto one index of that storage
         self.container = container
         self.index = index
-        self.volume = None
-        self.name = None
-        self.properties = {}
+
+    @property
+    def _volume(self):
+        """Theoretical volume in integer picoliters, or None"""
+        pl = self.container._volumes[self.index]
+        return None if pl == _NO_VOLUME else int(pl)
+
+    @_volume.setter
+    def _volume(self, pl):
+        self.container._volumes[self.index] = _NO_VOLUME if pl is None else pl
+
+    @property
+    def name(self):
+        return self.container._names.get(self.index)
+
+    @name.setter
+    def name(self, name):
+        if name is None:
+            self.container._names.pop(self.index, None)
+        else:
+            self.container._names[self.index] = name
+
+    @property
+    def _properties(self):
+        """Properties of this Well, or None if they were never accessed"""
+        return self.container._properties.get(self.index)
+
+    @property
+    def properties(self):
+        # The dict returned may be modified directly, so it is re-indexed
+        # before the next property query
+        self.container._unindexed.add(self.index)
+        return self.container._properties.setdefault(self.index, {})
+
+    @properties.setter
+    def properties(self, properties):
+        self.container._properties[self.index] = properties
+        self.container._unindexed.add(self.index)
+
+    @property
+    def volume(self):
+        if self._volume is None:
+            return None
+        return _pl_to_volume(self._volume)
+
+    @volume.setter
+    def volume(self, vol):
+        self._volume = None if vol is None else _volume_to_pl(vol)
+
+    def _add_volume(self, pl):
+        """
+        Add liquid (in integer picoliters) to the theoretical volume of this
+        Well.
+
+        """
+        self._volume = (self._volume or 0) + pl
+
+    def _remove_volume(self, pl):
+        """
+        Remove liquid (in integer picoliters) from the theoretical volume of
+        this Well, if it has a volume.
+
+        """
+        if self._volume:
+            self._volume -= pl
 
     def set_properties(self, properties):
         """
@@ -58,7 +150,9 @@ class Well(object):
         """
         if not isinstance(properties, dict):
             raise TypeError("Properties is not of type 'dict'.")
-        self.properties = {key: value for key, value in properties.items()}
+        self.container._properties[self.index] = {
+            key: value for key, value in properties.items()}
+        self.container._index_properties(self.index)
         return self
 
     def add_properties(self, properties):
@@ -76,8 +170,10 @@ class Well(object):
         """
         if not isinstance(properties, dict):
             raise TypeError("Properties given is not of type 'dict'.")
+        own_properties = self.container._properties.setdefault(self.index, {})
         for key, value in properties.items():
-            self.properties[key] = value
+            own_properties[key] = value
+        self.container._index_properties(self.index)
         return self
 
     def set_volume(self, vol):
@@ -94,10 +190,8 @@ class Well(object):
             raise TypeError("Volume given is not of type str or "
                             "Unit. %s" % type(vol))
         v = Unit.fromstring(vol)
-        if v > self.container.container_type.true_max_vol_ul:
-            raise ValueError("Theoretical volume you are trying to set "
-                             "exceeds the maximum volume of this well.")
-        self.volume = v
+        self.container._check_volume(v)
+        self._volume = _volume_to_pl(v)
         return self
 
     def set_name(self, name):
@@ -150,6 +244,12 @@ class WellGroup(object):
 
     Wells in a WellGroup do not necessarily need to be in the same container.
 
+    WellGroups returned by Container methods store runs of well indices
+    rather than Well objects, so that taking a subgroup of them and
+    concatenating them does not copy or re-validate the wells.  Accessing
+    the `wells` list converts the group to a plain list of Wells, which is
+    then used from there on.
+
     Parameters
     ----------
     wells : list
@@ -158,9 +258,15 @@ class WellGroup(object):
     """
 
     def __init__(self, wells):
+        self.name = None
+        self._runs = None
         if isinstance(wells, Well):
             wells = [wells]
         elif isinstance(wells, WellGroup):
+            if wells._wells is None:
+                self._runs = list(wells._runs)
+                self._wells = None
+                return
             wells = wells.wells
         elif isinstance(wells, list):
             if not all(isinstance(well, Well) for well in wells):
@@ -168,8 +274,75 @@ class WellGroup(object):
         else:
             raise TypeError("Wells must be Well, list of wells, WellGroup.")
 
-        self.wells = wells
-        self.name = None
+        self._wells = wells
+
+    @classmethod
+    def _from_runs(cls, runs):
+        # runs is a list of (container, indices, start, stop) tuples, each
+        # representing the Wells at indices[start:stop] of container
+        group = cls.__new__(cls)
+        group.name = None
+        group._runs = runs
+        group._wells = None
+        return group
+
+    @classmethod
+    def _from_wells(cls, wells):
+        # wells is a list already known to contain only Wells
+        group = cls._from_runs(None)
+        group.wells = wells
+        return group
+
+    @classmethod
+    def _from_layout(cls, container, layout, start=0, stop=None):
+        # layout is a cached tuple of valid indices for container; the group
+        # shares it rather than copying it
+        if stop is None:
+            stop = len(layout)
+        return cls._from_runs([(container, layout, start, stop)])
+
+    @classmethod
+    def _from_indices(cls, container, indices):
+        """
+        Return a WellGroup of the Wells of `container` at `indices`,
+        validating the indices once for the whole run.
+
+        """
+        indices = tuple(indices)
+        if indices and (min(indices) < 0 or
+                        max(indices) >= container.container_type.well_count):
+            raise ValueError("Well indices %s are out of bounds for %s" %
+                             (indices, container))
+        return cls._from_runs([(container, indices, 0, len(indices))])
+
+    @property
+    def wells(self):
+        """list(Well): the Wells in this WellGroup"""
+        if self._wells is None:
+            wells = []
+            for container, indices, start, stop in self._runs:
+                wells.extend(container._wells.select(indices[start:stop]))
+            self._wells = wells
+            self._runs = None
+        return self._wells
+
+    @wells.setter
+    def wells(self, wells):
+        self._wells = wells
+        self._runs = None
+
+    def _iter_runs(self):
+        """
+        Yield (container, indices) for each run of wells from one container,
+        where indices is a sequence of well indices.
+
+        """
+        if self._wells is None:
+            for container, indices, start, stop in self._runs:
+                yield container, indices[start:stop]
+        else:
+            for w in self._wells:
+                yield w.container, (w.index,)
 
     def set_properties(self, properties):
         """
@@ -199,8 +372,18 @@ class WellGroup(object):
         """
         if not isinstance(vol, (Unit, basestring)):
             raise TypeError("Volume given is not of type Unit or 'str'.")
-        for w in self.wells:
-            w.set_volume(vol)
+        v = Unit.fromstring(vol)
+        indices = {}
+        for container, run in self._iter_runs():
+            indices.setdefault(container, []).extend(run)
+        for container in indices:
+            container._check_volume(v)
+        pl = _volume_to_pl(v)
+        for container, container_indices in indices.items():
+            if len(set(container_indices)) == len(container._volumes):
+                # Whole plate
+                container_indices = None
+            container._set_volumes(container_indices, pl)
         return self
 
     def indices(self):
@@ -210,13 +393,16 @@ class WellGroup(object):
 
         """
         indices = []
-        for w in self.wells:
-            assert w.container == self.wells[0].container, (
+        container = None
+        for run_container, run in self._iter_runs():
+            if container is None:
+                container = run_container
+            assert run_container == container, (
                 "All wells in WellGroup must belong to the same container to "
                 "get their indices.")
-            indices.append(w.humanize())
+            indices.extend(run)
 
-        return indices
+        return container.humanize(indices) if indices else []
 
     def append(self, other):
         """
@@ -276,11 +462,18 @@ class WellGroup(object):
         """
         assert type(prop) is str, "property is not a string: %r" % prop
         assert type(val) is None or str, "value is not a string: %r" % val
-        if val:
-            return WellGroup([w for w in self.wells if prop in w.properties and
-                             w.properties[prop] is val])
-        else:
-            return WellGroup([w for w in self.wells if prop in w.properties])
+        wells = []
+        for container, run in self._iter_runs():
+            # Look up the wells with the property in the container's index
+            # rather than checking the properties of each Well
+            indices = container._indices_with(prop)
+            if not indices:
+                continue
+            properties = container._properties
+            for i in run:
+                if i in indices and (not val or properties[i][prop] is val):
+                    wells.append(container._wells[i])
+        return WellGroup._from_wells(wells)
 
     def pop(self, index=-1):
         """
@@ -330,22 +523,114 @@ class WellGroup(object):
 
     def __getitem__(self, key):
         """
-        Return a specific Well from a WellGroup.
+        Return a specific Well from a WellGroup, or a list of the Wells in a
+        slice of it.
 
         Parameters
         ----------
-        key : int
+        key : int, slice
             Position in a WellGroup in robotized form.
 
         """
+        if isinstance(key, slice):
+            if self._wells is not None:
+                return self._wells[key]
+            return list(self.subgroup(key.start, key.stop, key.step))
+        if self._wells is None:
+            if key < 0:
+                key += len(self)
+                if key < 0:
+                    raise IndexError("WellGroup index out of range")
+            for container, indices, start, stop in self._runs:
+                if key < stop - start:
+                    return container._wells[indices[start + key]]
+                key -= stop - start
+            raise IndexError("WellGroup index out of range")
         return self.wells[key]
 
+    def subgroup(self, start=None, stop=None, step=None):
+        """
+        Return a WellGroup of the Wells in a slice of this WellGroup.
+
+        Unlike slicing with ``[]``, which returns a list of Wells, the
+        WellGroup returned by a group from a Container method refers to the
+        well indices of this group rather than copying them, and neither
+        group creates Well objects for the wells that are not accessed.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            plate.all_wells().subgroup(0, 12)
+            # WellGroup of the first row of a 96-well plate
+
+        Parameters
+        ----------
+        start, stop, step : int, optional
+            Slice of the WellGroup, as for ``wells[start:stop:step]``.
+
+        Returns
+        -------
+        WellGroup
+            The Wells in the slice.
+
+        """
+        key = slice(start, stop, step)
+        if self._wells is not None:
+            return WellGroup._from_wells(self._wells[key])
+        first, last, step = key.indices(len(self))
+        runs = []
+        if step == 1:
+            # Trim the runs to the slice without copying their indices
+            offset = 0
+            for container, indices, start, stop in self._runs:
+                length = stop - start
+                lo = max(first - offset, 0)
+                hi = min(last - offset, length)
+                if lo < hi:
+                    runs.append((container, indices, start + lo, start + hi))
+                offset += length
+            return WellGroup._from_runs(runs)
+        # Look up the well index at each position of the slice, grouping
+        # consecutive wells of the same container into one run
+        offsets = []
+        offset = 0
+        for _, _, start, stop in self._runs:
+            offsets.append(offset)
+            offset += stop - start
+        container = None
+        run = []
+        for position in xrange(first, last, step):
+            k = bisect.bisect_right(offsets, position) - 1
+            run_container, indices, start, _ = self._runs[k]
+            if run_container is not container:
+                if run:
+                    runs.append((container, tuple(run), 0, len(run)))
+                container = run_container
+                run = []
+            run.append(indices[start + position - offsets[k]])
+        if run:
+            runs.append((container, tuple(run), 0, len(run)))
+        return WellGroup._from_runs(runs)
+
+    def __iter__(self):
+        """
+        Iterate over the Wells in a WellGroup.
+
+        """
+        if self._wells is not None:
+            return iter(self._wells)
+        return (container._wells[i] for container, run in self._iter_runs()
+                for i in run)
+
     def __len__(self):
         """
         Return the number of Wells in a WellGroup.
 
         """
-        return len(self.wells)
+        if self._wells is None:
+            return sum(stop - start for _, _, start, stop in self._runs)
+        return len(self._wells)
 
     def __repr__(self):
         """
@@ -367,9 +652,127 @@ class WellGroup(object):
             raise TypeError("You can only add a Well or WellGroups "
                             "together.")
         if isinstance(other, Well):
-            return WellGroup(self.wells + [other])
-        else:
-            return WellGroup(self.wells + other.wells)
+            other = WellGroup._from_runs(
+                [(other.container, (other.index,), 0, 1)])
+        if self._wells is None and other._wells is None:
+            return WellGroup._from_runs(self._runs + other._runs)
+        return WellGroup._from_wells(self.wells + other.wells)
+
+
+def _all_wells_layout(well_count, col_count, columnwise):
+    if not columnwise:
+        return xrange(well_count)
+    num_rows = well_count // col_count
+    return (row * col_count + col
+            for col in xrange(col_count)
+            for row in xrange(num_rows))
+
+
+def _inner_wells_layout(well_count, col_count, columnwise):
+    num_rows = well_count // col_count
+    if columnwise:
+        return (row * col_count + col
+                for col in xrange(1, col_count - 1)
+                for row in xrange(1, num_rows - 1))
+    return (row * col_count + col
+            for row in xrange(1, num_rows - 1)
+            for col in xrange(1, col_count - 1))
+
+
+def _quadrant_layout(well_count, col_count, quad):
+    # Every other well of every other row of a 384-well plate, starting
+    # from A1, A2, B1 or B2
+    start_well = [0, 1, 24, 25][quad]
+    return (row_offset + col_offset
+            for row_offset in xrange(start_well, 384, 48)
+            for col_offset in xrange(0, 24, 2))
+
+
+_LAYOUT_BUILDERS = {
+    "all": _all_wells_layout,
+    "inner": _inner_wells_layout,
+    "quadrant": _quadrant_layout
+}
+
+"""Tuples of well indices keyed by (well_count, col_count, layout, option),
+shared by every Container with that geometry"""
+_LAYOUTS = {}
+
+
+def _layout(container_type, kind, option):
+    """
+    Return the tuple of well indices making up a layout of `kind` ("all",
+    "inner" or "quadrant") for the geometry of `container_type`, building
+    it the first time it is used.
+
+    """
+    well_count = container_type.well_count
+    col_count = container_type.col_count
+    key = (well_count, col_count, kind, option)
+    layout = _LAYOUTS.get(key)
+    if layout is None:
+        layout = tuple(
+            _LAYOUT_BUILDERS[kind](well_count, col_count, option))
+        _LAYOUTS[key] = layout
+    return layout
+
+
+class _WellList(object):
+    """
+    Read-only sequence of the Wells of a Container which only constructs a
+    Well the first time its index is accessed.
+
+    """
+
+    __slots__ = ("_container", "_wells")
+
+    def __init__(self, container, well_count):
+        self._container = container
+        self._wells = [None] * well_count
+
+    def _well(self, index):
+        well = self._wells[index]
+        if well is None:
+            if index < 0:
+                index += len(self._wells)
+            well = self._wells[index] = Well(self._container, index)
+        return well
+
+    def select(self, indices):
+        """
+        Return a list of the Wells at the (non-negative) indices given,
+        constructing any which have not been accessed yet.
+
+        """
+        wells = self._wells
+        container = self._container
+        selected = []
+        for i in indices:
+            well = wells[i]
+            if well is None:
+                well = wells[i] = Well(container, i)
+            selected.append(well)
+        return selected
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.select(xrange(*key.indices(len(self._wells))))
+        return self._well(key)
+
+    def __len__(self):
+        return len(self._wells)
+
+    def __iter__(self):
+        return iter(self.select(xrange(len(self._wells))))
+
+    def materialized(self):
+        """
+        Return the Wells which have been constructed so far, in index order.
+        Wells which have never been accessed have no volume, name or
+        properties.
+
+        """
+        return [w for w in self._wells if w is not None]
 
 
 class Container(object):
@@ -404,12 +807,108 @@ class Container(object):
         self.container_type = container_type
         self.storage = storage
         self.cover = cover
-        self._wells = [Well(self, idx)
-                       for idx in xrange(container_type.well_count)]
+        self._well_list = None
+        # Well state is stored column-wise: volumes in integer picoliters
+        # (_NO_VOLUME for wells without one) and sparse maps of well index
+        # to name and to properties
+        self._volumes = array(_VOLUME_TYPECODE,
+                              [_NO_VOLUME]) * container_type.well_count
+        self._names = {}
+        self._properties = {}
+        # Inverted index of property key to the indices of wells with that
+        # property, the keys each well is indexed under, and the wells whose
+        # properties may have changed without being re-indexed
+        self._property_index = {}
+        self._indexed_keys = {}
+        self._unindexed = set()
         if self.cover and not (self.is_covered() or self.is_sealed()):
             raise AttributeError("%s is not a valid seal or cover "
                                  "type." % cover)
 
+    @property
+    def _wells(self):
+        if self._well_list is None:
+            self._well_list = _WellList(self, self.container_type.well_count)
+        return self._well_list
+
+    def _check_volume(self, volume):
+        """
+        Raise a ValueError if `volume` exceeds the maximum volume of the
+        wells of this Container.
+
+        """
+        if volume > self.container_type.true_max_vol_ul:
+            raise ValueError("Theoretical volume you are trying to set "
+                             "exceeds the maximum volume of this well.")
+
+    def _set_volumes(self, indices, pl):
+        """
+        Set the theoretical volume of the wells at `indices` (or of every
+        well if `indices` is None) to `pl` picoliters.
+
+        """
+        if indices is None:
+            self._volumes = array(_VOLUME_TYPECODE,
+                                  [pl]) * self.container_type.well_count
+            return
+        volumes = self._volumes
+        for i in indices:
+            volumes[i] = pl
+
+    def _add_volumes(self, indices, pl):
+        """
+        Add `pl` picoliters to the theoretical volume of the wells at
+        `indices`.  Wells without a volume are set to `pl`.
+
+        """
+        volumes = self._volumes
+        for i in indices:
+            current = volumes[i]
+            volumes[i] = pl if current == _NO_VOLUME else current + pl
+
+    def _index_properties(self, index):
+        """
+        Update the property index for the well at `index` from its current
+        properties.
+
+        """
+        self._unindexed.discard(index)
+        property_index = self._property_index
+        for key in self._indexed_keys.pop(index, ()):
+            indexed = property_index[key]
+            indexed.discard(index)
+            if not indexed:
+                del property_index[key]
+        properties = self._properties.get(index)
+        if properties:
+            keys = tuple(properties)
+            self._indexed_keys[index] = keys
+            for key in keys:
+                property_index.setdefault(key, set()).add(index)
+
+    def _refresh_property_index(self):
+        for index in list(self._unindexed):
+            self._index_properties(index)
+
+    def _indices_with(self, prop):
+        """
+        Return the set of indices of wells which have the property `prop`.
+
+        """
+        self._refresh_property_index()
+        return self._property_index.get(prop, frozenset())
+
+    def _annotated_indices(self):
+        """
+        Return the sorted indices of wells which have a name or non-empty
+        properties.
+
+        """
+        self._refresh_property_index()
+        indices = set(self._names)
+        indices.update(self._indexed_keys)
+        return sorted(indices)
+
     def well(self, i):
         """
         Return a Well object representing the well at the index specified of
@@ -473,8 +972,11 @@ class Container(object):
             if not isinstance(w, (basestring, int, list)):
                 raise TypeError("Well reference given is not of type"
                                 " 'int', 'str' or 'list'.")
+            if isinstance(w, list):
+                raise TypeError("Well reference given is not of type 'int' "
+                                "or 'str'.")
 
-        return WellGroup([self.well(w) for w in wells])
+        return WellGroup._from_indices(self, self.robotize_many(wells))
 
     def robotize(self, well_ref):
         """
@@ -490,6 +992,19 @@ class Container(object):
                             "'int', 'Well' or 'list'.")
         return self.container_type.robotize(well_ref)
 
+    def robotize_many(self, well_refs):
+        """
+        Return the integer representations of a list of well references,
+        based on the ContainerType of the Container.
+
+        Uses the robotize_many function from the ContainerType class. Refer
+        to `ContainerType.robotize_many()` for more information.
+
+        """
+        if not isinstance(well_refs, list):
+            raise TypeError("Well references given are not of type 'list'.")
+        return self.container_type.robotize_many(well_refs)
+
     def humanize(self, well_ref):
         """
         Return the human readable representation of the integer well index
@@ -529,14 +1044,8 @@ class Container(object):
             well index).
 
         """
-        if columnwise:
-            num_cols = self.container_type.col_count
-            num_rows = self.container_type.well_count // num_cols
-            return WellGroup([self._wells[row * num_cols + col]
-                              for col in xrange(num_cols)
-                              for row in xrange(num_rows)])
-        else:
-            return WellGroup(self._wells)
+        return WellGroup._from_layout(
+            self, _layout(self.container_type, "all", bool(columnwise)))
 
     def inner_wells(self, columnwise=False):
         """
@@ -550,22 +1059,8 @@ class Container(object):
             well index).
 
         """
-        num_cols = self.container_type.col_count
-        num_rows = self.container_type.row_count()
-        inner_wells = []
-        if columnwise:
-            for c in xrange(1, num_cols - 1):
-                wells = []
-                for r in xrange(1, num_rows - 1):
-                    wells.append((r * num_cols) + c)
-                inner_wells.extend(wells)
-        else:
-            well = num_cols
-            for i in xrange(1, num_rows - 1):
-                inner_wells.extend(xrange(well + 1, well + (num_cols - 1)))
-                well += num_cols
-        inner_wells = [self._wells[x] for x in inner_wells]
-        return WellGroup(inner_wells)
+        return WellGroup._from_layout(
+            self, _layout(self.container_type, "inner", bool(columnwise)))
 
     def wells_from(self, start, num, columnwise=False):
         """
@@ -593,11 +1088,14 @@ class Container(object):
             raise TypeError("Number of wells given is not of type 'int'.")
 
         start = self.robotize(start)
+        layout = _layout(self.container_type, "all", bool(columnwise))
         if columnwise:
             row, col = self.decompose(start)
             num_rows = self.container_type.row_count()
             start = col * num_rows + row
-        return WellGroup(self.all_wells(columnwise).wells[start:start + num])
+        start = min(start, len(layout))
+        stop = max(start, min(start + num, len(layout)))
+        return WellGroup._from_layout(self, layout, start, stop)
 
     def is_sealed(self):
         """
@@ -638,7 +1136,7 @@ class Container(object):
 
         if n_wells == 96:
             if quad == 0:
-                return WellGroup(self._wells)
+                return self.all_wells()
             else:
                 raise ValueError(
                     "0 or 'A1' is the only valid quadrant for a 96-well "
@@ -648,14 +1146,8 @@ class Container(object):
             raise ValueError("Invalid quadrant {} for plate type {}".format(
                 quad, str(self.name)))
 
-        start_well = [0, 1, 24, 25]
-        wells = []
-
-        for row_offset in xrange(start_well[quad], 384, 48):
-            for col_offset in xrange(0, 24, 2):
-                wells.append(row_offset + col_offset)
-
-        return self.wells(wells)
+        return WellGroup._from_layout(
+            self, _layout(self.container_type, "quadrant", quad))
 
     def set_storage(self, storage):
         """
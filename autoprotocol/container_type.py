@@ -1,6 +1,10 @@
 import re
 import sys
 from collections import namedtuple
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
 from .container import Well
 from .unit import Unit
 
@@ -16,6 +20,51 @@ if sys.version_info[0] >= 3:
 """
 
 
+"""Well name lookup tables keyed by (well_count, col_count): a list of well
+names by index and a dict of well index by name"""
+_WELL_NAME_TABLES = {}
+
+"""Width in millimeters of the twelve 9 mm columns of an SBS 96-well plate"""
+_SBS_GRID_WIDTH_MM = 108.0
+
+
+def _row_label(row):
+    """
+    Return the letters labelling a zero-indexed row: A-Z, then AA, AB, ...
+    for plates with more than 26 rows (e.g. 1536-well plates).
+
+    """
+    label = ""
+    row += 1
+    while row:
+        row, remainder = divmod(row - 1, 26)
+        label = chr(ord("A") + remainder) + label
+    return label
+
+
+def _row_number(label):
+    """
+    Return the zero-indexed row labelled by `label`, the inverse of
+    _row_label.
+
+    """
+    row = 0
+    for letter in label.upper():
+        row = row * 26 + ord(letter) - ord("A") + 1
+    return row - 1
+
+
+def _well_name_tables(well_count, col_count):
+    key = (well_count, col_count)
+    tables = _WELL_NAME_TABLES.get(key)
+    if tables is None:
+        names = [_row_label(idx // col_count) + str(idx % col_count + 1)
+                 for idx in xrange(well_count)]
+        indices = {name: idx for idx, name in enumerate(names)}
+        tables = _WELL_NAME_TABLES[key] = (names, indices)
+    return tables
+
+
 class ContainerType(namedtuple("ContainerType",
                                ["name", "is_tube", "well_count",
                                 "well_depth_mm", "well_volume_ul",
@@ -138,7 +187,14 @@ class ContainerType(namedtuple("ContainerType",
 
         """
         if isinstance(well_ref, list):
-            return [self.robotize(well) for well in well_ref]
+            return self.robotize_many(well_ref)
+
+        if type(well_ref) is int and 0 <= well_ref < self.well_count:
+            return well_ref
+        if isinstance(well_ref, basestring):
+            well_num = self._well_indices().get(well_ref.upper())
+            if well_num is not None:
+                return well_num
 
         if not isinstance(well_ref, (basestring, int, Well)):
             raise TypeError("ContainerType.robotize(): Well reference (%s) "
@@ -148,9 +204,9 @@ class ContainerType(namedtuple("ContainerType",
         if isinstance(well_ref, Well):
             well_ref = well_ref.index
         well_ref = str(well_ref)
-        m = re.match(r"([a-z])(\d+)$", well_ref, re.I)
+        m = re.match(r"([a-z]+)(\d+)$", well_ref, re.I)
         if m:
-            row = ord(m.group(1).upper()) - ord('A')
+            row = _row_number(m.group(1))
             col = int(m.group(2)) - 1
             well_num = row * self.col_count + col
             # Check bounds
@@ -174,6 +230,62 @@ class ContainerType(namedtuple("ContainerType",
                 raise ValueError("ContainerType.robotize(): Well must be in "
                                  "'A1' format or be an integer.")
 
+    def robotize_many(self, well_refs):
+        """
+        Robotize a list of well references in one call.  Well names and
+        in-range integer indices are resolved through a lookup table; any
+        other reference is robotized individually.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            >>> p = Protocol()
+            >>> my_plate = p.ref("my_plate", cont_type="96-flat", discard=True)
+            >>> my_plate.container_type.robotize_many(["A1", "b2", 95])
+            [0, 13, 95]
+
+        Parameters
+        ----------
+        well_refs : list[str or int or Well]
+            Well references to be robotized.
+
+        Returns
+        -------
+        list[int]
+            Rowwise integer well indices, in the order given.
+
+        Raises
+        ------
+        TypeError
+            If a well reference given is not an accepted type.
+        ValueError
+            If a well reference given exceeds container dimensions.
+
+        """
+        indices = self._well_indices()
+        well_count = self.well_count
+        robotized = []
+        for well_ref in well_refs:
+            if type(well_ref) is int and 0 <= well_ref < well_count:
+                robotized.append(well_ref)
+                continue
+            well_num = None
+            if isinstance(well_ref, basestring):
+                well_num = indices.get(well_ref.upper())
+            if well_num is None:
+                well_num = self.robotize(well_ref)
+            robotized.append(well_num)
+        return robotized
+
+    def _well_names(self):
+        """list[str]: well names indexed by well number"""
+        return _well_name_tables(self.well_count, self.col_count)[0]
+
+    def _well_indices(self):
+        """dict: well numbers keyed by upper-case well name"""
+        return _well_name_tables(self.well_count, self.col_count)[1]
+
     def humanize(self, well_ref):
         """
         Return the human readable form of a well index based on the well
@@ -215,6 +327,9 @@ class ContainerType(namedtuple("ContainerType",
         if isinstance(well_ref, list):
             return [self.humanize(well) for well in well_ref]
 
+        if type(well_ref) is int and 0 <= well_ref < self.well_count:
+            return self._well_names()[well_ref]
+
         if not isinstance(well_ref, (int, basestring)):
             raise TypeError("ContainerType.humanize(): Well reference given "
                             "is not of type 'int' or 'str'.")
@@ -227,8 +342,7 @@ class ContainerType(namedtuple("ContainerType",
         if well_ref >= self.well_count or well_ref < 0:
             raise ValueError("ContainerType.humanize(): Well reference "
                              "given exceeds container dimensions.")
-        row, col = self.decompose(well_ref)
-        return "ABCDEFGHIJKLMNOPQRSTUVWXYZ"[row] + str(col + 1)
+        return self._well_names()[well_ref]
 
     def decompose(self, idx):
         """
@@ -259,8 +373,83 @@ class ContainerType(namedtuple("ContainerType",
         """
         return self.well_count // self.col_count
 
+    def well_coordinates(self, idx):
+        """
+        Return the approximate (x, y) position in millimeters of the center
+        of a well, relative to the center of well A1.
+
+        Wells are laid out on the ANSI/SLAS (SBS) grid, with the columns of
+        the plate spread over the width of a 96-well plate.  This gives the
+        standard 9, 4.5 and 2.25 mm well pitch of 96, 384 and 1536-well
+        plates.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            from autoprotocol.container_type import _CONTAINER_TYPES
+
+            _CONTAINER_TYPES["96-flat"].well_coordinates("B3")
+            # (18.0, 9.0)
+
+        Parameters
+        ----------
+        idx : str, int, Well
+            Well index in either human-readable or integer form.
+
+        Returns
+        -------
+        tuple
+            x and y offsets of the well from well A1, in millimeters.
+
+        """
+        row, col = self.decompose(idx)
+        pitch = _SBS_GRID_WIDTH_MM / self.col_count
+        return (col * pitch, row * pitch)
+
+
+class _LazyContainerTypes(MutableMapping):
+    """
+    Mapping of shortname to ContainerType which is only populated the first
+    time it is accessed, so that importing autoprotocol does not construct
+    Units (and with them the UnitRegistry).  Container types can be
+    registered by assigning into it, as with a dict.
+
+    Parameters
+    ----------
+    load : callable
+        Function returning the ContainerTypes to start from, keyed by
+        shortname.
+
+    """
+
+    def __init__(self, load):
+        self._load_types = load
+        self._types = None
+
+    def _load(self):
+        if self._types is None:
+            self._types = self._load_types()
+        return self._types
+
+    def __getitem__(self, shortname):
+        return self._load()[shortname]
+
+    def __setitem__(self, shortname, container_type):
+        self._load()[shortname] = container_type
+
+    def __delitem__(self, shortname):
+        del self._load()[shortname]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
 
-_CONTAINER_TYPES = {
+# The table is built on first access, see _LazyContainerTypes
+_CONTAINER_TYPES = _LazyContainerTypes(lambda: {
     "384-flat": ContainerType(
         name="384-well UV flat-bottom plate",
         well_count=384,
@@ -886,4 +1075,4 @@ _CONTAINER_TYPES = {
         vendor="Greiner",
         cat_no="655077"
     ),
-}
+})
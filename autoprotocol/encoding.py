@@ -0,0 +1,567 @@
+import codecs
+import io
+import json
+import os
+import re
+import struct
+import sys
+from importlib import import_module
+
+if sys.version_info[0] >= 3:
+    basestring = str
+    unicode = str
+    long = int
+
+"""
+    :copyright: 2017 by The Autoprotocol Development Team, see AUTHORS
+        for more details.
+    :license: BSD, see LICENSE for more details
+
+"""
+
+#: Environment variable naming the JSON backend used when none is passed
+JSON_BACKEND_ENV = "AUTOPROTOCOL_JSON_BACKEND"
+
+#: Backends in the order "auto" tries them, stdlib json is always available
+JSON_BACKENDS = ("orjson", "ujson", "json")
+
+_MODULES = {}
+
+
+def _backend_module(name):
+    # Optional encoders are imported on first use, None if not installed
+    if name not in _MODULES:
+        try:
+            _MODULES[name] = import_module(name)
+        except ImportError:
+            _MODULES[name] = None
+    return _MODULES[name]
+
+
+def resolve_backend(backend=None):
+    """
+    Resolve the name of the JSON backend to encode with.
+
+    Parameters
+    ----------
+    backend : str, optional
+        One of "json", "orjson", "ujson" or "auto". Defaults to the value of
+        the ``AUTOPROTOCOL_JSON_BACKEND`` environment variable, or "json" if
+        it is not set.
+
+    Returns
+    -------
+    str
+        Name of an importable backend. "auto" picks the first installed
+        backend of orjson and ujson, and a backend which is not installed
+        falls back to the stdlib "json".
+
+    Raises
+    ------
+    ValueError
+        If backend is not a known backend name
+
+    """
+    if backend is None:
+        backend = os.environ.get(JSON_BACKEND_ENV) or "json"
+    if backend == "auto":
+        candidates = JSON_BACKENDS
+    elif backend in JSON_BACKENDS:
+        candidates = (backend, "json")
+    else:
+        raise ValueError("Unknown JSON backend '%s', must be one of %s or "
+                         "'auto'." % (backend, ", ".join(JSON_BACKENDS)))
+    return next(b for b in candidates if _backend_module(b) is not None)
+
+
+class _Encoder(object):
+    # Mirrors the parts of json.JSONEncoder used by Protocol.iterencode()
+    def __init__(self, encode, item_separator, key_separator):
+        self.encode = encode
+        self.item_separator = item_separator
+        self.key_separator = key_separator
+
+
+def get_encoder(indent=2, backend=None):
+    """
+    Get an encoder for the given indentation and JSON backend.
+
+    The stdlib backend returns a `json.JSONEncoder`, so its output is
+    exactly that of ``json.dumps(obj, indent=indent)``, except that compact
+    output (indent None) uses the ``","`` and ``":"`` separators like the
+    other backends. Other backends produce the same document up to
+    whitespace, escaping of non-ASCII characters and float formatting, i.e.
+    their output is equal once decoded.
+
+    Parameters
+    ----------
+    indent : int or str, optional
+        Indentation, None for compact output. orjson only supports an
+        indent of 2 and ujson only integer indents, other indents fall back
+        to stdlib json.
+    backend : str, optional
+        JSON backend, see `resolve_backend`.
+
+    Returns
+    -------
+    object
+        Encoder with an ``encode(obj)`` method returning str, and the
+        ``item_separator`` and ``key_separator`` it uses.
+
+    """
+    backend = resolve_backend(backend)
+    item_separator = ","
+    key_separator = ": " if indent is not None else ":"
+    if backend == "orjson" and indent in (None, 2):
+        orjson = _backend_module("orjson")
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+
+        def encode(obj):
+            return orjson.dumps(obj, option=option).decode("utf-8")
+
+        return _Encoder(encode, item_separator, key_separator)
+    if backend == "ujson" and (indent is None or isinstance(indent, int)):
+        ujson = _backend_module("ujson")
+
+        def encode(obj):
+            return ujson.dumps(obj, indent=indent or 0,
+                               escape_forward_slashes=False)
+
+        return _Encoder(encode, item_separator, key_separator)
+    if indent is None:
+        return json.JSONEncoder(separators=(item_separator, key_separator))
+    return json.JSONEncoder(indent=indent)
+
+
+def dumps(obj, indent=2, backend=None):
+    """
+    Serialize obj to a JSON formatted str with the selected backend.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        from autoprotocol.encoding import dumps
+
+        dumps(p.as_dict(), indent=None, backend="auto")
+
+    Parameters
+    ----------
+    obj : dict or list
+        JSON serializable object
+    indent : int, optional
+        Indentation, None for compact output.
+    backend : str, optional
+        JSON backend, see `resolve_backend`.
+
+    Returns
+    -------
+    str
+        JSON document
+
+    """
+    return get_encoder(indent, backend).encode(obj)
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _StreamReader(object):
+    # Buffered reader handing out JSON values from a file, reading more of
+    # the file only when the buffer does not hold a complete value
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = u""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        self.utf8 = None
+
+    def fill(self, size):
+        chunk = self.fp.read(size)
+        if not isinstance(chunk, type(u"")):
+            # Binary files are decoded incrementally so that multi-byte
+            # characters may straddle reads
+            if self.utf8 is None:
+                self.utf8 = codecs.getincrementaldecoder("utf-8")()
+            chunk = self.utf8.decode(chunk, final=not chunk)
+        if not chunk:
+            self.eof = True
+        # Drops everything consumed so far from the buffer
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self.fill(self.chunk_size)
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError("Expecting one of '%s', found '%s'" %
+                             (chars, char))
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A value ending with the buffer may be a truncated number
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except ValueError:
+                if self.eof:
+                    raise
+            # Grows the read size so that large values are parsed in a
+            # bounded number of attempts
+            self.fill(size)
+            size *= 2
+
+
+def iterload(fp, stream_keys=("instructions",), chunk_size=65536):
+    """
+    Incrementally decode the members of a JSON object from a file.
+
+    Only the member currently being decoded is held in memory, and the
+    arrays named in `stream_keys` are decoded one element at a time.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        from autoprotocol.encoding import iterload
+
+        with open("protocol.json") as f:
+            ops = [inst["op"] for key, inst in iterload(f)
+                   if key == "instructions"]
+
+    Parameters
+    ----------
+    fp : file-like or str
+        Text or binary file containing a JSON object, or the JSON document
+        itself.
+    stream_keys : tuple of str, optional
+        Keys of array members whose elements are yielded individually.
+    chunk_size : int, optional
+        Number of characters read from `fp` at a time.
+
+    Yields
+    ------
+    tuple
+        (key, value) for each member of the object, in document order, and
+        (key, element) for each element of a streamed array.
+
+    Raises
+    ------
+    ValueError
+        If the document is not a valid JSON object
+
+    """
+    if isinstance(fp, basestring):
+        fp = io.StringIO(fp)
+    reader = _StreamReader(fp, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.value()
+            if not isinstance(key, basestring):
+                raise ValueError("Expecting a property name, found %r" % key)
+            reader.expect(":")
+            if key in stream_keys and reader.peek() == "[":
+                reader.pos += 1
+                if reader.peek() == "]":
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield key, reader.value()
+                        if reader.expect(",]") == "]":
+                            break
+            else:
+                yield key, reader.value()
+            if reader.expect(",}") == "}":
+                break
+    if reader.peek():
+        raise ValueError("Extra data after the JSON object")
+
+
+# CBOR (RFC 8949) major types and the tags of the stringref extension
+# (http://cbor.schmorp.de/stringref) used to intern repeated strings
+_CBOR_UINT, _CBOR_NEGINT, _CBOR_BYTES, _CBOR_TEXT = 0, 1, 2, 3
+_CBOR_ARRAY, _CBOR_MAP, _CBOR_TAG, _CBOR_SIMPLE = 4, 5, 6, 7
+_CBOR_STRINGREF = 25
+_CBOR_STRINGREF_NAMESPACE = 256
+
+
+def _cbor_head(major, n):
+    # Initial byte and argument of a data item, in the shortest form
+    if n < 24:
+        return struct.pack(">B", major << 5 | n)
+    elif n < 0x100:
+        return struct.pack(">BB", major << 5 | 24, n)
+    elif n < 0x10000:
+        return struct.pack(">BH", major << 5 | 25, n)
+    elif n < 0x100000000:
+        return struct.pack(">BI", major << 5 | 26, n)
+    elif n < 0x10000000000000000:
+        return struct.pack(">BQ", major << 5 | 27, n)
+    raise ValueError("Integer %d is too large for CBOR" % n)
+
+
+def _stringref_min_length(index):
+    # Strings shorter than a reference to them are never interned
+    if index < 24:
+        return 3
+    elif index < 0x100:
+        return 4
+    elif index < 0x10000:
+        return 5
+    elif index < 0x100000000:
+        return 7
+    return 11
+
+
+def cbor_dumps(obj):
+    """
+    Serialize a JSON compatible object to CBOR.
+
+    Strings repeated within the document, such as the "ref/index" of
+    wells, unit strings and dict keys, are written once and referenced
+    afterwards following the CBOR stringref extension. Floats are written
+    in single precision when that is exact, so the document decodes to the
+    same JSON.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        from autoprotocol.encoding import cbor_dumps, cbor_loads
+
+        data = cbor_dumps(p.as_dict())
+        assert cbor_loads(data) == p.as_dict()
+
+    Parameters
+    ----------
+    obj : dict or list
+        JSON serializable object, with str dict keys
+
+    Returns
+    -------
+    bytes
+        CBOR document
+
+    Raises
+    ------
+    TypeError
+        If obj contains a value which is not JSON serializable
+
+    """
+    out = bytearray(_cbor_head(_CBOR_TAG, _CBOR_STRINGREF_NAMESPACE))
+    strings = {}
+
+    def encode(obj):
+        if isinstance(obj, basestring):
+            ref = strings.get(obj)
+            if ref is not None:
+                out.extend(ref)
+                return
+            data = obj.encode("utf-8") if isinstance(obj, unicode) else obj
+            if len(data) >= _stringref_min_length(len(strings)):
+                strings[obj] = (_cbor_head(_CBOR_TAG, _CBOR_STRINGREF) +
+                                _cbor_head(_CBOR_UINT, len(strings)))
+            out.extend(_cbor_head(_CBOR_TEXT, len(data)))
+            out.extend(data)
+        elif isinstance(obj, dict):
+            out.extend(_cbor_head(_CBOR_MAP, len(obj)))
+            for k, v in obj.items():
+                if not isinstance(k, basestring):
+                    raise TypeError("CBOR dict keys must be str, not %s" %
+                                    type(k).__name__)
+                encode(k)
+                encode(v)
+        elif isinstance(obj, (list, tuple)):
+            out.extend(_cbor_head(_CBOR_ARRAY, len(obj)))
+            for item in obj:
+                encode(item)
+        elif obj is None:
+            out.append(0xf6)
+        elif obj is True:
+            out.append(0xf5)
+        elif obj is False:
+            out.append(0xf4)
+        elif isinstance(obj, (int, long)):
+            if obj >= 0:
+                out.extend(_cbor_head(_CBOR_UINT, obj))
+            else:
+                out.extend(_cbor_head(_CBOR_NEGINT, -1 - obj))
+        elif isinstance(obj, float):
+            try:
+                single = struct.pack(">f", obj)
+                exact = struct.unpack(">f", single)[0] == obj
+            except OverflowError:
+                exact = False
+            if exact:
+                out.append(0xfa)
+                out.extend(single)
+            else:
+                out.append(0xfb)
+                out.extend(struct.pack(">d", obj))
+        else:
+            raise TypeError("Object of type %s is not CBOR serializable" %
+                            type(obj).__name__)
+
+    encode(obj)
+    return bytes(out)
+
+
+def _half_to_float(bits):
+    # IEEE 754 half precision, decoded by hand as struct lacks "e" on py2
+    exponent = bits >> 10 & 0x1f
+    mantissa = bits & 0x3ff
+    if exponent == 0:
+        value = mantissa * 2.0 ** -24
+    elif exponent == 0x1f:
+        value = float("nan") if mantissa else float("inf")
+    else:
+        value = (mantissa + 1024) * 2.0 ** (exponent - 25)
+    return -value if bits & 0x8000 else value
+
+
+class _CBORDecoder(object):
+
+    def __init__(self, data):
+        self.data = bytearray(data)
+        self.pos = 0
+        # Stack of string tables, one per stringref namespace
+        self.namespaces = []
+
+    def argument(self, info):
+        data = self.data
+        pos = self.pos
+        if info < 24:
+            return info
+        elif info == 24:
+            self.pos = pos + 1
+            return data[pos]
+        elif info == 25:
+            self.pos = pos + 2
+            return struct.unpack_from(">H", data, pos)[0]
+        elif info == 26:
+            self.pos = pos + 4
+            return struct.unpack_from(">I", data, pos)[0]
+        elif info == 27:
+            self.pos = pos + 8
+            return struct.unpack_from(">Q", data, pos)[0]
+        raise ValueError("Unsupported CBOR additional information %d at "
+                         "position %d" % (info, pos - 1))
+
+    def string(self, length, text):
+        end = self.pos + length
+        if end > len(self.data):
+            raise ValueError("Truncated CBOR string at position %d" %
+                             self.pos)
+        data = bytes(self.data[self.pos:end])
+        self.pos = end
+        value = data.decode("utf-8") if text else data
+        if self.namespaces:
+            strings = self.namespaces[-1]
+            if length >= _stringref_min_length(len(strings)):
+                strings.append(value)
+        return value
+
+    def decode(self):
+        if self.pos >= len(self.data):
+            raise ValueError("Truncated CBOR document")
+        initial = self.data[self.pos]
+        self.pos += 1
+        major = initial >> 5
+        info = initial & 0x1f
+        if major == _CBOR_SIMPLE:
+            if info == 20:
+                return False
+            elif info == 21:
+                return True
+            elif info == 22:
+                return None
+            elif info == 25:
+                return _half_to_float(self.argument(info))
+            elif info == 26:
+                self.pos += 4
+                return struct.unpack_from(">f", self.data, self.pos - 4)[0]
+            elif info == 27:
+                self.pos += 8
+                return struct.unpack_from(">d", self.data, self.pos - 8)[0]
+            raise ValueError("Unsupported CBOR simple value %d at position "
+                             "%d" % (info, self.pos - 1))
+        n = self.argument(info)
+        if major == _CBOR_UINT:
+            return n
+        elif major == _CBOR_NEGINT:
+            return -1 - n
+        elif major == _CBOR_TEXT:
+            return self.string(n, True)
+        elif major == _CBOR_BYTES:
+            return self.string(n, False)
+        elif major == _CBOR_ARRAY:
+            return [self.decode() for _ in range(n)]
+        elif major == _CBOR_MAP:
+            result = {}
+            for _ in range(n):
+                key = self.decode()
+                result[key] = self.decode()
+            return result
+        elif n == _CBOR_STRINGREF:
+            index = self.decode()
+            try:
+                return self.namespaces[-1][index]
+            except (IndexError, TypeError):
+                raise ValueError("Invalid CBOR stringref %r" % (index,))
+        elif n == _CBOR_STRINGREF_NAMESPACE:
+            self.namespaces.append([])
+            try:
+                return self.decode()
+            finally:
+                self.namespaces.pop()
+        raise ValueError("Unsupported CBOR tag %d" % n)
+
+
+def cbor_loads(data):
+    """
+    Deserialize a CBOR document written by `cbor_dumps`.
+
+    Parameters
+    ----------
+    data : bytes
+        CBOR document
+
+    Returns
+    -------
+    dict or list
+        Decoded object, equal to the object passed to `cbor_dumps`
+
+    Raises
+    ------
+    ValueError
+        If data is not a complete CBOR document or uses CBOR features
+        other than those written by `cbor_dumps`
+
+    """
+    decoder = _CBORDecoder(data)
+    try:
+        obj = decoder.decode()
+    except (struct.error, IndexError):
+        raise ValueError("Truncated CBOR document")
+    if decoder.pos != len(decoder.data):
+        raise ValueError("Extra data after the CBOR document")
+    return obj
@@ -2,11 +2,14 @@ from __future__ import print_function
 import json
 import io
 from .protocol import Protocol
+from .encoding import dumps
 from .unit import Unit, UnitError
 from .container import WellGroup, SEAL_TYPES, COVER_TYPES  # NOQA
 from . import UserError
 import argparse
 import sys
+import zlib
+from contextlib import contextmanager
 
 if sys.version_info[0] >= 3:
     string_type = str
@@ -373,7 +376,8 @@ class Manifest(object):
                                "associated manifest.json file." % name)
 
 
-def run(fn, protocol_name=None, seal_after_run=True):
+def run(fn, protocol_name=None, seal_after_run=True, json_backend=None,
+        compact=False):
     """
     Run the protocol specified by the function.
 
@@ -391,6 +395,20 @@ def run(fn, protocol_name=None, seal_after_run=True):
     seal_after_run : bool, optional
         Implicitly add a seal/cover to all stored refs within the protocol
         using seal_on_store()
+    json_backend : str, optional
+        JSON backend used to encode the output, one of "json", "orjson",
+        "ujson" or "auto". Defaults to the ``AUTOPROTOCOL_JSON_BACKEND``
+        environment variable, or the stdlib json module if it is not set.
+    compact : bool, optional
+        Print the output without indentation, as with the --compact option
+
+    The output is printed to stdout unless the --output option names a file,
+    and is compressed while it is written with the --compress option.
+
+    .. code-block:: none
+
+        python my_protocol.py config.json --compress gzip --output out.json.gz
+
     """
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -401,7 +419,21 @@ def run(fn, protocol_name=None, seal_after_run=True):
         help=("Execute protocol by pre-filling preview aliquots with OrangeG "
               "dye, and provisioning water only."),
         action="store_true")
+    parser.add_argument(
+        '--output',
+        help="Write the protocol to this file instead of stdout")
+    parser.add_argument(
+        '--compress',
+        help="Compress the output as it is written",
+        choices=sorted(_COMPRESSORS))
+    parser.add_argument(
+        '--compact',
+        help="Write the protocol without indentation",
+        action="store_true")
     args = parser.parse_args()
+    if args.compress == "zstd" and _zstd_module() is None:
+        parser.error("--compress zstd requires the zstandard package")
+    indent = None if compact or args.compact else 2
 
     source = json.loads(io.open(args.config, encoding='utf-8').read())
     protocol = Protocol()
@@ -428,17 +460,89 @@ def run(fn, protocol_name=None, seal_after_run=True):
             _convert_dispense_instructions(protocol, num_dye_steps,
                                            len(protocol.instructions) - 1)
     except UserError as e:
-        print(json.dumps({
-            'errors': [
-                {
-                    'message': e.message,
-                    'info': e.info
-                }
-            ]
-        }, indent=2))
+        with _output(args.output, args.compress) as out:
+            out.write(dumps({
+                'errors': [
+                    {
+                        'message': e.message,
+                        'info': e.info
+                    }
+                ]
+            }, indent=indent, backend=json_backend))
+            out.write("\n")
         return
 
-    print(json.dumps(protocol.as_dict(), indent=2))
+    with _output(args.output, args.compress) as out:
+        protocol.dump(out, indent=indent, backend=json_backend)
+        out.write("\n")
+
+
+def _zstd_module():
+    # zstandard is optional and only needed for --compress zstd
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def _gzip_compressor():
+    # A wbits offset of 16 makes zlib write the gzip header and trailer
+    return zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def _zstd_compressor():
+    return _zstd_module().ZstdCompressor().compressobj()
+
+
+_COMPRESSORS = {
+    "gzip": _gzip_compressor,
+    "zstd": _zstd_compressor
+}
+
+
+class _OutputWriter(object):
+    """
+    Text file-like object encoding what is written to it as UTF-8 and
+    passing it through a compressor, if any, to a binary stream
+    """
+
+    def __init__(self, raw, compressor=None):
+        self.raw = raw
+        self.compressor = compressor
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+        if data:
+            self.raw.write(data)
+
+    def finish(self):
+        if self.compressor is not None:
+            self.raw.write(self.compressor.flush())
+        self.raw.flush()
+
+
+@contextmanager
+def _output(path=None, compress=None):
+    """
+    Open the destination of harness output, yielding an object to write
+    text to
+    """
+    compressor = _COMPRESSORS[compress]() if compress else None
+    if path is not None:
+        with io.open(path, "wb") as raw:
+            writer = _OutputWriter(raw, compressor)
+            yield writer
+            writer.finish()
+    elif compressor is not None:
+        writer = _OutputWriter(getattr(sys.stdout, "buffer", sys.stdout),
+                               compressor)
+        yield writer
+        writer.finish()
+    else:
+        yield sys.stdout
 
 
 def _add_dye_to_preview_refs(protocol, rs=_DYE_TEST_RS["dye4000"]):
@@ -456,10 +560,11 @@ def _add_dye_to_preview_refs(protocol, rs=_DYE_TEST_RS["dye4000"]):
                                "defined container id. Please resubmit using "
                                "only new containers.")
 
-        # Add dye to each well
-        for well in ref_cont.all_wells():
-            current_vol = well.volume
-            if current_vol and current_vol > Unit(0, "microliter"):
+        # Add dye to each well with a volume
+        for idx, pl in enumerate(ref_cont._volumes):
+            if pl > 0:
+                well = ref_cont._wells[idx]
+                current_vol = well.volume
                 protocol.provision(rs, well, current_vol)
                 well.set_volume(current_vol)
 
@@ -1,6 +1,6 @@
-import json
+from .encoding import dumps
 from .pipette_tools import assign
-from .container import Well
+from .container import Well, WellGroup
 from functools import reduce
 
 
@@ -15,18 +15,111 @@ from functools import reduce
 class Instruction(object):
     """Base class for an instruction that is to later be encoded as JSON.
 
+    A Protocol caches the serialized form of the instructions it builds.
+    Their data is held in lists and dicts that report any edit made to
+    them, so that editing ``data``, or the lists and dicts nested in it,
+    always refreshes the cached form.  Adding a list, dict or WellGroup
+    that was not part of the instruction, or replacing ``data`` itself,
+    stops the instruction from being cached, since later edits to that
+    value could not be detected.
+
     """
 
+    # Bumped whenever the instruction is modified after construction so that
+    # a Protocol can tell when its cached serialization is stale
+    _version = 0
+    # Bumped whenever any instruction is modified
+    _edits = 0
+    # True once the data holds only lists and dicts reporting their edits,
+    # see _seal()
+    _sealed = False
+
     def __init__(self, data):
         super(Instruction, self).__init__()
         self.data = data
         self.__dict__.update(data)
 
-    def json(self):
+    @property
+    def data(self):
+        """dict: the Autoprotocol fields of this instruction"""
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._sealed = False
+        self._mutated()
+
+    def _mutated(self):
+        """Invalidate any serialized form cached for this instruction.
+
+        """
+        self._version += 1
+        Instruction._edits += 1
+
+    def _seal(self):
+        """Replace the lists and dicts of data by copies reporting their
+        edits, so that a Protocol can cache the serialized form of this
+        instruction.  Only for instructions built by a Protocol, whose data
+        nothing else refers to.  Data holding a WellGroup, whose edits
+        cannot be detected, is left as is.
+
+        """
+        data = _tracked(self._data, self)
+        if data is not None:
+            self._data = data
+            self.__dict__.update(data)
+            self._sealed = True
+
+    def _track(self, value):
+        """Return value ready to be added to the data of this instruction,
+        copied into lists and dicts reporting their edits if it is sealed.
+
+        """
+        if self._sealed:
+            tracked = _tracked(value, self)
+            if tracked is not None:
+                return tracked
+        return value
+
+    def _unseal(self):
+        self._sealed = False
+        self._mutated()
+
+    @property
+    def _cacheable(self):
+        # Copies of an instruction share or copy data tracked by the
+        # original, so their edits are not reported to them
+        data = self._data
+        return (self._sealed and type(data) is _TrackedDict and
+                data._owner is self)
+
+    @classmethod
+    def _from_data(cls, data):
+        """Construct the Instruction subclass for data["op"] around data.
+
+        The subclass constructor is bypassed, data is used as is.
+
+        """
+        instruction_type = _INSTRUCTION_TYPES.get(data.get("op"), cls)
+        instruction = instruction_type.__new__(instruction_type)
+        Instruction.__init__(instruction, data)
+        return instruction
+
+    def json(self, indent=2, backend=None):
         """Return instruction object properly encoded as JSON for Autoprotocol.
 
+        Parameters
+        ----------
+        indent : int, optional
+            Indentation, None for compact output.
+        backend : str, optional
+            JSON backend, one of "json", "orjson", "ujson" or "auto". Defaults
+            to the ``AUTOPROTOCOL_JSON_BACKEND`` environment variable, or the
+            stdlib json module if it is not set.
+
         """
-        return json.dumps(self.data, indent=2)
+        return dumps(self.data, indent=indent, backend=backend)
 
 
 class Pipette(Instruction):
@@ -1236,3 +1329,198 @@ class MeasureVolume(Instruction):
                      "object": wells,
                      "dataref": dataref}
         super(MeasureVolume, self).__init__(json_dict)
+
+
+# Instruction subclass for each Autoprotocol "op", used when loading
+# instructions from JSON
+_INSTRUCTION_TYPES = {
+    "pipette": Pipette,
+    "magnetic_transfer": MagneticTransfer,
+    "dispense": Dispense,
+    "acoustic_transfer": AcousticTransfer,
+    "spin": Spin,
+    "thermocycle": Thermocycle,
+    "incubate": Incubate,
+    "illumina_sequence": IlluminaSeq,
+    "sanger_sequence": SangerSeq,
+    "gel_separate": GelSeparate,
+    "gel_purify": GelPurify,
+    "absorbance": Absorbance,
+    "fluorescence": Fluorescence,
+    "luminescence": Luminescence,
+    "seal": Seal,
+    "unseal": Unseal,
+    "cover": Cover,
+    "uncover": Uncover,
+    "flow_analyze": FlowAnalyze,
+    "oligosynthesize": Oligosynthesize,
+    "spread": Spread,
+    "autopick": Autopick,
+    "image_plate": ImagePlate,
+    "provision": Provision,
+    "flash_freeze": FlashFreeze,
+    "stamp": Stamp,
+    "measure_concentration": MeasureConcentration,
+    "measure_mass": MeasureMass,
+    "measure_volume": MeasureVolume
+}
+
+
+def _check_tracked(owner, value):
+    # A list, dict or WellGroup added to the data of a sealed instruction
+    # must already report its edits to that instruction
+    if (isinstance(value, (list, dict, WellGroup)) and
+            getattr(value, "_owner", None) is not owner):
+        owner._unseal()
+
+
+def _tracked(value, owner):
+    # Copy of value with its lists and dicts reporting edits to owner, or
+    # None if value holds a WellGroup
+    try:
+        return _track_value(value, owner)
+    except _Untrackable:
+        return None
+
+
+class _Untrackable(Exception):
+    pass
+
+
+def _track_value(value, owner):
+    if type(value) is dict or type(value) is _TrackedDict:
+        tracked = _TrackedDict()
+        for k, v in value.items():
+            dict.__setitem__(tracked, k, _track_value(v, owner))
+    elif type(value) is list or type(value) is _TrackedList:
+        tracked = _TrackedList()
+        for v in value:
+            list.append(tracked, _track_value(v, owner))
+    elif isinstance(value, WellGroup):
+        raise _Untrackable()
+    else:
+        return value
+    tracked._owner = owner
+    return tracked
+
+
+class _TrackedList(list):
+    """List in the data of a sealed Instruction, reporting edits to it"""
+
+    __slots__ = ("_owner",)
+
+    def __reduce_ex__(self, protocol):
+        # Copies are plain lists, which are not tracked
+        return list, (list(self),)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            value = list(value)
+            for item in value:
+                _check_tracked(self._owner, item)
+        else:
+            _check_tracked(self._owner, value)
+        list.__setitem__(self, key, value)
+        self._owner._mutated()
+
+    def __delitem__(self, key):
+        list.__delitem__(self, key)
+        self._owner._mutated()
+
+    def __setslice__(self, i, j, value):
+        self.__setitem__(slice(i, j), value)
+
+    def __delslice__(self, i, j):
+        self.__delitem__(slice(i, j))
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, n):
+        list.__imul__(self, n)
+        self._owner._mutated()
+        return self
+
+    def append(self, value):
+        _check_tracked(self._owner, value)
+        list.append(self, value)
+        self._owner._mutated()
+
+    def extend(self, values):
+        values = list(values)
+        for value in values:
+            _check_tracked(self._owner, value)
+        list.extend(self, values)
+        self._owner._mutated()
+
+    def insert(self, i, value):
+        _check_tracked(self._owner, value)
+        list.insert(self, i, value)
+        self._owner._mutated()
+
+    def pop(self, *args):
+        value = list.pop(self, *args)
+        self._owner._mutated()
+        return value
+
+    def remove(self, value):
+        list.remove(self, value)
+        self._owner._mutated()
+
+    def reverse(self):
+        list.reverse(self)
+        self._owner._mutated()
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self._owner._mutated()
+
+    def clear(self):
+        del self[:]
+
+
+class _TrackedDict(dict):
+    """Dict in the data of a sealed Instruction, reporting edits to it"""
+
+    __slots__ = ("_owner",)
+
+    def __reduce_ex__(self, protocol):
+        # Copies are plain dicts, which are not tracked
+        return dict, (dict(self),)
+
+    def __setitem__(self, key, value):
+        _check_tracked(self._owner, value)
+        dict.__setitem__(self, key, value)
+        self._owner._mutated()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._owner._mutated()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, *args):
+        value = dict.pop(self, *args)
+        self._owner._mutated()
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self._owner._mutated()
+        return item
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        dict.clear(self)
+        self._owner._mutated()
@@ -0,0 +1,629 @@
+import bisect
+import math
+from collections import namedtuple
+from .container import Well
+from .unit import Unit
+
+"""
+    :copyright: 2017 by The Autoprotocol Development Team, see AUTHORS
+        for more details.
+    :license: BSD, see LICENSE for more details
+
+"""
+
+#: Estimated travel in millimeters for moving between two containers, whose
+#: positions on the deck are only known once the run is scheduled
+CONTAINER_SWITCH_MM = 150.0
+
+#: Policies for choosing the next source well of a fill, see SourceAllocator
+FILL_POLICIES = ("first_fit", "best_fit", "least_sources")
+
+#: Volume in microliters held by a tip whose tip_type is not listed in
+#: TIP_CAPACITIES_UL
+DEFAULT_TIP_CAPACITY_UL = 900
+
+#: Built-in volume in microliters held by a tip of each tip_type.  No tip
+#: type is listed, as tip types are defined by the liquid handler running
+#: the protocol.  This table is not meant to be changed: set the capacity
+#: of a tip type with Protocol.set_tip_capacity(), or give a transfer its
+#: own tip_capacity
+TIP_CAPACITIES_UL = {}
+
+# Stands in for every well, read by all groups and written by groups whose
+# wells cannot be determined, so that those are never reordered
+_ANY_WELL = object()
+
+
+class TravelReport(namedtuple("TravelReport",
+                              ["groups", "reordered", "travel_before_mm",
+                               "travel_after_mm", "switches_before",
+                               "switches_after"])):
+    """
+    Estimated liquid handler motion before and after reordering pipette
+    groups.
+
+    Parameters
+    ----------
+    groups : int
+        Number of pipette groups considered.
+    reordered : int
+        Number of groups that changed position.
+    travel_before_mm, travel_after_mm : float
+        Estimated travel between wells, in millimeters, in the original and
+        the new order.
+    switches_before, switches_after : int
+        Number of moves between different containers in the original and
+        the new order.
+
+    """
+    __slots__ = ()
+
+    @property
+    def saved_mm(self):
+        """Estimated travel saved by the new order, in millimeters."""
+        return self.travel_before_mm - self.travel_after_mm
+
+    def __add__(self, other):
+        return TravelReport(*[a + b for a, b in zip(self, other)])
+
+
+def _well_key(well):
+    if isinstance(well, Well):
+        return (well.container, well.index)
+    return well
+
+
+def group_wells(group):
+    """
+    Return the wells read and written by a pipette group and the wells it
+    visits, in order.
+
+    Wells are returned as (container, index) pairs.  Source wells are read
+    and destination and mixed wells are written.  A source aspirated by a
+    tip that may already hold other liquid is written as well: the sources
+    of a distribute or consolidate with carryover, and every source of a
+    transfer group after the first, since the group reuses one tip.  A
+    group of an unknown kind writes every well.
+
+    Parameters
+    ----------
+    group : dict
+        A transfer, distribute, consolidate or mix group of a pipette
+        instruction.
+
+    Returns
+    -------
+    tuple
+        Lists of the wells read, written and visited.
+
+    """
+    reads = [_ANY_WELL]
+    writes = []
+    path = []
+    for kind, body in group.items():
+        if kind.startswith("x_"):
+            continue
+        if kind == "transfer":
+            for step, xfer in enumerate(body):
+                source = _well_key(xfer["from"])
+                dest = _well_key(xfer["to"])
+                if step:
+                    writes.append(source)
+                else:
+                    reads.append(source)
+                writes.append(dest)
+                path.extend((source, dest))
+        elif kind == "distribute":
+            source = _well_key(body["from"])
+            path.append(source)
+            if body.get("allow_carryover"):
+                writes.append(source)
+            else:
+                reads.append(source)
+            for target in body["to"]:
+                dest = _well_key(target["well"])
+                writes.append(dest)
+                path.append(dest)
+        elif kind == "consolidate":
+            carryover = body.get("allow_carryover")
+            for source in body["from"]:
+                source = _well_key(source["well"])
+                if carryover:
+                    writes.append(source)
+                else:
+                    reads.append(source)
+                path.append(source)
+            dest = _well_key(body["to"])
+            writes.append(dest)
+            path.append(dest)
+        elif kind == "mix":
+            for mix in body:
+                well = _well_key(mix["well"])
+                writes.append(well)
+                path.append(well)
+        else:
+            writes.append(_ANY_WELL)
+    return reads, writes, path
+
+
+def tip_capacity(tip_type=None):
+    """
+    Return the default volume held by a tip of the given type, used by
+    Protocol.transfer() and Protocol.transfer_many() when neither the
+    transfer nor the Protocol gives a capacity for the tip type, see
+    Protocol.tip_capacity().
+
+    Example Usage:
+
+    .. code-block:: python
+
+        from autoprotocol import planning
+
+        planning.tip_capacity()
+        # Unit(900, 'microliter')
+
+    Parameters
+    ----------
+    tip_type : str, optional
+        Type of tip, as passed to Protocol.transfer().
+
+    Returns
+    -------
+    Unit
+        Tip capacity in microliters.
+
+    """
+    return Unit(TIP_CAPACITIES_UL.get(tip_type, DEFAULT_TIP_CAPACITY_UL),
+                "microliter")
+
+
+def split_volume(volume_pl, capacity_pl):
+    """
+    Split a volume into the tip loads that move it: a number of full loads
+    followed by one load of the remaining volume.
+
+    Parameters
+    ----------
+    volume_pl : int
+        Volume to move, in picoliters.
+    capacity_pl : int
+        Volume held by the tip, in picoliters.
+
+    Returns
+    -------
+    tuple
+        The number of full loads and the volume of the last load, in
+        picoliters.  The last load is never empty unless volume_pl is, so a
+        volume of exactly n tips is n - 1 full loads and a full last load.
+
+    Raises
+    ------
+    ValueError
+        If capacity_pl is not positive.
+
+    """
+    if capacity_pl <= 0:
+        raise ValueError("Tip capacity must be positive.")
+    if volume_pl <= capacity_pl:
+        return 0, volume_pl
+    full, remainder = divmod(volume_pl, capacity_pl)
+    if not remainder:
+        return full - 1, capacity_pl
+    return full, remainder
+
+
+class SourceAllocator(object):
+    """
+    Choose the source well for each of a sequence of volumes drawn from a
+    group of wells all containing the same substance.
+
+    The current source is used while it holds enough liquid.  When it
+    does not, the next source is chosen according to the policy:
+
+    first_fit
+        the first well, in the order given, holding enough liquid
+    best_fit
+        the well holding the least liquid that is still enough, keeping
+        fuller wells for larger volumes
+    least_sources
+        the well holding the most liquid, so that fewer switches, and
+        fewer distribute groups, are needed
+
+    Each choice takes logarithmic time in the number of sources.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        allocator = SourceAllocator([100, 500, 300], "least_sources")
+        allocator.allocate(50)
+        # 1
+
+    Parameters
+    ----------
+    volumes : list of int
+        Volume of each source, in picoliters, or None if the volume of the
+        source is unknown.
+    policy : str, optional
+        One of FILL_POLICIES.
+
+    Raises
+    ------
+    ValueError
+        If policy is not one of FILL_POLICIES.
+
+    """
+
+    def __init__(self, volumes, policy="first_fit"):
+        if policy not in FILL_POLICIES:
+            raise ValueError("Fill policy must be one of %s, not %r." %
+                             (", ".join(FILL_POLICIES), policy))
+        self.policy = policy
+        self.current = None
+        self._volumes = list(volumes)
+        if policy == "first_fit":
+            # Segment tree of the largest volume available in each range of
+            # sources, -1 for sources in use or without a volume
+            size = 1
+            while size < len(self._volumes):
+                size *= 2
+            self._size = size
+            self._tree = [-1] * (2 * size)
+            for i, vol in enumerate(self._volumes):
+                self._tree[size + i] = -1 if vol is None else vol
+            for node in range(size - 1, 0, -1):
+                self._tree[node] = max(self._tree[2 * node],
+                                       self._tree[2 * node + 1])
+        else:
+            # Available sources sorted by volume, ties going to the first
+            # source given
+            self._sorted = sorted(self._key(i)
+                                  for i, vol in enumerate(self._volumes)
+                                  if vol is not None)
+
+    def _key(self, i):
+        if self.policy == "best_fit":
+            return (self._volumes[i], i)
+        return (self._volumes[i], -i)
+
+    def _set_leaf(self, i, vol):
+        node = self._size + i
+        self._tree[node] = vol
+        node //= 2
+        while node:
+            self._tree[node] = max(self._tree[2 * node],
+                                   self._tree[2 * node + 1])
+            node //= 2
+
+    def _release(self, i):
+        if self.policy == "first_fit":
+            self._set_leaf(i, self._volumes[i])
+        else:
+            bisect.insort(self._sorted, self._key(i))
+
+    def _claim(self, pl):
+        if self.policy == "first_fit":
+            if self._tree[1] < pl:
+                return None
+            node = 1
+            while node < self._size:
+                node *= 2
+                if self._tree[node] < pl:
+                    node += 1
+            i = node - self._size
+            self._set_leaf(i, -1)
+            return i
+        if self.policy == "best_fit":
+            k = bisect.bisect_left(self._sorted, (pl, -1))
+            if k == len(self._sorted):
+                return None
+        else:
+            k = len(self._sorted) - 1
+            if k < 0 or self._sorted[k][0] < pl:
+                return None
+        return abs(self._sorted.pop(k)[1])
+
+    def allocate(self, pl):
+        """
+        Draw a volume from the current source, or from a new source if the
+        current one does not hold enough.
+
+        Parameters
+        ----------
+        pl : int
+            Volume to draw, in picoliters.
+
+        Returns
+        -------
+        int
+            Index of the source drawn from, or None if no source holds
+            enough liquid.
+
+        """
+        current = self.current
+        if current is None or self._volumes[current] < pl:
+            if current is not None:
+                self._release(current)
+            current = self.current = self._claim(pl)
+            if current is None:
+                return None
+        self._volumes[current] -= pl
+        return current
+
+    def add(self, i, pl):
+        """
+        Record liquid added to a source, for sources that are also filled.
+
+        Parameters
+        ----------
+        i : int
+            Index of the source.
+        pl : int
+            Volume added, in picoliters.
+
+        """
+        if i != self.current:
+            if self.policy == "first_fit":
+                self._volumes[i] = (self._volumes[i] or 0) + pl
+                self._set_leaf(i, self._volumes[i])
+                return
+            if self._volumes[i] is not None:
+                self._sorted.remove(self._key(i))
+            self._volumes[i] = (self._volumes[i] or 0) + pl
+            bisect.insort(self._sorted, self._key(i))
+        else:
+            self._volumes[i] += pl
+
+
+class PoolPlan(namedtuple("PoolPlan",
+                          ["direct", "sources", "dests", "volumes"])):
+    """
+    Transfer steps drawing the volume of each destination well from a
+    group of source wells all containing the same substance.
+
+    Parameters
+    ----------
+    direct : bool
+        True if each destination is filled from the source well at the same
+        position, with the volume requested.
+    sources, dests : list of int
+        Index of the source and destination well of each step.
+    volumes : list of int
+        Volume of each step, in picoliters.
+
+    """
+    __slots__ = ()
+
+
+def pool_sources(source_pl, dest_pl, step_pl=1):
+    """
+    Plan the transfer steps moving the volume requested by each destination
+    well out of a group of source wells all containing the same substance.
+
+    If there are at least as many sources as destinations and each source
+    holds more than its corresponding destination requests, destinations
+    are filled one to one.  Otherwise the sources are drawn from in order,
+    each until it no longer holds more than the volume still needed, when
+    whatever it holds, rounded down to a multiple of step_pl, is drawn and
+    the next source is used.  This takes time proportional to the number
+    of sources and destinations.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        plan = pool_sources([30000, 50000], [20000, 20000, 20000])
+        list(plan.sources), list(plan.dests), list(plan.volumes)
+        # [0, 0, 1, 1], [0, 1, 1, 2], [20000, 10000, 10000, 20000]
+
+    Parameters
+    ----------
+    source_pl : list of int
+        Volume of each source well, in picoliters.
+    dest_pl : list of int
+        Volume requested by each destination well, in picoliters, each a
+        multiple of step_pl.
+    step_pl : int, optional
+        Smallest volume that can be moved, such as the droplet size of an
+        acoustic liquid handler, in picoliters.
+
+    Returns
+    -------
+    PoolPlan
+        The transfer steps, in order.
+
+    Raises
+    ------
+    ValueError
+        If a source has no volume.
+    RuntimeError
+        If the sources do not hold enough volume for every destination.
+
+    """
+    if any(vol is None for vol in source_pl):
+        raise ValueError("Each source well must have a volume.")
+    count = len(dest_pl)
+    if len(source_pl) >= count and all(
+            src > dst for src, dst in zip(source_pl, dest_pl)):
+        indices = list(range(count))
+        return PoolPlan(True, indices, indices, list(dest_pl))
+    if sum(dest_pl) > sum(source_pl):
+        raise RuntimeError("There is not enough volume in the source well(s) "
+                           "specified to complete the transfers.")
+
+    # Destination volumes are multiples of step_pl, so the part of each
+    # source that can be drawn is known up front
+    if step_pl > 1:
+        usable = [vol - vol % step_pl for vol in source_pl]
+    else:
+        usable = source_pl
+    sources = []
+    dests = []
+    volumes = []
+    i = 0
+    vol = usable[0] if usable else 0
+    for j, need in enumerate(dest_pl):
+        while need > 0:
+            if i == len(usable):
+                raise RuntimeError("There is not enough volume in the "
+                                   "source well(s) specified to complete "
+                                   "the transfers.")
+            sources.append(i)
+            dests.append(j)
+            if vol > need:
+                volumes.append(need)
+                vol -= need
+                need = 0
+            else:
+                volumes.append(vol)
+                need -= vol
+                i += 1
+                if i < len(usable):
+                    vol = usable[i]
+    return PoolPlan(False, sources, dests, volumes)
+
+
+def _dependencies(wells):
+    # Group j follows group i if i writes a well j reads or writes, or reads
+    # a well j writes
+    last_writer = {}
+    readers = {}
+    preds = []
+    for j, (reads, writes, _) in enumerate(wells):
+        deps = set()
+        for well in reads:
+            if well in last_writer:
+                deps.add(last_writer[well])
+        for well in writes:
+            if well in last_writer:
+                deps.add(last_writer[well])
+            deps.update(readers.get(well, ()))
+        deps.discard(j)
+        for well in writes:
+            last_writer[well] = j
+            readers[well] = []
+        for well in reads:
+            if well not in writes:
+                readers.setdefault(well, []).append(j)
+        preds.append(deps)
+    return preds
+
+
+class _Travel(object):
+    """Travel cost model between wells given as (container, index) pairs"""
+
+    def __init__(self, switch_mm=CONTAINER_SWITCH_MM):
+        self.switch_mm = switch_mm
+        self._coordinates = {}
+
+    def position(self, well):
+        position = self._coordinates.get(well)
+        if position is None:
+            if isinstance(well, tuple):
+                container, index = well
+                position = (container, container.container_type.
+                            well_coordinates(index))
+            else:
+                position = (well, (0.0, 0.0))
+            self._coordinates[well] = position
+        return position
+
+    def cost(self, start, end):
+        if start is None or end is None:
+            return 0.0, 0
+        a, (ax, ay) = self.position(start)
+        b, (bx, by) = self.position(end)
+        if a is not b:
+            return self.switch_mm, 1
+        return math.hypot(bx - ax, by - ay), 0
+
+    def path(self, paths, order):
+        travel = 0.0
+        switches = 0
+        last = None
+        for i in order:
+            for well in paths[i]:
+                mm, switch = self.cost(last, well)
+                travel += mm
+                switches += switch
+                last = well
+        return travel, switches
+
+
+def plan_group_order(groups, window=256, switch_mm=CONTAINER_SWITCH_MM):
+    """
+    Order pipette groups to reduce liquid handler travel without changing
+    the result of the instruction.
+
+    Groups are scheduled greedily: the next group is the one starting
+    closest to where the previous group ended, among the groups whose
+    read-after-write, write-after-read and write-after-write dependencies
+    on shared wells are already scheduled.  Ties keep the original order,
+    as does a schedule that would not reduce the estimated travel.
+    Moving within a container costs the distance between the wells and
+    moving to another container costs switch_mm.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        order, report = plan_group_order(p.instructions[-1].groups)
+        print("%.0f mm saved" % report.saved_mm)
+
+    Parameters
+    ----------
+    groups : list of dict
+        Groups of a pipette instruction.
+    window : int, optional
+        Number of ready groups, earliest first, considered for each step,
+        bounding planning time for large instructions.
+    switch_mm : float, optional
+        Estimated travel between two containers, in millimeters.
+
+    Returns
+    -------
+    tuple
+        The new order as a list of indices into groups, and a TravelReport.
+
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1.")
+    wells = [group_wells(group) for group in groups]
+    paths = [path for _, _, path in wells]
+    preds = _dependencies(wells)
+    waiting = [len(deps) for deps in preds]
+    succs = [[] for _ in groups]
+    for j, deps in enumerate(preds):
+        for i in deps:
+            succs[i].append(j)
+
+    travel = _Travel(switch_mm)
+    ready = [j for j, count in enumerate(waiting) if not count]
+    order = []
+    last = None
+    while ready:
+        best = 0
+        if last is not None:
+            best_mm = None
+            for k in range(min(window, len(ready))):
+                path = paths[ready[k]]
+                mm = travel.cost(last, path[0])[0] if path else 0.0
+                if best_mm is None or mm < best_mm:
+                    best, best_mm = k, mm
+        i = ready.pop(best)
+        order.append(i)
+        if paths[i]:
+            last = paths[i][-1]
+        for j in succs[i]:
+            waiting[j] -= 1
+            if not waiting[j]:
+                bisect.insort(ready, j)
+
+    before = travel.path(paths, range(len(groups)))
+    after = travel.path(paths, order)
+    if after[0] >= before[0]:
+        order = list(range(len(groups)))
+        after = before
+    reordered = sum(1 for k, i in enumerate(order) if k != i)
+    return order, TravelReport(len(groups), reordered, before[0], after[0],
+                               before[1], after[1])
@@ -1,7 +1,14 @@
-from .container import Container, Well, WellGroup, SEAL_TYPES, COVER_TYPES
+from .container import Container, Well, WellGroup, SEAL_TYPES, COVER_TYPES, \
+    _NO_VOLUME
 from .container_type import ContainerType, _CONTAINER_TYPES
-from .unit import Unit, UnitError
+from .unit import Unit, UnitArray, UnitError, _volume_to_pl, _pl_to_volume, \
+    _exact_pl
+from .encoding import get_encoder, iterload, cbor_dumps, cbor_loads
+from .planning import plan_group_order, TravelReport, CONTAINER_SWITCH_MM, \
+    tip_capacity as tip_type_capacity, split_volume, SourceAllocator, \
+    FILL_POLICIES, pool_sources
 from .instruction import *  # flake8: noqa
+from .instruction import _TrackedDict, _TrackedList
 from .pipette_tools import assign
 from .util import check_valid_origin, check_stamp_append, check_valid_mag, \
     check_valid_mag_params, check_valid_gel_purify_extract, is_valid_well, \
@@ -21,6 +28,10 @@ if sys.version_info[0] >= 3:
 """
 
 
+# Autoprotocol fields holding the name of a ref rather than a well
+_CONTAINER_KEYS = ("object", "ref_start", "ref_end")
+
+
 class Ref(object):
 
     """
@@ -115,10 +126,78 @@ class Protocol(object):
 
     """
 
-    def __init__(self, refs=None, instructions=None):
+    def __init__(self, refs=None, instructions=None, tip_capacities=None):
         super(Protocol, self).__init__()
         self.refs = refs or {}
         self.instructions = instructions or []
+        # Volume held by a tip of each tip_type, see tip_capacity()
+        self.tip_capacities = {}
+        for tip_type, capacity in (tip_capacities or {}).items():
+            self.set_tip_capacity(tip_type, capacity)
+        # Reverse index of Container to ref name, maintained by ref()
+        self._container_refs = {}
+        # Refified Instruction data, keyed by Instruction, see
+        # _refify_instruction()
+        self._refified = {}
+        # Refified instruction list, see _refify_instructions()
+        self._refified_list = None
+        # Bumped whenever a ref is added, removed, renamed or pointed at
+        # another container, see _check_refs()
+        self._refs_version = 0
+        self._refs_signature = []
+
+    def set_tip_capacity(self, tip_type, capacity):
+        """
+        Set the volume held by a tip of the given type, used to split
+        transfers of this protocol larger than a tip when the transfer
+        gives no tip_capacity.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            p = Protocol()
+            p.set_tip_capacity("small", "200:microliter")
+            p.tip_capacity("small")
+            # Unit(200.0, 'microliter')
+
+        Parameters
+        ----------
+        tip_type : str
+            Type of tip, as passed to Protocol.transfer(), or None for
+            transfers that do not give a tip_type.
+        capacity : str, Unit
+            Volume held by one tip.
+
+        Raises
+        ------
+        ValueError
+            If capacity is not positive.
+
+        """
+        self.tip_capacities[tip_type] = self._tip_capacity(None, capacity)[0]
+
+    def tip_capacity(self, tip_type=None):
+        """
+        Return the volume held by a tip of the given type: the capacity set
+        with set_tip_capacity(), or else the default capacity of the tip
+        type, see :func:`autoprotocol.planning.tip_capacity`.
+
+        Parameters
+        ----------
+        tip_type : str, optional
+            Type of tip, as passed to Protocol.transfer().
+
+        Returns
+        -------
+        Unit
+            Tip capacity in microliters.
+
+        """
+        capacity = self.tip_capacities.get(tip_type)
+        if capacity is None:
+            capacity = tip_type_capacity(tip_type)
+        return capacity
 
     def container_type(self, shortname):
         """
@@ -149,7 +228,7 @@ class Protocol(object):
             return _CONTAINER_TYPES[shortname]
         else:
             raise ValueError("Unknown container type %s (known types=%s)" %
-                             (shortname, str(_CONTAINER_TYPES.keys())))
+                             (shortname, ", ".join(sorted(_CONTAINER_TYPES))))
 
     def ref(self, name, id=None, cont_type=None, storage=None, discard=None, cover=None):
         """
@@ -256,6 +335,7 @@ class Protocol(object):
         container = Container(
             id, cont_type, name=name, storage=storage if storage else None, cover=cover if cover else None)
         self.refs[name] = Ref(name, opts, container)
+        self._container_refs[container] = name
         return container
 
 
@@ -583,6 +663,60 @@ class Protocol(object):
         else:
             self.instructions.append(instructions)
 
+    def optimize_pipette_travel(self, window=256,
+                                switch_mm=CONTAINER_SWITCH_MM):
+        """
+        Reorder the groups of every pipette instruction to reduce the travel
+        of the liquid handler between wells and containers.
+
+        Groups that touch the same wells keep their relative order whenever
+        one of them adds liquid to or mixes a shared well, or aspirates
+        from it with a tip that may carry liquid from an earlier well, so
+        the volumes moved and the contents of every well are unchanged;
+        only the order of independent groups changes.  See
+        :func:`autoprotocol.planning.plan_group_order` for the cost model.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            p = Protocol()
+            src = p.ref("src", None, "96-flat", discard=True)
+            dest = p.ref("dest", None, "96-flat", discard=True)
+            for i in range(8):
+                p.transfer(src.well(i), dest.well(i), "5:microliter")
+                p.transfer(dest.well(95 - i), src.well(95 - i), "5:microliter")
+
+            report = p.optimize_pipette_travel()
+            print("%.0f mm and %d container switches saved" % (
+                report.saved_mm,
+                report.switches_before - report.switches_after))
+
+        Parameters
+        ----------
+        window : int, optional
+            Number of candidate groups considered for each step.
+        switch_mm : float, optional
+            Estimated travel between two containers, in millimeters.
+
+        Returns
+        -------
+        TravelReport
+            Estimated travel before and after reordering, summed over all
+            pipette instructions.
+
+        """
+        report = TravelReport(0, 0, 0.0, 0.0, 0, 0)
+        for instruction in self.instructions:
+            if instruction.op != "pipette":
+                continue
+            groups = instruction.groups
+            order, planned = plan_group_order(groups, window, switch_mm)
+            if planned.reordered:
+                groups[:] = [groups[i] for i in order]
+            report += planned
+        return report
+
     def as_dict(self):
         """
         Return the entire protocol as a dictionary.
@@ -638,18 +772,399 @@ class Protocol(object):
             dict with keys "refs" and "instructions" and optionally
             "time_constraints" and "outs", each of which contain the
             "refified" contents of their corresponding Protocol attribute.
+            The refified form of each Instruction built by the Protocol
+            is cached until the Instruction or the refs change, see
+            :class:`autoprotocol.instruction.Instruction`, and the
+            instructions are shared between calls.  The returned dict must
+            be treated as read-only; copy it, for instance with
+            ``copy.deepcopy``, before modifying it.
+
+        """
+        self._prepare_outs()
+        self._check_refs()
+        self._prune_refified()
+
+        prop_list = [a for a in dir(self) if not a.startswith(
+            '__') and not callable(getattr(self, a))]
+
+        explicit_props = ["outs", "refs", "instructions", "time_constraints"]
+
+        return {attr: self._refify_instructions() if attr == "instructions"
+                else self._refify(getattr(self, attr)) for attr in prop_list
+                if attr in explicit_props}
+
+    def iterencode(self, indent=None, backend=None):
+        """
+        Encode the Protocol as JSON, yielding the document in pieces.
+
+        With the stdlib json backend the output is identical to
+        ``json.dumps(self.as_dict(), indent)``, with compact ``","`` and
+        ``":"`` separators when indent is None, but refs and instructions are
+        refified and encoded one at a time so that memory use is bounded by
+        the largest single instruction rather than by the whole document.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            p = Protocol()
+            ...
+            for chunk in p.iterencode(indent=2):
+                sock.send(chunk)
+
+        Parameters
+        ----------
+        indent : int or str, optional
+            Indentation passed through to the JSON encoder.
+        backend : str, optional
+            JSON backend, one of "json", "orjson", "ujson" or "auto", see
+            `autoprotocol.encoding.resolve_backend`.
+
+        Yields
+        ------
+        str
+            Consecutive pieces of the JSON document.
 
         """
+        self._prepare_outs()
+        self._check_refs()
+        encoder = get_encoder(indent, backend)
+        if indent is None:
+            def newline(level):
+                return ""
+        else:
+            if not isinstance(indent, basestring):
+                indent = " " * indent
+
+            def newline(level):
+                return "\n" + indent * level
+
+        def encode(obj, level):
+            # Nested lines are shifted to the current depth, JSON strings
+            # cannot contain a raw newline so this never alters a value
+            return encoder.encode(obj).replace("\n", newline(level))
+
+        sections = [
+            (attr, getattr(self, attr)) for attr in
+            ["instructions", "outs", "refs", "time_constraints"]
+            if hasattr(self, attr)
+        ]
+        yield "{"
+        for n, (attr, value) in enumerate(sections):
+            yield "%s%s%s%s" % (encoder.item_separator if n else "",
+                                newline(1), encoder.encode(attr),
+                                encoder.key_separator)
+            if attr == "instructions" and value:
+                yield "["
+                for i, instruction in enumerate(value):
+                    yield "%s%s%s" % (encoder.item_separator if i else "",
+                                      newline(2),
+                                      encode(self._refify_instruction(
+                                          instruction, store=False), 2))
+                yield newline(1) + "]"
+            elif attr == "refs" and value:
+                yield "{"
+                for i, (name, ref) in enumerate(value.items()):
+                    yield "%s%s%s%s%s" % (
+                        encoder.item_separator if i else "", newline(2),
+                        encoder.encode(name), encoder.key_separator,
+                        encode(self._refify(ref), 2))
+                yield newline(1) + "}"
+            else:
+                yield encode(self._refify(value), 1)
+        yield newline(0) + "}"
+
+    def dump(self, fp, indent=None, backend=None):
+        """
+        Write the Protocol as JSON to a file-like object.
+
+        The document is written incrementally with
+        :meth:`Protocol.iterencode`, so large protocols never need to be
+        held in memory as a single string.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            p = Protocol()
+            ...
+            with open("protocol.json", "w") as f:
+                p.dump(f, indent=2)
+
+        Parameters
+        ----------
+        fp : file-like
+            Object with a ``write`` method accepting str.
+        indent : int or str, optional
+            Indentation passed through to the JSON encoder.
+        backend : str, optional
+            JSON backend, one of "json", "orjson", "ujson" or "auto", see
+            `autoprotocol.encoding.resolve_backend`.
+
+        """
+        for chunk in self.iterencode(indent=indent, backend=backend):
+            fp.write(chunk)
+
+    @classmethod
+    def from_dict(cls, data, container_types=None):
+        """
+        Load a Protocol from its Autoprotocol dict form, as returned by
+        :meth:`Protocol.as_dict`.
+
+        Refs are rebuilt as Containers, "ref/index" strings as Wells, ref
+        names in "object" fields as Containers and "value:unit" strings
+        which serialize back unchanged as Units. Instructions are rebuilt as
+        the Instruction subclass for their "op", and the names and
+        properties in "outs" are set on their Wells. Well volumes are not
+        part of Autoprotocol and are not restored.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            p = Protocol.from_dict(doc, container_types={"sample": "96-pcr"})
+            pipettes = [i for i in p.instructions if isinstance(i, Pipette)]
+
+        Parameters
+        ----------
+        data : dict
+            Autoprotocol document.
+        container_types : dict, optional
+            Container type shortname or ContainerType for refs by "id", keyed
+            by ref name. Refs with "new" carry their own container type.
+
+        Returns
+        -------
+        Protocol
+            Protocol holding the refs, instructions, time constraints and
+            outs of the document
+
+        Raises
+        ------
+        RuntimeError
+            If the container type of a ref is unknown or not recognized
+
+        """
+        def members():
+            for key, value in data.items():
+                if key == "instructions":
+                    for instruction in value:
+                        yield key, instruction
+                else:
+                    yield key, value
+
+        return cls._load(members(), container_types or {})
+
+    @classmethod
+    def from_json(cls, fp, container_types=None):
+        """
+        Load a Protocol from an Autoprotocol JSON document.
+
+        The document is read incrementally and its instructions are decoded
+        one at a time, so the text of a large protocol is never held in
+        memory at once. Instructions which appear before "refs" in the
+        document are kept in their decoded form until the refs are read.
+        See :meth:`Protocol.from_dict` for how the document is loaded.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            with open("protocol.json") as f:
+                p = Protocol.from_json(f)
+
+        Parameters
+        ----------
+        fp : file-like or str
+            Text or binary file containing the document, or the document
+            itself.
+        container_types : dict, optional
+            Container type shortname or ContainerType for refs by "id", keyed
+            by ref name.
+
+        Returns
+        -------
+        Protocol
+            Protocol holding the refs, instructions, time constraints and
+            outs of the document
+
+        Raises
+        ------
+        ValueError
+            If the document is not a valid JSON object
+        RuntimeError
+            If the container type of a ref is unknown or not recognized
+
+        """
+        return cls._load(iterload(fp, stream_keys=("instructions",)),
+                         container_types or {})
+
+    def as_cbor(self):
+        """
+        Encode the Protocol in a compact binary form of :meth:`as_dict`.
+
+        The document is written as CBOR, with strings repeated in the
+        protocol such as well references, units and field names written
+        only once. It decodes to exactly the dict returned by
+        :meth:`as_dict`, so it can be converted back to the same JSON.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            data = p.as_cbor()
+            json.dumps(cbor_loads(data), indent=2)  # same as p.as_dict()
+            p2 = Protocol.from_cbor(data)
+
+        Returns
+        -------
+        bytes
+            CBOR document, see `autoprotocol.encoding.cbor_dumps`
+
+        """
+        return cbor_dumps(self.as_dict())
+
+    @classmethod
+    def from_cbor(cls, data, container_types=None):
+        """
+        Load a Protocol from a document encoded by :meth:`as_cbor`.
+
+        See :meth:`Protocol.from_dict` for how the document is loaded.
+
+        Parameters
+        ----------
+        data : bytes
+            CBOR document.
+        container_types : dict, optional
+            Container type shortname or ContainerType for refs by "id", keyed
+            by ref name.
+
+        Returns
+        -------
+        Protocol
+            Protocol holding the refs, instructions, time constraints and
+            outs of the document
+
+        Raises
+        ------
+        ValueError
+            If data is not a valid CBOR document
+        RuntimeError
+            If the container type of a ref is unknown or not recognized
+
+        """
+        return cls.from_dict(cbor_loads(data), container_types)
+
+    @classmethod
+    def _load(cls, members, container_types):
+        # Builds a Protocol from (key, value) members of a document, with
+        # one member per instruction
+        protocol = cls()
+        pending = []
+        refs_loaded = False
+        outs = {}
+        time_constraints = None
+        for key, value in members:
+            if key == "instructions":
+                if refs_loaded:
+                    protocol.instructions.append(
+                        protocol._load_instruction(value))
+                else:
+                    pending.append(value)
+            elif key == "refs":
+                protocol._load_refs(value, container_types)
+                refs_loaded = True
+                protocol.instructions.extend(
+                    protocol._load_instruction(i) for i in pending)
+                pending = []
+            elif key == "outs":
+                outs = value
+            elif key == "time_constraints":
+                time_constraints = value
+        protocol.instructions.extend(
+            protocol._load_instruction(i) for i in pending)
+        if time_constraints is not None:
+            protocol.time_constraints = protocol._unrefify(time_constraints)
+        for name, wells in outs.items():
+            container = protocol.refs[name].container
+            for index, out in wells.items():
+                well = container.well(int(index))
+                if "name" in out:
+                    well.set_name(out["name"])
+                if "properties" in out:
+                    well.set_properties(out["properties"])
+        return protocol
+
+    def _load_refs(self, refs, container_types):
+        for name, opts in refs.items():
+            cont_type = opts.get("new") or container_types.get(name)
+            if cont_type is None:
+                raise RuntimeError("The container type of ref '%s' is not "
+                                   "in the document, specify it in "
+                                   "container_types." % name)
+            try:
+                cont_type = self.container_type(cont_type)
+            except ValueError:
+                raise RuntimeError("%s is not a recognized container type."
+                                   % cont_type)
+            storage = opts["store"].get("where") if "store" in opts else None
+            container = Container(opts.get("id"), cont_type, name=name,
+                                  storage=storage)
+            self.refs[name] = Ref(name, opts, container)
+            self._container_refs[container] = name
+
+    def _load_instruction(self, data):
+        instruction = Instruction._from_data(self._unrefify(data))
+        instruction._seal()
+        return instruction
+
+    def _unrefify(self, op_data, key=None):
+        """
+        Rebuilds protocol objects from Autoprotocol compliant ones, the
+        inverse of _refify()
+
+        Used by from_dict() and from_json(). Only values which refify back
+        to the same Autoprotocol are converted.
+
+        """
+        if type(op_data) is dict:
+            return {k: self._unrefify(v, k) for k, v in op_data.items()}
+        elif type(op_data) is list:
+            return [self._unrefify(i, key) for i in op_data]
+        elif not isinstance(op_data, basestring):
+            return op_data
+        ref = self.refs.get(op_data)
+        if ref is not None:
+            return ref.container if key in _CONTAINER_KEYS else op_data
+        name, sep, index = op_data.rpartition("/")
+        if sep and index.isdigit() and name in self.refs:
+            container = self.refs[name].container
+            if (str(int(index)) == index and
+                    int(index) < container.container_type.well_count):
+                return container.well(int(index))
+        _, sep, unit = op_data.partition(":")
+        if sep and unit[:1].isalpha():
+            try:
+                value = Unit(op_data)
+            except UnitError:
+                return op_data
+            if str(value) == op_data:
+                return value
+        return op_data
+
+    def _prepare_outs(self):
+        # Collects well annotations into outs and syncs ref storage opts
         outs = {}
         for n, ref in self.refs.items():
-            for well in ref.container._wells:
-                if well.name or len(well.properties) > 0:
+            for idx in ref.container._annotated_indices():
+                well = ref.container._wells[idx]
+                if well.name or well._properties:
                     if n not in outs.keys():
                         outs[n] = {}
                     outs[n][str(well.index)] = {}
                     if well.name:
                         outs[n][str(well.index)]["name"] = well.name
-                    if len(well.properties) > 0:
+                    if well._properties:
                         outs[n][str(well.index)][
                             "properties"] = well.properties
             # assign any storage or discard condition changes to ref
@@ -665,14 +1180,6 @@ class Protocol(object):
         if outs:
             setattr(self, "outs", outs)
 
-        prop_list = [a for a in dir(self) if not a.startswith(
-            '__') and not callable(getattr(self, a))]
-
-        explicit_props = ["outs", "refs", "instructions", "time_constraints"]
-
-        return {attr: self._refify(getattr(self, attr)) for attr in prop_list
-                if attr in explicit_props}
-
     def store(self, container, condition):
         """
         Manually adjust the storage destiny for a container used within
@@ -717,7 +1224,7 @@ class Protocol(object):
                    aspirate_source=None, dispense_speed=None,
                    distribute_target=None, pre_buffer=None, disposal_vol=None,
                    transit_vol=None, blowout_buffer=None, tip_type=None,
-                   new_group=False):
+                   new_group=False, fill_policy="first_fit"):
         """
         Distribute liquid from source well(s) to destination wells(s).
 
@@ -860,6 +1367,10 @@ class Protocol(object):
             If true the operation will dispense the pre_buffer along with the
             dispense volume.
             Cannot be true if disposal_vol is specified.
+        fill_policy : str, optional
+            How the next source well is chosen when the current one runs
+            out: "first_fit", "best_fit" or "least_sources", which uses the
+            fewest distribute groups. See :meth:`Protocol.fill_wells`.
 
         Raises
         ------
@@ -868,6 +1379,8 @@ class Protocol(object):
         ValueError
             If source and destination well(s) is/are not expressed as either
             Wells or WellGroups.
+        ValueError
+            If fill_policy is not recognized.
 
         """
         # Check valid well inputs
@@ -878,9 +1391,14 @@ class Protocol(object):
             raise TypeError("Destination (dest) must be of type Well, list of "
                             "Wells, or WellGroup.")
 
+        if fill_policy not in FILL_POLICIES:
+            raise ValueError("Fill policy must be one of %s." %
+                             ", ".join(FILL_POLICIES))
+
         opts = {}
         try:
-            dists = self.fill_wells(dest, source, volume, distribute_target, dispense_speed)
+            dists = self.fill_wells(dest, source, volume, distribute_target,
+                                    dispense_speed, fill_policy)
         except ValueError:
             raise RuntimeError("When distributing liquid, source well(s) "
                                "must have an associated volume (aliquot).")
@@ -917,7 +1435,7 @@ class Protocol(object):
             groups.append({"distribute": opts})
 
         if new_group:
-            self.append(Pipette(groups))
+            self._append(Pipette(groups))
         else:
             self._pipette(groups)
 
@@ -925,11 +1443,12 @@ class Protocol(object):
                  aspirate_speed=None, dispense_speed=None,
                  aspirate_source=None, dispense_target=None, pre_buffer=None,
                  disposal_vol=None, transit_vol=None, blowout_buffer=None,
-                 tip_type=None, new_group=False, **mix_kwargs):
+                 tip_type=None, new_group=False, conserve_tips=False,
+                 tip_capacity=None, **mix_kwargs):
         """
         Transfer liquid from one specific well to another.  A new pipette tip
-        is used between each transfer step unless the "one_tip" parameter
-        is set to True.
+        is used between each transfer step unless the "one_tip" or
+        "conserve_tips" parameter is set to True.
 
         Example Usage:
 
@@ -979,6 +1498,14 @@ class Protocol(object):
                        one_source=True,
                        one_tip=True)
 
+            # add a reagent to a column of empty wells, changing tips only
+            # when a destination well already holds liquid.  Wells of a new
+            # container have an unknown volume, so they are set to 0 first
+            column = sample_plate.wells_from("A1", 8, columnwise=True)
+            column.set_volume("0:microliter")
+            p.transfer(sample_plate.well("A12"), column, "10:microliter",
+                       conserve_tips=True)
+
 
         Parameters
         ----------
@@ -994,12 +1521,13 @@ class Protocol(object):
             Well or WellGroup to which to transfer liquid.  The number of
             destination wells must match the number of source wells specified
             unless one_source is set to True.
-        volume : str, Unit, list
+        volume : str, Unit, list, UnitArray
             The volume(s) of liquid to be transferred from source wells to
             destination wells.  Volume can be specified as a single string or
-            Unit, or can be given as a list of volumes.  The length of a list
-            of volumes must match the number of destination wells given unless
-            the same volume is to be transferred to each destination well.
+            Unit, or can be given as a list of volumes or a UnitArray.  The
+            length of a list of volumes must match the number of destination
+            wells given unless the same volume is to be transferred to each
+            destination well.
         one_source : bool, optional
             Specify whether liquid is to be transferred to destination wells
             from a group of wells all containing the same substance.
@@ -1046,6 +1574,20 @@ class Protocol(object):
         tip_type : str, optional
             Type of tip to be used for the transfer operation.
         new_group : bool, optional
+        conserve_tips : bool, optional
+            Reuse one tip for consecutive transfer steps from the same source
+            well, or from any of the source wells if one_source is True. A
+            new tip is started after any step whose tip may have touched the
+            destination contents, that is a step dispensing into a well that
+            already holds liquid, or whose volume is unknown, or mixing after
+            the transfer. The order of the transfer steps is unchanged.
+            Wells of a newly referenced container have an unknown volume, so
+            tips are only saved on empty destinations once their volume has
+            been set, for instance with ``set_volume("0:microliter")``.
+        tip_capacity : str, Unit, optional
+            Volume held by one tip.  Larger transfers are split into full
+            tips followed by the remainder.  Defaults to the capacity of
+            tip_type, see :meth:`Protocol.tip_capacity`.
 
         Raises
         ------
@@ -1055,6 +1597,10 @@ class Protocol(object):
         RuntimeError
             If transferring from WellGroup to WellGroup that have different
             number of wells and one_source is not True.
+        RuntimeError
+            If both one_tip and conserve_tips are True.
+        ValueError
+            If tip_capacity is not positive.
 
         """
         # Check valid well inputs
@@ -1064,8 +1610,14 @@ class Protocol(object):
         if not is_valid_well(dest):
             raise TypeError("Destination (dest) must be of type Well, list of "
                             "Wells, or WellGroup.")
+        if one_tip and conserve_tips:
+            raise RuntimeError("Only one of one_tip and conserve_tips can be "
+                               "set.")
+        capacity, capacity_pl = self._tip_capacity(tip_type, tip_capacity)
 
         opts = []
+        # Whether the tip may touch destination contents, for each transfer
+        contaminates = []
         source = WellGroup(source)
         dest = WellGroup(dest)
         len_source = len(source.wells)
@@ -1092,13 +1644,20 @@ class Protocol(object):
 
         # Auto-generate list from single volume, check if list length matches
         if isinstance(volume, basestring) or isinstance(volume, Unit):
+            volume = Unit.fromstring(volume).to("ul")
             if len_dest == 1 and not one_source:
-                volume = [Unit.fromstring(volume).to("ul")] * len_source
+                volume_pl = [_volume_to_pl(volume)] * len_source
+                volume = [volume] * len_source
             else:
-                volume = [Unit.fromstring(volume).to("ul")] * len_dest
+                volume_pl = [_volume_to_pl(volume)] * len_dest
+                volume = [volume] * len_dest
+        elif isinstance(volume, UnitArray) and len(volume) == len_dest:
+            volume_pl = volume._picoliters()
+            volume = volume.to("microliter")._elements()
         elif isinstance(volume, list) and len(volume) == len_dest:
             volume = list(
                 map(lambda x: Unit.fromstring(x).to("ul"), volume))
+            volume_pl = [_volume_to_pl(v) for v in volume]
         else:
             raise RuntimeError("Unless the same volume of liquid is being "
                                "transferred to each destination well, each "
@@ -1107,191 +1666,317 @@ class Protocol(object):
 
         # Ensure enough volume in single well to transfer to all dest wells
         if one_source:
-            try:
-                source_vol = [s.volume for s in source.wells]
-                if sum([a for a in volume]) > sum([a for a in source_vol]):
-                    raise RuntimeError("There is not enough volume in the "
-                                       "source well(s) specified to complete "
-                                       "the transfers.")
-                if len_source >= len_dest and all(i > j for i, j in zip(source_vol, volume)):
-                    sources = source.wells[:len_dest]
-                    destinations = dest.wells
-                    volumes = volume
-                else:
-                    sources = []
-                    source_counter = 0
-                    destinations = []
-                    volumes = []
-                    s = source.wells[source_counter]
-                    vol = s.volume
-                    max_decimal_places = 12
-                    for idx, d in enumerate(dest.wells):
-                        vol_d = volume[idx]
-                        while vol_d > Unit.fromstring("0:microliter"):
-                            if vol > vol_d:
-                                sources.append(s)
-                                destinations.append(d)
-                                volumes.append(vol_d)
-                                vol -= vol_d
-                                vol._magnitude = round(
-                                    vol._magnitude, max_decimal_places)
-                                vol_d -= vol_d
-                                vol_d._magnitude = round(
-                                    vol_d._magnitude, max_decimal_places)
-                            else:
-                                sources.append(s)
-                                destinations.append(d)
-                                volumes.append(vol)
-                                vol_d -= vol
-                                vol_d._magnitude = round(
-                                    vol_d._magnitude, max_decimal_places)
-                                source_counter += 1
-                                if source_counter < len_source:
-                                    s = source.wells[source_counter]
-                                    vol = s.volume
-                source = WellGroup(sources)
-                dest = WellGroup(destinations)
-                volume = volumes
-            except (ValueError, AttributeError, TypeError) as e:
-                raise RuntimeError("When transferring liquid from multiple "
-                                   "wells containing the same substance to "
-                                   "multiple other wells, each source Well "
-                                   "must have a volume attribute (aliquot) "
-                                   "associated with it.")
-
-        for s, d, v in list(zip(source.wells, dest.wells, volume)):
+            source, dest, volume, volume_pl = self._pool_sources(
+                source, dest, volume, volume_pl)
+
+        if mix_kwargs and source.wells and (
+                "mix_before" not in mix_kwargs and
+                "mix_after" not in mix_kwargs):
+            raise RuntimeError("If you specify mix arguments on transfer()"
+                               " you must also specify mix_before and/or"
+                               " mix_after=True.")
+        # Transfer options are the same for every transfer step
+        mixes = []
+        if mix_kwargs.get("mix_before"):
+            mixes.append((
+                "mix_before",
+                mix_kwargs.get("mix_vol_b") or mix_kwargs.get("mix_vol"),
+                mix_kwargs.get("repetitions_b") or
+                mix_kwargs.get("repetitions") or 10,
+                mix_kwargs.get("flowrate_b") or mix_kwargs.get("flowrate") or
+                "100:microliter/second"))
+        if mix_kwargs.get("mix_after"):
+            mixes.append((
+                "mix_after",
+                mix_kwargs.get("mix_vol_a") or mix_kwargs.get("mix_vol"),
+                mix_kwargs.get("repetitions_a") or
+                mix_kwargs.get("repetitions") or 10,
+                mix_kwargs.get("flowrate_a") or mix_kwargs.get("flowrate") or
+                "100:microliter/second"))
+        options = [(k, v) for k, v in [
+            ("aspirate_speed", aspirate_speed),
+            ("dispense_speed", dispense_speed),
+            ("x_aspirate_source", aspirate_source),
+            ("x_dispense_target", dispense_target),
+            ("x_pre_buffer", pre_buffer),
+            ("x_disposal_vol", disposal_vol),
+            ("x_transit_vol", transit_vol),
+            ("x_blowout_buffer", blowout_buffer)] if v is not None]
+
+        for s, d, v, v_pl in list(zip(source.wells, dest.wells, volume,
+                                      volume_pl)):
             self._remove_cover(s.container, "pipette from")
             self._remove_cover(d.container, "pipette into")
-            if v > Unit(900, "microliter"):
-                diff = Unit.fromstring(v)
-                while diff > Unit(900, "microliter"):
-                    # Organize transfer options into dictionary (for json
-                    # parsing)
+            # Volumes larger than a tip are moved in full tip loads followed
+            # by the remainder
+            full, remainder_pl = split_volume(v_pl, capacity_pl)
+            if full:
+                steps = [(capacity, capacity_pl)] * full
+                steps.append((_pl_to_volume(remainder_pl), remainder_pl))
+            else:
+                steps = [(v, v_pl)]
+            for v, v_pl in steps:
+                # Organize transfer options into dictionary (for json parsing)
+                xfer = {
+                    "from": s,
+                    "to": d,
+                    "volume": v
+                }
+                # Volume accounting
+                # A well of unknown volume may hold liquid
+                wet = d._volume != 0
+                d._add_volume(v_pl)
+                s._remove_volume(v_pl)
+                # mix before and/or after parameters
+                for key, mix_vol, repetitions, speed in mixes:
+                    xfer[key] = {
+                        "volume": mix_vol or v / 2,
+                        "repetitions": repetitions,
+                        "speed": speed
+                    }
+                xfer.update(options)
+                if v.magnitude > 0:
+                    opts.append(xfer)
+                    contaminates.append(wet or "mix_after" in xfer)
+
+        if conserve_tips:
+            tip_groups = self._tip_groups(opts, contaminates, one_source)
+        elif one_tip:
+            tip_groups = [opts]
+        else:
+            tip_groups = [[x] for x in opts]
+        for group in tip_groups:
+            trans = {}
+            assign(trans, "x_tip_type", tip_type)
+            trans["transfer"] = group
+            if new_group:
+                self._append(Pipette([trans]))
+            else:
+                self._pipette([trans])
 
-                    v = Unit(900, "microliter")
+    def transfer_many(self, source, dest, source_indices, dest_indices,
+                      volumes, one_tip=False, aspirate_speed=None,
+                      dispense_speed=None, aspirate_source=None,
+                      dispense_target=None, pre_buffer=None, disposal_vol=None,
+                      transit_vol=None, blowout_buffer=None, tip_type=None,
+                      new_group=False, conserve_tips=False, tip_capacity=None,
+                      **mix_kwargs):
+        """
+        Transfer liquid between many pairs of wells of two containers.
 
-                    xfer = {
-                        "from": s,
-                        "to": d,
-                        "volume": v
-                    }
-                    # Volume accounting
-                    if d.volume:
-                        d.volume += v
-                    else:
-                        d.volume = v
-                    if s.volume:
-                        s.volume -= v
-                    # mix before and/or after parameters
-                    if mix_kwargs and (
-                        "mix_before" not in mix_kwargs and (
-                            "mix_after" not in mix_kwargs)):
-                        raise RuntimeError("If you specify mix arguments on "
-                                           "transfer() you must also specify "
-                                           "mix_before and/or mix_after=True."
-                                           )
-                    if mix_kwargs.get("mix_before"):
-                        xfer["mix_before"] = {
-                            "volume": mix_kwargs.get(
-                                "mix_vol_b") or mix_kwargs.get(
-                                "mix_vol") or v / 2,
-                            "repetitions": mix_kwargs.get(
-                                "repetitions_b") or mix_kwargs.get(
-                                "repetitions") or 10,
-                            "speed":  mix_kwargs.get(
-                                "flowrate_b") or mix_kwargs.get(
-                                "flowrate") or "100:microliter/second"
-                        }
-                    if mix_kwargs.get("mix_after"):
-                        xfer["mix_after"] = {
-                            "volume":  mix_kwargs.get(
-                                "mix_vol_a") or mix_kwargs.get(
-                                "mix_vol") or v / 2,
-                            "repetitions": mix_kwargs.get(
-                                "repetitions_a") or mix_kwargs.get(
-                                "repetitions") or 10,
-                            "speed": mix_kwargs.get(
-                                "flowrate_a") or mix_kwargs.get(
-                                "flowrate") or "100:microliter/second"
-                        }
-                    # Append transfer options
-                    opt_list = ["aspirate_speed", "dispense_speed"]
-                    for option in opt_list:
-                        assign(xfer, option, eval(option))
-                    x_opt_list = ["x_aspirate_source",
-                                  "x_dispense_target",
-                                  "x_pre_buffer",
-                                  "x_disposal_vol",
-                                  "x_transit_vol",
-                                  "x_blowout_buffer"]
-                    for x_option in x_opt_list:
-                        assign(xfer, x_option, eval(x_option[2:]))
-                    if v > Unit(0, "microliter"):
-                        opts.append(xfer)
-
-                    diff -= Unit(900, "microliter")
+        Each transfer moves volumes[i] from well source_indices[i] of the
+        source container to well dest_indices[i] of the destination
+        container. The generated instructions and the volume accounting
+        are identical to those of
 
-                v = diff
+        .. code-block:: python
+
+            p.transfer(source.wells(source_indices),
+                       dest.wells(dest_indices), volumes, ...)
+
+        and so, unless one_tip or conserve_tips is set, to calling transfer()
+        for each pair in turn. Arguments are validated, covers are removed
+        and transfer options are prepared once for the whole batch, which
+        makes this much faster for thousands of transfers.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            p = Protocol()
+            src = p.ref("src", None, "384-flat", discard=True)
+            dest = p.ref("dest", None, "384-flat", discard=True)
 
-            # Organize transfer options into dictionary (for json parsing)
+            # transfer a different volume from every well into the reverse
+            # well of another plate
+            p.transfer_many(src, dest, range(384), range(383, -1, -1),
+                            UnitArray(volumes, "microliter"))
+
+        Parameters
+        ----------
+        source : Container
+            Container to transfer liquid from.
+        dest : Container
+            Container to transfer liquid to.
+        source_indices : list of int or str
+            Wells of source to transfer liquid from, as well indices or
+            well names.
+        dest_indices : list of int or str
+            Wells of dest to transfer liquid to, one for each source well.
+        volumes : str, Unit, list, UnitArray
+            The volume to transfer for every pair, or one volume per pair.
+        one_tip : bool, optional
+            Specify whether all transfer steps will use the same tip or not.
+        mix_after, mix_before, mix_vol, repetitions, flowrate : optional
+            Mixing parameters, see :meth:`Protocol.transfer`.
+        aspirate_speed, dispense_speed, aspirate_source, dispense_target,
+        pre_buffer, disposal_vol, transit_vol, blowout_buffer : optional
+            Transfer parameters, see :meth:`Protocol.transfer`.
+        tip_type : str, optional
+            Type of tip to be used for the transfer operation.
+        new_group : bool, optional
+        conserve_tips : bool, optional
+            Reuse one tip for consecutive transfers from the same source
+            well, see :meth:`Protocol.transfer`.  A new tip is started after
+            dispensing into a well of unknown volume, so empty destination
+            wells must have their volume set to 0 for tips to be saved.
+        tip_capacity : str, Unit, optional
+            Volume held by one tip, see :meth:`Protocol.transfer`.
+
+        Raises
+        ------
+        TypeError
+            If source or dest is not a Container
+        RuntimeError
+            If the number of source and destination wells differ, or if a
+            list of volumes does not have one volume per pair.
+        RuntimeError
+            If mix arguments are given without mix_before or mix_after, or
+            if both one_tip and conserve_tips are True.
+        ValueError
+            If tip_capacity is not positive.
+
+        """
+        if not isinstance(source, Container):
+            raise TypeError("Source must be of type Container.")
+        if not isinstance(dest, Container):
+            raise TypeError("Destination (dest) must be of type Container.")
+        if one_tip and conserve_tips:
+            raise RuntimeError("Only one of one_tip and conserve_tips can be "
+                               "set.")
+        capacity, capacity_pl = self._tip_capacity(tip_type, tip_capacity)
+        source_indices = source.robotize_many(list(source_indices))
+        dest_indices = dest.robotize_many(list(dest_indices))
+        count = len(dest_indices)
+        if len(source_indices) != count:
+            raise RuntimeError("transfer_many() requires the same number of "
+                               "source and destination wells.")
+
+        if isinstance(volumes, basestring) or isinstance(volumes, Unit):
+            volumes = Unit.fromstring(volumes).to("ul")
+            volumes_pl = [_volume_to_pl(volumes)] * count
+            volumes = [volumes] * count
+        elif isinstance(volumes, UnitArray) and len(volumes) == count:
+            volumes_pl = volumes._picoliters()
+            volumes = volumes.to("microliter")._elements()
+        elif isinstance(volumes, list) and len(volumes) == count:
+            volumes = [Unit.fromstring(v).to("ul") for v in volumes]
+            volumes_pl = [_volume_to_pl(v) for v in volumes]
+        else:
+            raise RuntimeError("Unless the same volume of liquid is being "
+                               "transferred to each destination well, each "
+                               "destination well must have a corresponding "
+                               "volume in the form of a list.")
+
+        if count:
+            if mix_kwargs and ("mix_before" not in mix_kwargs and
+                               "mix_after" not in mix_kwargs):
+                raise RuntimeError("If you specify mix arguments on "
+                                   "transfer() you must also specify "
+                                   "mix_before and/or mix_after=True.")
+            self._remove_cover(source, "pipette from")
+            self._remove_cover(dest, "pipette into")
+
+        # Mixing and transfer options are the same for every transfer
+        mixes = []
+        if mix_kwargs.get("mix_before"):
+            mixes.append((
+                "mix_before",
+                mix_kwargs.get("mix_vol_b") or mix_kwargs.get("mix_vol"),
+                mix_kwargs.get("repetitions_b") or
+                mix_kwargs.get("repetitions") or 10,
+                mix_kwargs.get("flowrate_b") or mix_kwargs.get("flowrate") or
+                "100:microliter/second"))
+        if mix_kwargs.get("mix_after"):
+            mixes.append((
+                "mix_after",
+                mix_kwargs.get("mix_vol_a") or mix_kwargs.get("mix_vol"),
+                mix_kwargs.get("repetitions_a") or
+                mix_kwargs.get("repetitions") or 10,
+                mix_kwargs.get("flowrate_a") or mix_kwargs.get("flowrate") or
+                "100:microliter/second"))
+        options = [(k, v) for k, v in [
+            ("aspirate_speed", aspirate_speed),
+            ("dispense_speed", dispense_speed),
+            ("x_aspirate_source", aspirate_source),
+            ("x_dispense_target", dispense_target),
+            ("x_pre_buffer", pre_buffer),
+            ("x_disposal_vol", disposal_vol),
+            ("x_transit_vol", transit_vol),
+            ("x_blowout_buffer", blowout_buffer)] if v is not None]
+        halves = {}
+
+        def make_xfer(s, d, v):
             xfer = {
                 "from": s,
                 "to": d,
                 "volume": v
             }
-            # Volume accounting
-            if d.volume:
-                d.volume += v
-            else:
-                d.volume = v
-            if s.volume:
-                s.volume -= v
-            # mix before and/or after parameters
-            if mix_kwargs and ("mix_before" not in mix_kwargs and "mix_after" not in mix_kwargs):
-                raise RuntimeError("If you specify mix arguments on transfer()"
-                                   " you must also specify mix_before and/or"
-                                   " mix_after=True.")
-            if mix_kwargs.get("mix_before"):
-                xfer["mix_before"] = {
-                    "volume": mix_kwargs.get("mix_vol_b") or mix_kwargs.get("mix_vol") or v / 2,
-                    "repetitions": mix_kwargs.get("repetitions_b") or mix_kwargs.get("repetitions") or 10,
-                    "speed":  mix_kwargs.get("flowrate_b") or mix_kwargs.get("flowrate") or "100:microliter/second"
-                }
-            if mix_kwargs.get("mix_after"):
-                xfer["mix_after"] = {
-                    "volume":  mix_kwargs.get("mix_vol_a") or mix_kwargs.get("mix_vol") or v / 2,
-                    "repetitions": mix_kwargs.get("repetitions_a") or mix_kwargs.get("repetitions") or 10,
-                    "speed": mix_kwargs.get("flowrate_a") or mix_kwargs.get("flowrate") or "100:microliter/second"
+            if not mixes:
+                if options:
+                    xfer.update(options)
+                return xfer
+            for key, mix_vol, repetitions, speed in mixes:
+                if mix_vol is None:
+                    mix_vol = halves.get(v.magnitude)
+                    if mix_vol is None:
+                        mix_vol = halves[v.magnitude] = v / 2
+                xfer[key] = {
+                    "volume": mix_vol,
+                    "repetitions": repetitions,
+                    "speed": speed
                 }
-            # Append transfer options
-            opt_list = ["aspirate_speed", "dispense_speed"]
-            for option in opt_list:
-                assign(xfer, option, eval(option))
-            x_opt_list = ["x_aspirate_source", "x_dispense_target",
-                          "x_pre_buffer", "x_disposal_vol", "x_transit_vol",
-                          "x_blowout_buffer"]
-            for x_option in x_opt_list:
-                assign(xfer, x_option, eval(x_option[2:]))
-            if v > Unit(0, "microliter"):
-                opts.append(xfer)
-
-        trans = {}
-        assign(trans, "x_tip_type", tip_type)
-        if one_tip:
-            trans["transfer"] = opts
-            if new_group:
-                self.append(Pipette([trans]))
+            xfer.update(options)
+            return xfer
+
+        # Wells are looked up once per pair, constructing them in bulk
+        source_wells = source._wells.select(source_indices)
+        dest_wells = dest._wells.select(dest_indices)
+        source_volumes = source._volumes
+        dest_volumes = dest._volumes
+        opts = []
+        contaminates = []
+        mix_after = bool(mix_kwargs.get("mix_after"))
+        for si, di, s, d, v, pl in zip(source_indices, dest_indices,
+                                       source_wells, dest_wells, volumes,
+                                       volumes_pl):
+            if pl > capacity_pl:
+                # Splits into full tips the same way as transfer()
+                full, remainder_pl = split_volume(pl, capacity_pl)
+                chunks = [(capacity, capacity_pl)] * full
+                chunks.append((_pl_to_volume(remainder_pl), remainder_pl))
             else:
-                self._pipette([trans])
+                chunks = ((v, pl),)
+            for v, pl in chunks:
+                # Volume accounting, as Well._add_volume and _remove_volume
+                current = dest_volumes[di]
+                wet = current != 0
+                dest_volumes[di] = (
+                    pl if current == _NO_VOLUME else current + pl)
+                current = source_volumes[si]
+                if current != _NO_VOLUME and current:
+                    source_volumes[si] = current - pl
+                if v._magnitude > 0:
+                    opts.append(make_xfer(s, d, v))
+                    contaminates.append(wet or mix_after)
+
+        if conserve_tips:
+            tip_groups = self._tip_groups(opts, contaminates)
+        elif one_tip:
+            tip_groups = [opts]
         else:
-            for x in opts:
-                trans = {}
-                assign(trans, "x_tip_type", tip_type)
-                trans["transfer"] = [x]
-                if new_group:
-                    self.append(Pipette([trans]))
-                else:
-                    self._pipette([trans])
+            tip_groups = [[x] for x in opts]
+        groups = []
+        for group in tip_groups:
+            trans = {}
+            assign(trans, "x_tip_type", tip_type)
+            trans["transfer"] = group
+            groups.append(trans)
+        if new_group:
+            for trans in groups:
+                self._append(Pipette([trans]))
+        elif groups:
+            self._pipette(groups)
 
     def consolidate(self, sources, dest, volumes, allow_carryover=False,
                     mix_after=False, mix_vol=None,
@@ -1317,11 +2002,12 @@ class Protocol(object):
             Well or wells to transfer liquid from.
         dest : Well
             Well to which to transfer consolidated liquid.
-        volumes : str, Unit, list
+        volumes : str, Unit, list, UnitArray
             The volume(s) of liquid to be transferred from source well(s) to
             destination well.  Volume can be specified as a single string or
-            Unit, or can be given as a list of volumes.  The length of a list
-            of volumes must match the number of source wells given.
+            Unit, or can be given as a list of volumes or a UnitArray.  The
+            length of a list of volumes must match the number of source wells
+            given.
         mix_after : bool, optional
             Specify whether to mix the liquid in the destination well after
             liquid is transferred.
@@ -1376,15 +2062,22 @@ class Protocol(object):
         self._remove_cover(dest.container, "consolidate into")
         if isinstance(sources, (Well, basestring)):
             sources = [sources]
-        if isinstance(volumes, list):
+        if isinstance(volumes, (list, UnitArray)):
             if len(volumes) != len(sources):
                 raise ValueError("If supplying consolidate "
                                  "volumes as a list, its length "
                                  "must match the number of "
                                  "source wells specified.")
-            volumes = [Unit.fromstring(v).to("ul") for v in volumes]
+            if isinstance(volumes, UnitArray):
+                volumes_pl = volumes._picoliters()
+                volumes = volumes.to("microliter")._elements()
+            else:
+                volumes = [Unit.fromstring(v).to("ul") for v in volumes]
+                volumes_pl = [_volume_to_pl(v) for v in volumes]
         else:
-            volumes = [Unit.fromstring(volumes).to("ul")] * len(sources)
+            volumes = Unit.fromstring(volumes).to("ul")
+            volumes_pl = [_volume_to_pl(volumes)] * len(sources)
+            volumes = [volumes] * len(sources)
 
         # Initialize instructions
         cons = {"consolidate": {}}
@@ -1392,7 +2085,7 @@ class Protocol(object):
         assign(cons_instr, "to", dest)
         from_wells = []
         # Generate instructions for each transfer from source wells
-        for s, v in zip(sources, volumes):
+        for s, v, v_pl in zip(sources, volumes, volumes_pl):
             self._remove_cover(s.container, "consolidate from")
             source_opts = {}
             source_opts["well"] = s
@@ -1400,12 +2093,8 @@ class Protocol(object):
             assign(source_opts, "aspirate_speed", aspirate_speed)
             assign(source_opts, "x_aspirate_source", aspirate_source)
             from_wells.append(source_opts)
-            if dest.volume:
-                dest.volume += v
-            else:
-                dest.volume = v
-            if s.volume:
-                s.volume -= v
+            dest._add_volume(v_pl)
+            s._remove_volume(v_pl)
         assign(cons_instr, "from", from_wells)
         # Append mix options
         if mix_after:
@@ -1424,7 +2113,7 @@ class Protocol(object):
             assign(cons_instr, x_option, eval(x_option[2:]))
         # Create new pipette instruction group if necessary
         if new_group:
-            self.append(Pipette([cons]))
+            self._append(Pipette([cons]))
         else:
             self._pipette([cons])
 
@@ -1448,12 +2137,13 @@ class Protocol(object):
             Well or WellGroup to which to transfer liquid.  The number of
             destination wells must match the number of source wells specified
             unless one_source is set to True.
-        volume : str, Unit, list
+        volume : str, Unit, list, UnitArray
             The volume(s) of liquid to be transferred from source wells to
             destination wells.  Volume can be specified as a single string or
-            Unit, or can be given as a list of volumes.  The length of a list
-            of volumes must match the number of destination wells given unless
-            the same volume is to be transferred to each destination well.
+            Unit, or can be given as a list of volumes or a UnitArray.  The
+            length of a list of volumes must match the number of destination
+            wells given unless the same volume is to be transferred to each
+            destination well.
         one_source : bool, optional
             Specify whether liquid is to be transferred to destination wells
             from a group of wells all containing the same substance.
@@ -1547,108 +2237,71 @@ class Protocol(object):
                                    "transfer.")
 
         # Auto-generate list from single volume, check if list length matches
+        # Volumes are checked and accounted for in exact picoliters
         if isinstance(volume, basestring) or isinstance(volume, Unit):
+            volume = Unit.fromstring(volume).to("ul")
             if len_dest == 1 and not one_source:
-                volume = [Unit.fromstring(volume).to("ul")] * len_source
+                volume_pl = [_exact_pl(volume)] * len_source
+                volume = [volume] * len_source
             else:
-                volume = [Unit.fromstring(volume).to("ul")] * len_dest
+                volume_pl = [_exact_pl(volume)] * len_dest
+                volume = [volume] * len_dest
+        elif isinstance(volume, UnitArray) and len(volume) == len_dest:
+            volume = volume.to("microliter")
+            volume_pl = volume._exact_picoliters()
         elif isinstance(volume, list) and len(volume) == len_dest:
             volume = list(
                 map(lambda x: Unit.fromstring(x).to("ul"), volume))
+            volume_pl = [_exact_pl(v) for v in volume]
         else:
             raise RuntimeError("Unless the same volume of liquid is being "
                                "transferred to each destination well, each "
                                "destination well must have a corresponding "
                                "volume in the form of a list.")
-        vol_errors = []
-        for vol_d in volume:
-            if not (vol_d / droplet_size)._magnitude.is_integer():
-                vol_errors.append(vol_d)
+        droplet_pl = _exact_pl(droplet_size)
+        if droplet_pl is None or droplet_pl <= 0:
+            raise ValueError("Droplet size must be a positive whole number "
+                             "of picoliters, not %s." % droplet_size)
+        vol_errors = [volume[i] for i, v_pl in enumerate(volume_pl)
+                      if v_pl is None or v_pl % droplet_pl]
         if len(vol_errors) > 0:
             raise RuntimeError("Transfer volume has to be a multiple of "
                                "the droplet size. This is not true for the "
                                "following volumes: {} ".format(vol_errors))
         # Ensure enough volume in single well to transfer to all dest wells
         if one_source:
-            try:
-                source_vol = [s.volume for s in source.wells]
-                if sum([a for a in volume]) > sum([a for a in source_vol]):
-                    raise RuntimeError("There is not enough volume in the source well(s) specified to complete "
-                                       "the transfers.")
-                if len_source >= len_dest and all(i > j for i, j in zip(source_vol, volume)):
-                    sources = source.wells[:len_dest]
-                    destinations = dest.wells
-                    volumes = volume
-                else:
-                    sources = []
-                    source_counter = 0
-                    destinations = []
-                    volumes = []
-                    s = source.wells[source_counter]
-                    vol = s.volume
-                    max_decimal_places = 12
-                    for idx, d in enumerate(dest.wells):
-                        vol_d = volume[idx]
-                        while vol_d > Unit.fromstring("0:microliter"):
-                            if vol > vol_d:
-                                sources.append(s)
-                                destinations.append(d)
-                                volumes.append(vol_d)
-                                vol -= vol_d
-                                vol._magnitude = round(
-                                    vol._magnitude, max_decimal_places)
-                                vol_d -= vol_d
-                                vol_d._magnitude = round(
-                                    vol_d._magnitude, max_decimal_places)
-                            else:
-                                sources.append(s)
-                                destinations.append(d)
-                                vol = int(vol / droplet_size) * droplet_size
-                                volumes.append(vol)
-                                vol_d -= vol
-                                vol_d._magnitude = round(
-                                    vol_d._magnitude, max_decimal_places)
-                                source_counter += 1
-                                if source_counter < len_source:
-                                    s = source.wells[source_counter]
-                                    vol = s.volume
-                source = WellGroup(sources)
-                dest = WellGroup(destinations)
-                volume = volumes
-            except (ValueError, AttributeError, TypeError) as e:
-                raise RuntimeError("When transferring liquid from multiple wells containing the same substance to "
-                                   "multiple other wells, each source Well must have a volume attribute (aliquot) "
-                                   "associated with it.")
+            source, dest, volume, volume_pl = self._pool_sources(
+                source, dest, volume, volume_pl, droplet_pl)
 
-        for s, d, v in list(zip(source.wells, dest.wells, volume)):
+        # Volumes are emitted in nanoliters built from the exact picoliters,
+        # so that no conversion error reaches the output
+        nanoliters = {}
+        for s, d, v_pl in list(zip(source.wells, dest.wells, volume_pl)):
             self._remove_cover(s.container, "acoustic_transfer")
             self._remove_cover(d.container, "acoustic_transfer")
-            xfer = {
-                "from": s,
-                "to": d,
-                "volume": v
-            }
             # Volume accounting
-            if d.volume:
-                d.volume += v
-            else:
-                d.volume = v
-            if s.volume:
-                s.volume -= v
-            if v > Unit(0, 'microliter'):
-                transfers.append(xfer)
+            d._add_volume(v_pl)
+            s._remove_volume(v_pl)
+            if v_pl > 0:
+                v = nanoliters.get(v_pl)
+                if v is None:
+                    v = nanoliters[v_pl] = _pl_to_volume(v_pl, "nanoliter")
+                transfers.append({
+                    "from": s,
+                    "to": d,
+                    "volume": v
+                })
 
-        for x in transfers:
-            x["volume"] = x["volume"].to("nl")
         if self.instructions and self.instructions[-1].op == "acoustic_transfer":
             prev_inst = self.instructions[-1].data["groups"][0]["transfer"][-1]
             if (prev_inst["from"].container == transfers[0]["from"].container and
                     prev_inst["to"].container == transfers[0]["to"].container and
                     droplet_size == self.instructions[-1].data["droplet_size"]):
-                self.instructions[-
-                                  1].data["groups"][0]["transfer"].extend(transfers)
+                last = self.instructions[-1]
+                last.data["groups"][0]["transfer"].extend(
+                    last._track(transfers))
                 return
-        self.append(AcousticTransfer(transfers, droplet_size))
+        self._append(AcousticTransfer(transfers, droplet_size))
 
     def stamp(self, source_origin, dest_origin, volume, shape=dict(rows=8,
                                                                    columns=12), mix_before=False, mix_after=False, mix_vol=None,
@@ -1728,12 +2381,12 @@ class Protocol(object):
             respect to the destination transfer.
             If a container is specified, stamp will be applied to all
             quadrants of the container
-        volume : str, Unit, list
+        volume : str, Unit, list, UnitArray
             Volume(s) of liquid to move from source plate to destination
             plate. Volume can be specified as a single string or Unit, or can
-            be given as a list of volumes.  The length of a list of volumes
-            must match the number of destination wells given unless the same
-            volume is to be transferred to each destination well.
+            be given as a list of volumes or a UnitArray.  The length of a list
+            of volumes must match the number of destination wells given unless
+            the same volume is to be transferred to each destination well.
         shape : dictionary, list, optional
             The shape(s) parameter is optional and will default to a rectangle
             corresponding to a full 96-well plate (8 rows by 12 columns).
@@ -1920,6 +2573,8 @@ class Protocol(object):
                 volume = [Unit.fromstring(volume).to("ul")] * len_source
             else:
                 volume = [Unit.fromstring(volume).to("ul")] * len_dest
+        elif isinstance(volume, UnitArray) and len(volume) == len_dest:
+            volume = volume.to("microliter")._elements()
         elif isinstance(volume, list) and len(volume) == len_dest:
             volume = list(map(lambda x: Unit.fromstring(x).to("ul"), volume))
         else:
@@ -2011,62 +2666,19 @@ class Protocol(object):
                         raise RuntimeError("Each well in a shape must have "
                                            "the same or greater volume as the "
                                            "origin well.")
-
-                # Create volumes list
-                source_vol = [s.volume for s in source.wells]
-                if sum([a for a in volume]) > sum([a for a in source_vol]):
-                    raise RuntimeError("There is not enough volume in the "
-                                       "source well(s) specified to complete "
-                                       "the transfers.")
-                if len_source >= len_dest and all(i > j for i, j in zip(source_vol, volume)):
-                    sources = source.wells[:len_dest]
-                    destinations = dest.wells
-                    volumes = volume
-                else:
-                    sources = []
-                    source_counter = 0
-                    destinations = []
-                    volumes = []
-                    s = source.wells[source_counter]
-                    vol = s.volume
-                    max_decimal_places = 12
-                    for idx, d in enumerate(dest.wells):
-                        vol_d = volume[idx]
-                        while vol_d > Unit.fromstring("0:microliter"):
-                            if vol > vol_d:
-                                sources.append(s)
-                                destinations.append(d)
-                                volumes.append(vol_d)
-                                vol -= vol_d
-                                vol._magnitude = round(
-                                    vol._magnitude, max_decimal_places)
-                                vol_d -= vol_d
-                                vol_d._magnitude = round(
-                                    vol_d._magnitude, max_decimal_places)
-                            else:
-                                sources.append(s)
-                                destinations.append(d)
-                                volumes.append(vol)
-                                vol_d -= vol
-                                vol_d._magnitude = round(
-                                    vol_d._magnitude, max_decimal_places)
-                                source_counter += 1
-                                if source_counter < len_source:
-                                    s = source.wells[source_counter]
-                                    vol = s.volume
-                source = WellGroup(sources)
-                dest = WellGroup(destinations)
-                volume = volumes
-                shape = [shape[0]] * len(volume)
-                rows = [rows[0]] * len(volume)
-                columns = [columns[0]] * len(volume)
-                stamp_type = [stamp_type[0]] * len(volume)
             except (ValueError, AttributeError, TypeError):
                 raise RuntimeError("When transferring liquid from multiple "
                                    "wells containing the same substance to "
                                    "multiple other wells, each source Well "
                                    "must have a volume attribute (aliquot) "
                                    "associated with it.")
+            # Create volumes list
+            source, dest, volume, _ = self._pool_sources(
+                source, dest, volume, [_volume_to_pl(v) for v in volume])
+            shape = [shape[0]] * len(volume)
+            rows = [rows[0]] * len(volume)
+            columns = [columns[0]] * len(volume)
+            stamp_type = [stamp_type[0]] * len(volume)
 
         # Checking on containers and volume consistency if one_tip = True
 
@@ -2164,14 +2776,11 @@ class Protocol(object):
                         else:
                             source_wells = s.container.wells_from(
                                 s, c * r, columnWise)
+                        v_pl = _volume_to_pl(v)
                         for well in source_wells:
-                            if well.volume:
-                                well.volume -= v
+                            well._remove_volume(v_pl)
                         for well in dest_wells:
-                            if well.volume:
-                                well.volume += v
-                            else:
-                                well.volume = v
+                            well._add_volume(v_pl)
 
                         # Adding liquid transfer options
                         opt_list = ["aspirate_speed", "dispense_speed"]
@@ -2237,14 +2846,11 @@ class Protocol(object):
                         else:
                             source_wells = s.container.wells_from(
                                 s, c * r, columnWise)
+                        v_pl = _volume_to_pl(v)
                         for well in source_wells:
-                            if well.volume:
-                                well.volume -= v
+                            well._remove_volume(v_pl)
                         for well in dest_wells:
-                            if well.volume:
-                                well.volume += v
-                            else:
-                                well.volume = v
+                            well._add_volume(v_pl)
 
                         # Adding liquid transfer options
                         opt_list = ["aspirate_speed", "dispense_speed"]
@@ -2305,14 +2911,11 @@ class Protocol(object):
                         s, c * r * 4, columnWise)[x] for x in range(c * r * 4) if (x % 2) == (x // 24) % 2 == 0]
             else:
                 source_wells = s.container.wells_from(s, c * r, columnWise)
+            v_pl = _volume_to_pl(v)
             for well in source_wells:
-                if well.volume:
-                    well.volume -= v
+                well._remove_volume(v_pl)
             for well in dest_wells:
-                if well.volume:
-                    well.volume += v
-                else:
-                    well.volume = v
+                well._add_volume(v_pl)
 
             # Adding liquid transfer options
             opt_list = ["aspirate_speed", "dispense_speed"]
@@ -2361,13 +2964,14 @@ class Protocol(object):
                 maxTransfers = 8
                 maxContainers = 2
             if new_group:
-                self.instructions.append(Stamp([trans]))
+                self._append(Stamp([trans]))
             elif (len(self.instructions) > 0 and self.instructions[-1].op == "stamp" and check_stamp_append(trans, self.instructions[-1].groups, maxTransfers, maxContainers, volumeSwitch)):
                 # Append to existing instruction
-                self.instructions[-1].groups.append(trans)
+                self.instructions[-1].groups.append(
+                    self.instructions[-1]._track(trans))
             else:
                 # Initialize new stamp list/instruction
-                self.instructions.append(Stamp([trans]))
+                self._append(Stamp([trans]))
 
         else:
             for x, y, z in list(zip(opts, oshp, osta)):
@@ -2387,13 +2991,14 @@ class Protocol(object):
                     maxTransfers = 8
                     maxContainers = 2
                 if new_group:
-                    self.instructions.append(Stamp([trans]))
+                    self._append(Stamp([trans]))
                 elif (len(self.instructions) > 0 and self.instructions[-1].op == "stamp" and check_stamp_append(trans, self.instructions[-1].groups, maxTransfers, maxContainers, volumeSwitch)):
                     # Append to existing instruction
-                    self.instructions[-1].groups.append(trans)
+                    self.instructions[-1].groups.append(
+                        self.instructions[-1]._track(trans))
                 else:
                     # Initialize new stamp list/instruction
-                    self.instructions.append(Stamp([trans]))
+                    self._append(Stamp([trans]))
 
     def illuminaseq(self, flowcell, lanes, sequencer, mode, index,
                     library_size, dataref, cycles=None):
@@ -2616,8 +3221,8 @@ class Protocol(object):
                 else:
                     cycles[ind] = 0
 
-        self.instructions.append(IlluminaSeq(flowcell, lanes, sequencer, mode,
-                                             index, library_size, dataref, cycles))
+        self._append(IlluminaSeq(flowcell, lanes, sequencer, mode,
+                                 index, library_size, dataref, cycles))
 
     def sangerseq(self, cont, wells, dataref, type="standard", primer=None):
         """
@@ -2696,7 +3301,7 @@ class Protocol(object):
         if not isinstance(wells, list):
             raise ValueError("Unknown input. SangerSeq wells accepts either a "
                              "Well, a WellGroup, or a list of well indices.")
-        self.instructions.append(SangerSeq(cont, wells, dataref, type, primer))
+        self._append(SangerSeq(cont, wells, dataref, type, primer))
 
     def mix(self, well, volume="50:microliter", speed="100:microliter/second",
             repetitions=10, one_tip=False):
@@ -2936,11 +3541,11 @@ class Protocol(object):
                     columnwise=True
                 )
             )
-            for w in wells:
-                if w.volume:
-                    w.volume += Unit.fromstring(c["volume"]).to("ul")
-                else:
-                    w.set_volume(Unit(c["volume"]).to("ul"))
+            indices = [w.index for w in wells]
+            if any(not w._volume for w in wells):
+                # Empty wells are set to the dispensed volume
+                ref._check_volume(Unit(c["volume"]))
+            ref._add_volumes(indices, _volume_to_pl(c["volume"]))
 
         # Parse reagent
         if isinstance(reagent, Well):
@@ -2949,11 +3554,10 @@ class Protocol(object):
             # Uncover reagent source
             self._remove_cover(reagent.container, "dispense from")
             # Volume tracking
-            total_vol_dispensed = sum([Unit(c["volume"]) for c in columns]) * ref.container_type.row_count()
-            if reagent.volume:
-                reagent.volume -= total_vol_dispensed
-            else:
-                reagent.volume = -total_vol_dispensed
+            total_pl_dispensed = (
+                sum([_volume_to_pl(c["volume"]) for c in columns]) *
+                ref.container_type.row_count())
+            reagent._add_volume(-total_pl_dispensed)
         else:
             if not isinstance(reagent, basestring):
                 raise TypeError("reagent must be a Well or a string.")
@@ -3014,7 +3618,7 @@ class Protocol(object):
                 raise ValueError("Step size for this cassette must be %s" % str(cassette_info["step_size"]))
 
         # Append dispense instruction
-        self.instructions.append(
+        self._append(
             Dispense(
                 ref,
                 reagent,
@@ -3257,7 +3861,7 @@ class Protocol(object):
             self._add_cover(ref, "inward spin")
         elif flow_direction == "outward":
             self._remove_cover(ref, "outward spin")
-        self.instructions.append(
+        self._append(
             Spin(ref, acceleration, duration, flow_direction, spin_direction))
 
     def thermocycle(self, ref, groups,
@@ -3539,7 +4143,7 @@ class Protocol(object):
             raise RuntimeError("Container '{}' type '{}', cannot be thermocycled."
                                "".format(ref.name, ref.container_type.shortname))
         self._add_seal(ref, "thermocycle")
-        self.instructions.append(
+        self._append(
             Thermocycle(ref, groups, volume, dataref, dyes, melting_start,
                         melting_end, melting_increment, melting_rate))
 
@@ -3660,9 +4264,9 @@ class Protocol(object):
                                  "".format(ts_freq_min, ts_freq_max, frequency))
         if not uncovered:
             self._add_cover(ref, "incubate")
-        self.instructions.append(Incubate(ref, where, duration, shaking,
-                                          co2, target_temperature,
-                                          shaking_params))
+        self._append(Incubate(ref, where, duration, shaking,
+                              co2, target_temperature,
+                              shaking_params))
 
     def absorbance(self, ref, wells, wavelength, dataref, flashes=25,
                    incubate_before=None, temperature=None):
@@ -3755,7 +4359,7 @@ class Protocol(object):
         if incubate_before:
             check_valid_incubate_params(incubate_before)
 
-        self.instructions.append(
+        self._append(
             Absorbance(ref, wells, wavelength, dataref, flashes,
                        incubate_before, temperature))
 
@@ -3863,7 +4467,7 @@ class Protocol(object):
         if incubate_before:
             check_valid_incubate_params(incubate_before)
 
-        self.instructions.append(
+        self._append(
             Fluorescence(ref, wells, excitation, emission, dataref, flashes,
                          incubate_before, temperature, gain))
 
@@ -3951,8 +4555,8 @@ class Protocol(object):
         if incubate_before:
             check_valid_incubate_params(incubate_before)
 
-        self.instructions.append(Luminescence(ref, wells, dataref,
-                                              incubate_before, temperature))
+        self._append(Luminescence(ref, wells, dataref,
+                                  incubate_before, temperature))
 
     def gel_separate(self, wells, volume, matrix, ladder, duration, dataref):
         """
@@ -4034,8 +4638,8 @@ class Protocol(object):
                                   duration, "%s_%d" % (dataref, datarefs))
                 datarefs += 1
         else:
-            self.instructions.append(GelSeparate(wells, volume, matrix, ladder,
-                                                 duration, dataref))
+            self._append(GelSeparate(wells, volume, matrix, ladder,
+                                     duration, dataref))
 
     def gel_purify(self, extracts, volume, matrix, ladder, dataref):
         """
@@ -4276,7 +4880,7 @@ class Protocol(object):
                     ext["lane"] = e["lane"]
                     pe_unpacked.append(ext)
 
-            self.instructions.append(
+            self._append(
                 GelPurify(samples, volume, matrix, ladder, dataref_gel, pe_unpacked))
 
     def seal(self, ref, type=None):
@@ -4339,7 +4943,7 @@ class Protocol(object):
             raise RuntimeError("A container cannot be sealed over a lid.")
         if not ref.is_sealed():
             ref.cover = type
-            self.instructions.append(Seal(ref, type))
+            self._append(Seal(ref, type))
 
     def unseal(self, ref):
         """
@@ -4396,7 +5000,7 @@ class Protocol(object):
                                "use the instruction uncover.")
         if ref.is_sealed():
             ref.cover = None
-            self.instructions.append(Unseal(ref))
+            self._append(Unseal(ref))
 
     def cover(self, ref, lid=None):
         """
@@ -4458,7 +5062,7 @@ class Protocol(object):
             raise RuntimeError("A container cannot be covered over a seal.")
         if not ref.is_covered():
             ref.cover = lid
-            self.instructions.append(Cover(ref, lid))
+            self._append(Cover(ref, lid))
 
     def uncover(self, ref):
         """
@@ -4514,7 +5118,7 @@ class Protocol(object):
                                "use the instruction unseal.")
         if ref.is_covered():
             ref.cover = None
-            self.instructions.append(Uncover(ref))
+            self._append(Uncover(ref))
 
     def flow_analyze(self, dataref, FSC, SSC, neg_controls, samples,
                      colors=None, pos_controls=None):
@@ -4818,8 +5422,8 @@ class Protocol(object):
                                              "`excitation_wavelength`.")
 
         [self._remove_cover(s["well"].container, "flow_analyze") for s in sources]
-        self.instructions.append(FlowAnalyze(dataref, FSC, SSC, neg_controls,
-                                             samples, colors, pos_controls))
+        self._append(FlowAnalyze(dataref, FSC, SSC, neg_controls,
+                                 samples, colors, pos_controls))
 
     def oligosynthesize(self, oligos):
         """
@@ -4880,7 +5484,7 @@ class Protocol(object):
                     ...
                 ]
         """
-        self.instructions.append(Oligosynthesize(oligos))
+        self._append(Oligosynthesize(oligos))
 
     def spread(self, source, dest, volume):
         """
@@ -4943,13 +5547,10 @@ class Protocol(object):
         self._remove_cover(source.container, "spread")
         self._remove_cover(dest.container, "spread")
         volume = Unit.fromstring(volume)
-        if dest.volume:
-            dest.volume += volume
-        else:
-            dest.volume = volume
-        if source.volume:
-            source.volume -= volume
-        self.instructions.append(Spread(source, dest, volume))
+        vol_pl = _volume_to_pl(volume)
+        dest._add_volume(vol_pl)
+        source._remove_volume(vol_pl)
+        self._append(Spread(source, dest, volume))
 
     def autopick(self, sources, dests, min_abort=0, criteria={},
                  dataref="autopick", newpick=False):
@@ -5008,9 +5609,10 @@ class Protocol(object):
                 self.instructions[-1].criteria == criteria and
                 self.instructions[-1].groups[0]['from'][0].container ==
                 sources[0].container):
-            self.instructions[-1].groups.extend(group)
+            self.instructions[-1].groups.extend(
+                self.instructions[-1]._track(group))
         else:
-            self.instructions.append(Autopick(group, criteria, dataref))
+            self._append(Autopick(group, criteria, dataref))
 
     def mag_dry(self, head, container, duration, new_tip=False,
                 new_instruction=False):
@@ -5462,7 +6064,7 @@ class Protocol(object):
             Name of data reference of resulting image
 
         """
-        self.instructions.append(ImagePlate(ref, mode, dataref))
+        self._append(ImagePlate(ref, mode, dataref))
 
     def provision(self, resource_id, dests, volumes):
         """
@@ -5528,8 +6130,8 @@ class Protocol(object):
             xfer["well"] = d
             xfer["volume"] = v
 
-            if d.volume:
-                d.volume += v
+            if d._volume:
+                d._add_volume(_volume_to_pl(v))
             else:
                 d.set_volume(v)
             dest_group.append(xfer)
@@ -5537,9 +6139,10 @@ class Protocol(object):
             if (self.instructions and self.instructions[-1].op == "provision" and
                     self.instructions[-1].resource_id == resource_id and
                     self.instructions[-1].to[-1]["well"].container == d.container):
-                self.instructions[-1].to.append(xfer)
+                self.instructions[-1].to.append(
+                    self.instructions[-1]._track(xfer))
             else:
-                self.instructions.append(Provision(resource_id, dest_group))
+                self._append(Provision(resource_id, dest_group))
 
     def flash_freeze(self, container, duration):
         """
@@ -5586,31 +6189,49 @@ class Protocol(object):
 
         """
 
-        self.instructions.append(FlashFreeze(container, duration))
+        self._append(FlashFreeze(container, duration))
 
     def _ref_for_well(self, well):
         return "%s/%d" % (self._ref_for_container(well.container), well.index)
 
     def _ref_for_container(self, container):
+        name = self._container_refs.get(container)
+        ref = self.refs.get(name)
+        if ref is not None and ref.container is container:
+            return name
+        # Refs passed to the constructor or added to self.refs directly are
+        # not in the reverse index yet
         for k in self.refs:
             v = self.refs[k]
             if v.container is container:
+                self._container_refs[container] = k
                 return k
 
     @staticmethod
-    def fill_wells(dst_group, src_group, volume, distribute_target=None, dispense_speed=None):
+    def fill_wells(dst_group, src_group, volume, distribute_target=None,
+                   dispense_speed=None, policy="first_fit"):
         """
         Distribute liquid to a WellGroup, sourcing the liquid from a group
         of wells all containing the same substance.
 
+        Each source well is used for as many destination wells as it holds
+        liquid for, then the next source is chosen according to policy, see
+        :class:`autoprotocol.planning.SourceAllocator`.
+
         Parameters
         ----------
         dst_group : WellGroup
             WellGroup to distribute liquid to
         src_group : WellGroup
             WellGroup containing the substance to be distributed
-        volume : str, Unit
-            volume of liquid to be distributed to each destination well
+        volume : str, Unit, list, UnitArray
+            volume of liquid to be distributed to each destination well, or a
+            list of volumes corresponding to the destination wells
+        policy : str, optional
+            "first_fit" (the first source well with enough liquid),
+            "best_fit" (the source well with the least liquid that is
+            enough) or "least_sources" (the source well with the most
+            liquid)
 
         Returns
         -------
@@ -5628,28 +6249,49 @@ class Protocol(object):
 
         """
 
-        src = None
         distributes = []
         src_group = WellGroup(src_group)
         dst_group = WellGroup(dst_group)
-        if isinstance(volume, list):
+        if isinstance(volume, (list, UnitArray)):
             if len(volume) != len(dst_group.wells):
                 raise RuntimeError("List length of volumes provided for "
                                    "distribution does not match the number of "
                                    " destination wells")
-            volume = [Unit.fromstring(x) for x in volume]
+            if isinstance(volume, UnitArray):
+                volume = volume.to("microliter")
+                steps = list(zip(volume._elements(), volume._picoliters()))
+            else:
+                # Each distinct volume is converted once
+                converted = {}
+                steps = []
+                for v in volume:
+                    v = Unit.fromstring(v)
+                    key = (v.magnitude, v.unit)
+                    if key not in converted:
+                        v_ul = v.to("ul")
+                        converted[key] = (v_ul, _volume_to_pl(v_ul))
+                    steps.append(converted[key])
         else:
-            volume = [Unit.fromstring(volume)] * len(dst_group.wells)
-        for d, v in list(zip(dst_group.wells, volume)):
-            v = v.to("ul")
-            if len(distributes) == 0 or src.volume < v:
-                # find a src well with enough volume
-                src = next(
-                    (w for w in src_group.wells if w.volume >= v), None)
-                if src is None:
-                    raise RuntimeError(
-                        "no well in source group has more than %s %s(s)" %
-                        (str(v).rsplit(":")[0], str(v).rsplit(":")[1]))
+            v_ul = Unit.fromstring(volume).to("ul")
+            steps = [(v_ul, _volume_to_pl(v_ul))] * len(dst_group.wells)
+        sources = []
+        source_index = {}
+        for w in src_group.wells:
+            key = (w.container, w.index)
+            if key not in source_index:
+                source_index[key] = len(sources)
+                sources.append(w)
+        allocator = SourceAllocator([w._volume for w in sources], policy)
+        current = None
+        for d, (v, v_pl) in list(zip(dst_group.wells, steps)):
+            i = allocator.allocate(v_pl)
+            if i is None:
+                raise RuntimeError(
+                    "no well in source group has more than %s %s(s)" %
+                    (str(v).rsplit(":")[0], str(v).rsplit(":")[1]))
+            if i != current:
+                current = i
+                src = sources[i]
                 distributes.append({
                     "from": src,
                     "to": []
@@ -5663,22 +6305,95 @@ class Protocol(object):
             if dispense_speed:
                 opts["dispense_speed"] = dispense_speed
             distributes[-1]["to"].append(opts)
-            src.volume -= v
-            if d.volume:
-                d.volume += v
-            else:
-                d.volume = v
+            src._volume -= v_pl
+            d._add_volume(v_pl)
+            filled = source_index.get((d.container, d.index))
+            if filled is not None:
+                allocator.add(filled, v_pl)
         return distributes
 
+    def _append(self, instruction):
+        """Append an instruction built by the protocol, sealing it so that
+        its serialized form can be cached
+
+        """
+        instruction._seal()
+        self.instructions.append(instruction)
+
     def _pipette(self, groups):
         """Append given pipette groups to the protocol
 
         """
         if len(self.instructions) > 0 and \
                 self.instructions[-1].op == 'pipette':
-            self.instructions[-1].groups += groups
+            self.instructions[-1].groups += self.instructions[-1]._track(
+                groups)
         else:
-            self.instructions.append(Pipette(groups))
+            self._append(Pipette(groups))
+
+    def _pool_sources(self, source, dest, volume, volume_pl, step_pl=1):
+        """Split the volumes for dest among the wells of source, which all
+        contain the same substance, see planning.pool_sources
+
+        Returns the source wells, destination wells, volumes and volumes in
+        picoliters of each transfer step.
+
+        """
+        source_pl = [s._volume for s in source.wells]
+        if any(pl is None for pl in source_pl):
+            raise RuntimeError("When transferring liquid from multiple "
+                               "wells containing the same substance to "
+                               "multiple other wells, each source Well "
+                               "must have a volume attribute (aliquot) "
+                               "associated with it.")
+        plan = pool_sources(source_pl, volume_pl, step_pl)
+        if plan.direct:
+            return (WellGroup(source.wells[:len(dest.wells)]), dest, volume,
+                    volume_pl)
+        units = {}
+        volumes = []
+        for pl in plan.volumes:
+            v = units.get(pl)
+            if v is None:
+                v = units[pl] = _pl_to_volume(pl)
+            volumes.append(v)
+        return (WellGroup([source.wells[i] for i in plan.sources]),
+                WellGroup([dest.wells[j] for j in plan.dests]), volumes,
+                plan.volumes)
+
+    def _tip_capacity(self, tip_type, capacity=None):
+        """Volume held by a tip, as a microliter Unit and in picoliters,
+        given explicitly or by the capacity of tip_type
+
+        """
+        if capacity is None:
+            capacity = self.tip_capacity(tip_type)
+        capacity_pl = _volume_to_pl(capacity)
+        if capacity_pl <= 0:
+            raise ValueError("Tip capacity must be positive, not %s." %
+                             capacity)
+        return _pl_to_volume(capacity_pl), capacity_pl
+
+    def _tip_groups(self, opts, contaminates, one_source=False):
+        """Split transfer steps into runs that can share one tip
+
+        A run continues while the steps aspirate from the same source well,
+        or from any source well if one_source is True, and ends after a step
+        that may have contaminated the tip.
+
+        """
+        groups = []
+        source = None
+        clean = False
+        for xfer, contaminated in zip(opts, contaminates):
+            s = xfer["from"]
+            key = None if one_source else (s.container, s.index)
+            if not clean or key != source:
+                groups.append([])
+                source = key
+            groups[-1].append(xfer)
+            clean = not contaminated
+        return groups
 
     def _remove_cover(self, container, action):
         if not container.container_type.is_tube:
@@ -5738,17 +6453,18 @@ class Protocol(object):
                 self.instructions[-1].op == "magnetic_transfer" and
                 self.instructions[-1].magnetic_head == head):
             if self._count_mag_containers(mag, new_tip) <= max_containers:
+                last = self.instructions[-1]
                 if not new_tip:
-                    self.instructions[-1].groups[-1].append({name: mag})
+                    last.groups[-1].append(last._track({name: mag}))
                 elif new_tip:
-                    self.instructions[-1].groups.append([{name: mag}])
+                    last.groups.append(last._track([{name: mag}]))
             elif self._count_mag_containers(mag, new_tip) > max_containers:
                 raise RuntimeError("Error with magnetic_transfer: Only 8 "
                                    "containers and tips are allowed per "
                                    "magnetic transfer instruction. Please "
                                    "specify a new instruction")
         else:
-            self.instructions.append(MagneticTransfer([[{name: mag}]], head))
+            self._append(MagneticTransfer([[{name: mag}]], head))
 
     def _count_mag_containers(self, mag, new_tip):
         """
@@ -5784,9 +6500,9 @@ class Protocol(object):
         Autoprotocol compliant objects
 
         """
-        if type(op_data) is dict:
+        if type(op_data) is dict or type(op_data) is _TrackedDict:
             return {k: self._refify(v) for k, v in op_data.items()}
-        elif type(op_data) is list:
+        elif type(op_data) is list or type(op_data) is _TrackedList:
             return [self._refify(i) for i in op_data]
         elif isinstance(op_data, Well):
             return self._ref_for_well(op_data)
@@ -5797,12 +6513,58 @@ class Protocol(object):
         elif isinstance(op_data, Unit):
             return str(op_data)
         elif isinstance(op_data, Instruction):
-            return self._refify(op_data.data)
+            return self._refify_instruction(op_data)
         elif isinstance(op_data, Ref):
             return op_data.opts
         else:
             return op_data
 
+    def _refify_instruction(self, instruction, store=True):
+        # The cached form is reused while the instruction and refs versions
+        # are unchanged, and shared by every caller.  Unless store is True,
+        # nothing new is cached
+        stamp = (instruction._version, self._refs_version)
+        cached = self._refified.get(instruction)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        refified = self._refify(instruction.data)
+        if store and instruction._cacheable:
+            self._refified[instruction] = (stamp, refified)
+        return refified
+
+    def _refify_instructions(self):
+        # The whole list is reused while no instruction has been edited and
+        # the instructions and refs are unchanged, so that serializing an
+        # unchanged protocol again does not visit each instruction
+        stamp = (Instruction._edits, self._refs_version)
+        cached = self._refified_list
+        if (cached is not None and cached[0] == stamp and
+                cached[1] == self.instructions):
+            return cached[2]
+        refified = [self._refify_instruction(i) for i in self.instructions]
+        if all(i._cacheable for i in self.instructions):
+            self._refified_list = (stamp, list(self.instructions), refified)
+        else:
+            self._refified_list = None
+        return refified
+
+    def _check_refs(self):
+        # Detects any change to the refs, including ones made to self.refs
+        # or to a Ref directly rather than through ref()
+        signature = [(name, ref.container) for name, ref in self.refs.items()]
+        old = self._refs_signature
+        if len(signature) != len(old) or any(
+                name != old_name or cont is not old_cont
+                for (name, cont), (old_name, old_cont) in zip(signature, old)):
+            self._refs_version += 1
+            self._refs_signature = signature
+
+    def _prune_refified(self):
+        # Drops cached instructions no longer part of the protocol
+        if len(self._refified) > len(self.instructions):
+            self._refified = {i: self._refified[i] for i in self.instructions
+                              if i in self._refified}
+
     def _ref_containers_and_wells(self, params):
         """
         Used by harness.run() to process JSON container and well references
@@ -5973,8 +6735,8 @@ class Protocol(object):
             raise TypeError("Wells must be of type Well, list of Wells, or "
                             "WellGroup.")
         wells = WellGroup(wells)
-        self.instructions.append(MeasureConcentration(wells, volume, dataref,
-                                                      measurement))
+        self._append(MeasureConcentration(wells, volume, dataref,
+                                          measurement))
 
     def measure_mass(self, containers, dataref):
         """
@@ -6032,7 +6794,7 @@ class Protocol(object):
         else:
             raise TypeError("Only Container or list of Container allowed")
 
-        self.instructions.append(MeasureMass(containers, dataref))
+        self._append(MeasureMass(containers, dataref))
 
     def measure_volume(self, wells, dataref):
         """
@@ -6085,4 +6847,4 @@ class Protocol(object):
             raise TypeError("Wells must be of type Well, list of Wells, or "
                             "WellGroup.")
         wells = WellGroup(wells)
-        self.instructions.append(MeasureVolume(wells, dataref))
+        self._append(MeasureVolume(wells, dataref))
@@ -1,7 +1,12 @@
 from __future__ import division, print_function
 from pint import UnitRegistry
 from pint.quantity import _Quantity
-from math import ceil as math_ceil, floor as math_floor
+from pint.util import to_units_container
+from array import array
+from collections import OrderedDict
+from math import ceil as math_ceil, floor as math_floor, fsum as math_fsum, \
+    copysign as math_copysign
+import operator
 import sys
 
 if sys.version_info[0] >= 3:
@@ -16,22 +21,204 @@ else:
 
 """
 
-# Preload UnitRegistry (Use default Pints definition file as a base)
-_UnitRegistry = UnitRegistry()
+"""The shared UnitRegistry, built on first use by _get_registry()"""
+_UnitRegistry = None
 
-"""Map string representation of Pint units over to Autoprotocol format"""
-# Map Temperature Unit names
-_UnitRegistry._units["degC"]._name = "celsius"
-_UnitRegistry._units["celsius"]._name = "celsius"
-_UnitRegistry._units["degF"]._name = "fahrenheit"
-_UnitRegistry._units["fahrenheit"]._name = "fahrenheit"
-_UnitRegistry._units["degR"]._name = "rankine"
-_UnitRegistry._units["rankine"]._name = "rankine"
-# Map Speed Unit names
-_UnitRegistry._units["revolutions_per_minute"]._name = "rpm"
 
-"""Add support for Molarity Unit"""
-_UnitRegistry.define('molar = mole/liter = M')
+def _get_registry():
+    """
+    Return the UnitRegistry shared by all Units, building it the first time
+    it is needed.  Pint's default definitions take a noticeable amount of
+    time to load, so the registry is not built when autoprotocol is
+    imported.
+
+    """
+    global _UnitRegistry
+    if _UnitRegistry is None:
+        # Use default Pints definition file as a base
+        registry = UnitRegistry()
+
+        # Map string representation of Pint units over to Autoprotocol format
+        # Map Temperature Unit names
+        registry._units["degC"]._name = "celsius"
+        registry._units["celsius"]._name = "celsius"
+        registry._units["degF"]._name = "fahrenheit"
+        registry._units["fahrenheit"]._name = "fahrenheit"
+        registry._units["degR"]._name = "rankine"
+        registry._units["rankine"]._name = "rankine"
+        # Map Speed Unit names
+        registry._units["revolutions_per_minute"]._name = "rpm"
+
+        # Add support for Molarity Unit
+        registry.define('molar = mole/liter = M')
+        _UnitRegistry = registry
+    return _UnitRegistry
+
+
+class _LRUCache(object):
+    """
+    A small bounded mapping which evicts the least recently used entry once
+    more than `maxsize` entries are stored.  A `maxsize` of 0 disables
+    caching entirely.
+
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            return default
+        self._data[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data.pop(key, None)
+        self._data[key] = value
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+
+"""Interned Units keyed by their constructor arguments, e.g. "10:microliter"
+or (10, "microliter")"""
+_UNIT_CACHE = _LRUCache(4096)
+
+"""Autoprotocol unit names keyed by Pint UnitsContainer"""
+_UNIT_NAME_CACHE = _LRUCache(1024)
+
+"""Serialized "value:unit" strings keyed by (magnitude type, magnitude,
+UnitsContainer)"""
+_UNIT_STR_CACHE = _LRUCache(8192)
+
+
+def _unit_cache_key(value, units):
+    """
+    Return the key under which a Unit built from (value, units) is interned,
+    or None if the arguments are not eligible for interning.
+
+    """
+    if isinstance(units, string_type):
+        if isinstance(value, string_type):
+            return (value, units)
+        if isinstance(value, (int, float)):
+            # -0.0 == 0 but must not be interned as the same Unit
+            if value == 0 and math_copysign(1, value) < 0:
+                return None
+            return (value, units)
+    elif not units and isinstance(value, string_type):
+        return value
+    return None
+
+
+"""Pint UnitsContainers keyed by unit name, e.g. "microliter" """
+_UNITS_CONTAINER_CACHE = {}
+
+"""Multiplicative conversion factors keyed by (source, target) UnitsContainer
+pairs.  A factor of None marks pairs Pint has to convert itself (offset
+units such as celsius, or incompatible dimensions)"""
+_CONVERSION_FACTORS = {}
+
+"""Units Autoprotocol commonly converts between, grouped by dimension.  The
+conversion factors between all units of a group are computed together the
+first time any conversion is looked up."""
+_COMMON_UNITS = [
+    ["picoliter", "nanoliter", "microliter", "milliliter", "liter"],
+    ["microsecond", "millisecond", "second", "minute", "hour"],
+    ["celsius", "kelvin", "fahrenheit"],
+    ["nanoliter/second", "microliter/second", "milliliter/second"],
+    ["meter/second**2", "standard_gravity"],
+]
+
+
+def _units_container(units):
+    """
+    Return the Pint UnitsContainer for a unit name, UnitsContainer or
+    Quantity, parsing each unit name only once.
+
+    """
+    if isinstance(units, string_type):
+        container = _UNITS_CONTAINER_CACHE.get(units)
+        if container is None:
+            container = to_units_container(units, _get_registry())
+            _UNITS_CONTAINER_CACHE[units] = container
+        return container
+    return to_units_container(units, _get_registry())
+
+
+def _compute_conversion_factor(src, dst):
+    registry = _get_registry()
+    if src == dst:
+        return 1
+    try:
+        if (registry._validate_and_extract(src) or
+                registry._validate_and_extract(dst)):
+            return None
+        if (registry._get_dimensionality(src) !=
+                registry._get_dimensionality(dst)):
+            return None
+    except ValueError:
+        return None
+    return registry._get_root_units(src / dst)[0]
+
+
+def _preload_conversion_factors():
+    for group in _COMMON_UNITS:
+        containers = [_units_container(name) for name in group]
+        for src in containers:
+            for dst in containers:
+                _CONVERSION_FACTORS[(src, dst)] = \
+                    _compute_conversion_factor(src, dst)
+
+
+def _conversion_factor(src, dst):
+    """
+    Return the multiplicative factor converting a magnitude in `src` units
+    into `dst` units, or None if the conversion has to go through Pint.
+
+    Parameters
+    ----------
+    src : UnitsContainer
+        Units being converted from.
+    dst : UnitsContainer
+        Units being converted to.
+
+    """
+    if not _CONVERSION_FACTORS:
+        _preload_conversion_factors()
+    key = (src, dst)
+    try:
+        return _CONVERSION_FACTORS[key]
+    except KeyError:
+        factor = _compute_conversion_factor(src, dst)
+        _CONVERSION_FACTORS[key] = factor
+        return factor
+
+
+def _unit_name(unit_container):
+    """
+    Return the Pint string representation of a UnitsContainer
+    (e.g. "microliter / second"), formatting each distinct container once.
+
+    """
+    name = _UNIT_NAME_CACHE.get(unit_container)
+    if name is None:
+        name = str(_get_registry().Unit(unit_container))
+        _UNIT_NAME_CACHE[unit_container] = name
+    return name
 
 
 class UnitError(Exception):
@@ -72,6 +259,11 @@ class Unit(_Quantity):
     there are inherent issues when dealing with extremely large/small
     numbers as well as numerical rounding for non-base 2 numbers.
 
+    Units constructed from a string (ex. "10:microliter") or from a value and
+    a unit name are interned: parsing the same arguments again returns the
+    same, immutable, Unit object.  Derive new Units through arithmetic or
+    `to()` instead of modifying a Unit in place.
+
     Example
     -------
 
@@ -98,13 +290,22 @@ class Unit(_Quantity):
     """
 
     def __new__(cls, value, units=None):
-        cls._REGISTRY = _UnitRegistry
-        cls.force_ndarray = False
-
         # Automatically return Unit if Unit is provided
         if isinstance(value, Unit):
             return value
 
+        # Return the interned Unit if these arguments were parsed before
+        try:
+            key = _unit_cache_key(value, units)
+            cached = _UNIT_CACHE.get(key) if key is not None else None
+        except TypeError:
+            key, cached = None, None
+        if cached is not None:
+            return cached
+
+        cls._REGISTRY = _get_registry()
+        cls.force_ndarray = False
+
         # Automatically parse String if no units provided
         if not units and isinstance(value, string_type):
             try:
@@ -112,15 +313,89 @@ class Unit(_Quantity):
             except ValueError:
                 raise UnitStringError(value)
         try:
-            return super(Unit, cls).__new__(cls, float(value), units)
+            inst = super(Unit, cls).__new__(cls, float(value), units)
         except ValueError:
             raise UnitValueError(value)
         except AttributeError:
             raise UnitAttributeError(value)
+        inst.unit = _unit_name(inst._units)
+
+        if key is not None:
+            inst._interned = True
+            _UNIT_CACHE[key] = inst
+        return inst
 
     def __init__(self, value, units=None):
-        super(Unit, self).__init__()
-        self.unit = self.units.__str__()
+        # All state is set up in __new__ so that interned Units returned from
+        # the cache are not re-initialized on every construction.
+        pass
+
+    @classmethod
+    def _shared(cls, magnitude, units):
+        """
+        Build an immutable Unit from a float magnitude and a UnitsContainer
+        without adding it to the interning cache, for Units shared between
+        the elements of a UnitArray.
+
+        """
+        cls._REGISTRY = _get_registry()
+        cls.force_ndarray = False
+        inst = super(Unit, cls).__new__(cls, magnitude, units)
+        inst.unit = _unit_name(inst._units)
+        inst._interned = True
+        return inst
+
+    def __setattr__(self, name, value):
+        """
+        Interned Units are shared by every caller which parsed the same
+        arguments, so their magnitude and units may not be modified in place.
+
+        """
+        if name in ("_magnitude", "_units", "unit") and \
+                self.__dict__.get("_interned"):
+            raise AttributeError("Unit %s is immutable; use arithmetic or "
+                                 "to() to derive a new Unit." % self)
+        super(Unit, self).__setattr__(name, value)
+
+    def to(self, other=None, *contexts, **ctx_kwargs):
+        """
+        Return this Unit converted to the units given.  Conversions between
+        multiplicative units use a cached conversion factor, all others are
+        delegated to Pint.
+
+        Parameters
+        ----------
+        other : str, Unit
+            Units to convert to, e.g. "microliter".
+
+        """
+        if contexts or ctx_kwargs:
+            return super(Unit, self).to(other, *contexts, **ctx_kwargs)
+        other = _units_container(other)
+        factor = _conversion_factor(self._units, other)
+        if factor is None:
+            return super(Unit, self).to(other)
+        return self.__class__(self._magnitude * factor, other)
+
+    def _convert_magnitude_not_inplace(self, other, *contexts, **ctx_kwargs):
+        if not (contexts or ctx_kwargs):
+            factor = _conversion_factor(self._units, _units_container(other))
+            if factor is not None:
+                return self._magnitude * factor
+        return super(Unit, self)._convert_magnitude_not_inplace(
+            other, *contexts, **ctx_kwargs)
+
+    def compare(self, other, op):
+        """
+        Compares two Units, converting `self` into the units of `other`
+        through the cached conversion factor where possible.
+
+        """
+        if isinstance(other, Unit) and self._units != other._units:
+            factor = _conversion_factor(self._units, other._units)
+            if factor is not None:
+                return op(self._magnitude * factor, other._magnitude)
+        return super(Unit, self).compare(other, op)
 
     @staticmethod
     def fromstring(s):
@@ -153,8 +428,25 @@ class Unit(_Quantity):
 
     def __str__(self):
         """Returns string formatted unit"""
-        return ":".join([str(self._magnitude),
-                        "^".join(self.unit.split("**"))]).replace(" ", "")
+        s = self.__dict__.get("_str")
+        if s is not None:
+            return s
+        magnitude = self._magnitude
+        # 0.0 and -0.0 compare equal but serialize differently
+        key = (type(magnitude), magnitude, self._units) if magnitude else None
+        try:
+            s = _UNIT_STR_CACHE.get(key) if key else None
+        except TypeError:
+            key, s = None, None
+        if s is None:
+            s = ":".join([str(magnitude),
+                          "^".join(self.unit.split("**"))]).replace(" ", "")
+            if key:
+                _UNIT_STR_CACHE[key] = s
+        if self.__dict__.get("_interned"):
+            # Interned Units cannot change, so keep their string with them
+            self._str = s
+        return s
 
     def __repr__(self):
         """Returns Unit representation"""
@@ -195,3 +487,319 @@ class Unit(_Quantity):
             The unit rounded down to the nearest integer
         """
         return Unit(math_floor(self.magnitude), self.unit)
+
+
+"""Integer picoliters, and whether the volume was a whole number of them,
+keyed by (magnitude, unit name) of a volume Unit"""
+_PICOLITER_CACHE = _LRUCache(4096)
+
+"""Largest error, relative to the volume, still considered a whole number
+of picoliters, allowing for floating point error in unit conversion"""
+_PICOLITER_TOLERANCE = 1e-9
+
+"""Picoliters in each unit that _pl_to_volume() converts to"""
+_PICOLITERS_PER = {"microliter": 10 ** 6, "nanoliter": 10 ** 3}
+
+
+def _whole_pl(magnitude):
+    # The nearest picoliter to a magnitude in picoliters, or None if the
+    # magnitude is not a whole number of picoliters
+    pl = int(round(magnitude))
+    if abs(magnitude - pl) <= _PICOLITER_TOLERANCE * max(abs(magnitude), 1):
+        return pl
+    return None
+
+
+def _pl_lookup(volume):
+    volume = Unit.fromstring(volume)
+    key = (volume._magnitude, volume.unit)
+    cached = _PICOLITER_CACHE.get(key)
+    if cached is None:
+        magnitude = volume.to("picoliter")._magnitude
+        cached = _PICOLITER_CACHE[key] = (int(round(magnitude)),
+                                          _whole_pl(magnitude) is not None)
+    return cached
+
+
+def _volume_to_pl(volume):
+    """
+    Convert a volume into an integer number of picoliters, the fixed-point
+    representation used for well volume accounting.
+
+    Parameters
+    ----------
+    volume : str, Unit
+        Volume to be converted, e.g. "10:microliter".
+
+    Returns
+    -------
+    int
+        The volume rounded to the nearest picoliter.
+
+    """
+    return _pl_lookup(volume)[0]
+
+
+def _exact_pl(volume):
+    """
+    Convert a volume into an integer number of picoliters without rounding.
+
+    Parameters
+    ----------
+    volume : str, Unit
+        Volume to be converted, e.g. "25:nanoliter".
+
+    Returns
+    -------
+    int or None
+        The volume in picoliters, or None if it is not a whole number of
+        picoliters.
+
+    """
+    pl, whole = _pl_lookup(volume)
+    return pl if whole else None
+
+
+def _pl_to_volume(pl, units="microliter"):
+    """
+    Convert an integer number of picoliters back into a microliter, or
+    nanoliter, Unit.
+
+    """
+    return Unit(pl / _PICOLITERS_PER[units], units)
+
+
+class UnitArray(object):
+    """
+    A sequence of magnitudes which share a single unit, for use wherever a
+    list of volumes (or other quantities) would otherwise be built up one
+    `Unit` at a time.
+
+    Magnitudes are stored in a compact ``array('d')`` and conversions,
+    comparisons, sums and remainders are applied to the whole array using a
+    single conversion factor.  Indexing or iterating over a UnitArray
+    returns individual, immutable Units, which are not interned.  Protocol
+    methods accepting a UnitArray of volumes convert it to picoliters in
+    bulk rather than one Unit at a time.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        volumes = UnitArray([0.005, 0.01, 0.015], "milliliter")
+        volumes.to("microliter")
+        volumes.sum()
+        volumes < "12:microliter"
+        UnitArray(["5:microliter", "0.01:milliliter"])
+
+    Returns:
+
+    .. code-block:: python
+
+        UnitArray([5.0, 10.0, 15.0], 'microliter')
+        Unit(0.03, 'milliliter')
+        [True, True, False]
+        UnitArray([5.0, 10.0], 'microliter')
+
+    Parameters
+    ----------
+    values : list(int or float) or list(str or Unit) or UnitArray
+        Magnitudes in `units`, or Units (or strings in the format of
+        "value:unit") which are converted into `units`.
+    units : str, optional
+        Unit of the array.  Defaults to the unit of the first element when
+        `values` holds Units or strings.
+
+    Raises
+    ------
+    ValueError
+        If `units` is not specified and cannot be inferred from `values`.
+
+    """
+
+    def __init__(self, values, units=None):
+        if isinstance(values, UnitArray):
+            if units is None:
+                units = values.unit
+            values = values.to(units)
+            self._units = values._units
+            self.magnitudes = array("d", values.magnitudes)
+            return
+        values = list(values)
+        if values and isinstance(values[0], (string_type, Unit)):
+            values = [Unit.fromstring(v) for v in values]
+            if units is None:
+                units = values[0].unit
+            container = _units_container(units)
+            self.magnitudes = array(
+                "d", (v._convert_magnitude_not_inplace(container)
+                      for v in values)
+            )
+        else:
+            if units is None:
+                raise ValueError("Units must be specified for a UnitArray of "
+                                 "plain magnitudes.")
+            container = _units_container(units)
+            self.magnitudes = array("d", values)
+        self._units = container
+
+    @property
+    def unit(self):
+        """str: Name of the unit shared by all elements"""
+        return _unit_name(self._units)
+
+    def __len__(self):
+        return len(self.magnitudes)
+
+    def __iter__(self):
+        return iter(self._elements())
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self._new(self.magnitudes[item], self._units)
+        return Unit._shared(self.magnitudes[item], self._units)
+
+    def __repr__(self):
+        return "UnitArray({0}, '{1}')".format(list(self.magnitudes),
+                                              self.unit)
+
+    def __eq__(self, other):
+        if not isinstance(other, UnitArray) or len(self) != len(other):
+            return False
+        try:
+            other = other.to(self._units)
+        except Exception:
+            return False
+        return self.magnitudes == other.magnitudes
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    @classmethod
+    def _new(cls, magnitudes, units):
+        inst = cls.__new__(cls)
+        inst.magnitudes = magnitudes
+        inst._units = units
+        return inst
+
+    def _factor_to(self, units):
+        container = _units_container(units)
+        return container, _conversion_factor(self._units, container)
+
+    def to(self, units):
+        """
+        Return this UnitArray converted to the units given.
+
+        Parameters
+        ----------
+        units : str
+            Units to convert to, e.g. "nanoliter".
+
+        """
+        container, factor = self._factor_to(units)
+        if factor is None:
+            # Offset units and incompatible dimensions are handled by Pint
+            magnitudes = array("d", (
+                Unit(m, self.unit)._convert_magnitude_not_inplace(container)
+                for m in self.magnitudes
+            ))
+        elif factor == 1:
+            magnitudes = array("d", self.magnitudes)
+        else:
+            magnitudes = array("d", (m * factor for m in self.magnitudes))
+        return self._new(magnitudes, container)
+
+    def _other_magnitudes(self, other):
+        # Magnitudes of `other` in the units of this array, broadcasting
+        # scalars over the length of the array
+        if isinstance(other, UnitArray):
+            if len(other) != len(self):
+                raise ValueError("UnitArrays must be the same length, got "
+                                 "%d and %d." % (len(self), len(other)))
+            return other.to(self._units).magnitudes
+        other = Unit.fromstring(other)
+        magnitude = other._convert_magnitude_not_inplace(self._units)
+        return [magnitude] * len(self)
+
+    def _compare(self, other, op):
+        return [op(m, o) for m, o in
+                zip(self.magnitudes, self._other_magnitudes(other))]
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    def __mod__(self, other):
+        """
+        Element-wise remainder of dividing each element by `other`, in the
+        units of this array.
+
+        """
+        return self._new(
+            array("d", (m % o for m, o in
+                        zip(self.magnitudes, self._other_magnitudes(other)))),
+            self._units
+        )
+
+    def sum(self):
+        """
+        Returns
+        -------
+        Unit
+            The sum of all elements in the units of this array.
+
+        """
+        return Unit(math_fsum(self.magnitudes), self.unit)
+
+    def _elements(self):
+        """
+        Returns
+        -------
+        list(Unit)
+            The elements of this array, sharing one immutable Unit between
+            elements of equal magnitude.  The Units are not interned, so
+            large arrays do not evict other Units from the interning cache.
+
+        """
+        shared = {}
+        elements = []
+        for m in self.magnitudes:
+            # 0.0 and -0.0 compare equal but serialize differently
+            key = m if m else (m, math_copysign(1, m))
+            unit = shared.get(key)
+            if unit is None:
+                unit = shared[key] = Unit._shared(m, self._units)
+            elements.append(unit)
+        return elements
+
+    def _picoliters(self):
+        """
+        Returns
+        -------
+        list(int)
+            Each volume rounded to the nearest picoliter, as used for well
+            volume accounting.
+
+        """
+        return [int(round(m)) for m in self.to("picoliter").magnitudes]
+
+    def _exact_picoliters(self):
+        """
+        Returns
+        -------
+        list(int or None)
+            Each volume in picoliters, or None where it is not a whole
+            number of picoliters, see _exact_pl().
+
+        """
+        return [_whole_pl(m) for m in self.to("picoliter").magnitudes]
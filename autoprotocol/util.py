@@ -139,7 +139,7 @@ def check_valid_origin(origin, stamp_type, columns, rows):
 
 def check_stamp_append(current_xfer, prev_xfer_list, maxTransfers=3,
                        maxContainers=3,
-                       volumeSwitch=Unit.fromstring("31:microliter")):
+                       volumeSwitch=None):
     """
     Checks whether current stamp can be appended to previous stamp instruction.
     """
@@ -164,6 +164,8 @@ def check_stamp_append(current_xfer, prev_xfer_list, maxTransfers=3,
     # Ensure Instruction contain the same volume type as defined by TCLE
     # Currently volumeSwitch is hardcoded to check against the two tip volume
     # types used in TCLE
+    if volumeSwitch is None:
+        volumeSwitch = Unit(31, "microliter")
     if prev_xfer_list[0]["transfer"][0]["volume"] <= volumeSwitch:
         if current_xfer["transfer"][0]["volume"] > volumeSwitch:
             return False
@@ -0,0 +1,58 @@
+"""
+Benchmarks for the size and speed of the CBOR protocol encoding against
+JSON, for 384-well stamp and acoustic_transfer protocols.
+
+Run from the repository root with::
+
+    python -m benchmarks.cbor_bench
+
+"""
+from __future__ import print_function
+import gzip
+import io
+import json
+import timeit
+
+from autoprotocol.encoding import cbor_dumps, cbor_loads
+from benchmarks.json_bench import build_stamp_protocol, \
+    build_acoustic_protocol
+
+NUMBER = 3
+
+
+def gzipped_size(data):
+    out = io.BytesIO()
+    with gzip.GzipFile(fileobj=out, mode="wb") as f:
+        f.write(data)
+    return len(out.getvalue())
+
+
+def best_ms(fn):
+    return min(timeit.repeat(fn, number=NUMBER, repeat=3)) / NUMBER * 1e3
+
+
+def main():
+    for label, build in [("stamp", build_stamp_protocol),
+                         ("acoustic_transfer", build_acoustic_protocol)]:
+        doc = build().as_dict()
+        data = cbor_dumps(doc)
+        assert json.dumps(cbor_loads(data)) == json.dumps(doc)
+        formats = [
+            ("json indent", lambda: json.dumps(doc, indent=2).encode("utf-8"),
+             lambda s: json.loads(s.decode("utf-8"))),
+            ("json compact",
+             lambda: json.dumps(doc, separators=(",", ":")).encode("utf-8"),
+             lambda s: json.loads(s.decode("utf-8"))),
+            ("cbor", lambda: cbor_dumps(doc), cbor_loads)]
+        print(label)
+        print("  %-12s %10s %10s %10s %10s" %
+              ("format", "bytes", "gzipped", "encode ms", "decode ms"))
+        for name, encode, decode in formats:
+            encoded = encode()
+            print("  %-12s %10d %10d %10.2f %10.2f" %
+                  (name, len(encoded), gzipped_size(encoded), best_ms(encode),
+                   best_ms(lambda: decode(encoded))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmarks for Container construction: time taken and memory allocated
+to reference 96, 384 and 1536-well plates and touch a column of wells.
+
+Run from the repository root with::
+
+    python -m benchmarks.container_bench
+
+"""
+from __future__ import print_function
+import timeit
+
+from autoprotocol.container import Container
+from autoprotocol.container_type import ContainerType, _CONTAINER_TYPES
+from autoprotocol.unit import Unit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# There is no built-in 1536-well ContainerType
+PLATE_1536 = ContainerType(
+    name="1536-well plate", well_count=1536, well_depth_mm=None,
+    well_volume_ul=Unit(10, "microliter"), well_coating=None, sterile=False,
+    is_tube=False, cover_types=[], seal_types=None, capabilities=[],
+    shortname="1536", col_count=48, dead_volume_ul=Unit(1, "microliter"),
+    safe_min_volume_ul=Unit(2, "microliter")
+)
+PLATES = [_CONTAINER_TYPES["96-flat"], _CONTAINER_TYPES["384-flat"],
+          PLATE_1536]
+CONTAINERS = 50
+NUMBER = 20
+
+
+def build(container_type):
+    containers = [Container(None, container_type) for _ in range(CONTAINERS)]
+    for c in containers:
+        c.wells_from(0, container_type.row_count(), columnwise=True)
+    return containers
+
+
+def build_all_wells(container_type):
+    containers = build(container_type)
+    for c in containers:
+        c.all_wells()
+    return containers
+
+
+def set_volumes(container_type):
+    containers = build(container_type)
+    for c in containers:
+        c.all_wells().set_volume("5:microliter")
+    return containers
+
+
+def query_properties(container_type):
+    containers = build(container_type)
+    for c in containers:
+        c.well(0).set_properties({"sample": "s1"})
+        c.all_wells().wells_with("sample")
+    return containers
+
+
+def allocated_kb(func, container_type):
+    tracemalloc.start()
+    try:
+        containers = func(container_type)  # NOQA
+        return tracemalloc.get_traced_memory()[0] / 1024.0
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    print("%d containers per run, touching the first column of each, all of "
+          "their wells, setting the volume of all of their wells, or "
+          "querying their well properties" % CONTAINERS)
+    for container_type in PLATES:
+        for label, func in (("one column", build),
+                            ("all wells", build_all_wells),
+                            ("set volume", set_volumes),
+                            ("wells_with", query_properties)):
+            seconds = min(timeit.repeat(lambda: func(container_type),
+                                        number=NUMBER, repeat=3))
+            line = "%4d wells  %-10s %8.2f ms" % (
+                container_type.well_count, label, seconds / NUMBER * 1e3)
+            if tracemalloc is not None:
+                line += " %10.1f KiB" % allocated_kb(func, container_type)
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmarks for Protocol.fill_wells(): time taken and distribute groups
+produced by each source policy when filling four 384-well plates from a
+source plate whose wells hold different volumes, against the previous
+approach of scanning the source group from the start for every new source.
+
+Run from the repository root with::
+
+    python -m benchmarks.fill_bench
+
+"""
+from __future__ import print_function
+import random
+import timeit
+
+from autoprotocol.container import WellGroup
+from autoprotocol.planning import FILL_POLICIES
+from autoprotocol.protocol import Protocol
+from autoprotocol.unit import Unit, _volume_to_pl
+
+SOURCES = 384
+NUMBER = 3
+
+
+def make_protocol():
+    rnd = random.Random(0)
+    p = Protocol()
+    src = p.ref("src", None, "384-flat", discard=True)
+    dests = [p.ref("dest_%d" % i, None, "384-flat", discard=True)
+             for i in range(4)]
+    for w in src.all_wells().wells:
+        w.set_volume("%d:microliter" % rnd.choice([2, 5, 20, 60, 80]))
+    return src.all_wells(), WellGroup(
+        [w for dest in dests for w in dest.all_wells().wells])
+
+
+def scanning_fill(dst_group, src_group, volume):
+    # fill_wells before the source allocator, kept for comparison
+    src = None
+    distributes = []
+    volume = [Unit.fromstring(volume)] * len(dst_group.wells)
+    for d, v in list(zip(dst_group.wells, volume)):
+        v = v.to("ul")
+        v_pl = _volume_to_pl(v)
+        if len(distributes) == 0 or src._volume < v_pl:
+            src = next(
+                (w for w in src_group.wells
+                 if w._volume is not None and w._volume >= v_pl), None)
+            distributes.append({
+                "from": src,
+                "to": []
+            })
+        distributes[-1]["to"].append({
+            "well": d,
+            "volume": v
+        })
+        src._volume -= v_pl
+        d._add_volume(v_pl)
+    return distributes
+
+
+def timed(fill):
+    def run():
+        src, dest = make_protocol()
+        return fill(dest, src)
+    groups = len(run())
+    seconds = min(timeit.repeat(run, number=NUMBER, repeat=3)) / NUMBER
+    setup = min(timeit.repeat(make_protocol, number=NUMBER, repeat=3))
+    return groups, (seconds - setup / NUMBER) * 1e3
+
+
+def main():
+    print("filling 1536 wells with 4 microliters from %d source wells" %
+          SOURCES)
+    groups, ms = timed(lambda d, s: scanning_fill(d, s, "4:microliter"))
+    print("%-14s %5d groups %8.1f ms" % ("scanning", groups, ms))
+    for policy in FILL_POLICIES:
+        groups, ms = timed(lambda d, s: Protocol.fill_wells(
+            d, s, "4:microliter", policy=policy))
+        print("%-14s %5d groups %8.1f ms" % (policy, groups, ms))
+
+
+if __name__ == "__main__":
+    main()
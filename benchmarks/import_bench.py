@@ -0,0 +1,58 @@
+"""
+Benchmark for the time taken to import autoprotocol, as reported by
+``python -X importtime`` in a fresh interpreter.
+
+Run from the repository root with::
+
+    python -m benchmarks.import_bench
+
+"""
+from __future__ import print_function
+import subprocess
+import sys
+
+MODULES = ["autoprotocol", "autoprotocol.harness"]
+REPEAT = 5
+
+
+def import_times(module):
+    """
+    Return the self and cumulative import times of `module` and everything
+    it imports, in microseconds, from ``-X importtime`` output.
+
+    """
+    output = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", "import %s" % module],
+        stderr=subprocess.STDOUT, universal_newlines=True
+    )
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            times[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+        except (IndexError, ValueError):
+            # Header line
+            continue
+    return times
+
+
+def main():
+    if sys.version_info < (3, 7):
+        print("-X importtime requires Python 3.7 or later")
+        return
+    for module in MODULES:
+        runs = [import_times(module) for _ in range(REPEAT)]
+        best = min(runs, key=lambda t: t[module][1])
+        print("import %s: %8.1f ms" % (module, best[module][1] / 1000.0))
+        autoprotocol_self = sum(
+            self_us for name, (self_us, _) in best.items()
+            if name.startswith("autoprotocol")
+        )
+        print("  autoprotocol modules (self): %8.1f ms" %
+              (autoprotocol_self / 1000.0))
+
+
+if __name__ == "__main__":
+    main()
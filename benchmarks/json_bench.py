@@ -0,0 +1,92 @@
+"""
+Benchmarks for encoding large protocols with each installed JSON backend,
+indented and compact, for 384-well stamp and acoustic_transfer protocols,
+and for loading them back with Protocol.from_json().
+
+Run from the repository root with::
+
+    python -m benchmarks.json_bench
+
+"""
+from __future__ import print_function
+import io
+import json
+import timeit
+import tracemalloc
+
+from autoprotocol.encoding import JSON_BACKENDS, resolve_backend, dumps
+from autoprotocol.protocol import Protocol
+
+PLATES = 16
+NUMBER = 3
+
+
+def build_stamp_protocol():
+    p = Protocol()
+    plates = [p.ref("plate_%d" % i, cont_type="384-flat", discard=True)
+              for i in range(PLATES)]
+    for plate in plates:
+        plate.all_wells().set_volume("90:microliter")
+    for src, dest in zip(plates, plates[1:] + plates[:1]):
+        for origin in (0, 1, 24, 25):
+            p.stamp(src.well(origin), dest.well(origin), "2:microliter")
+    return p
+
+
+def build_acoustic_protocol():
+    p = Protocol()
+    plates = [p.ref("echo_%d" % i, cont_type="384-echo", discard=True)
+              for i in range(PLATES)]
+    for plate in plates:
+        plate.all_wells().set_volume("50:microliter")
+    for src, dest in zip(plates, plates[1:] + plates[:1]):
+        p.acoustic_transfer(src.all_wells(), dest.all_wells(),
+                            "25:nanoliter")
+    return p
+
+
+def load_peak_kib(load, text):
+    tracemalloc.start()
+    try:
+        load(io.StringIO(text))
+        return tracemalloc.get_traced_memory()[1] / 1024.0
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    backends = [b for b in JSON_BACKENDS if resolve_backend(b) == b]
+    for label, build in [("stamp", build_stamp_protocol),
+                         ("acoustic_transfer", build_acoustic_protocol)]:
+        doc = build().as_dict()
+        expected = json.loads(json.dumps(doc))
+        print("%s, %d plates of 384 wells" % (label, PLATES))
+        for indent in (2, None):
+            for backend in backends:
+                out = dumps(doc, indent, backend)
+                assert json.loads(out) == expected
+                seconds = min(timeit.repeat(
+                    lambda: dumps(doc, indent, backend), number=NUMBER,
+                    repeat=3)) / NUMBER
+                print("  %-7s %-8s %8.2f ms %10d bytes" %
+                      (backend, "indent" if indent else "compact",
+                       seconds * 1e3, len(out)))
+
+    # Refs first, so that instructions are rebuilt as they are read
+    doc = build_acoustic_protocol().as_dict()
+    text = json.dumps({"refs": doc["refs"],
+                       "instructions": doc["instructions"]}, indent=2)
+    loaders = [
+        ("json.load + from_dict",
+         lambda fp: Protocol.from_dict(json.load(fp))),
+        ("from_json", Protocol.from_json)]
+    print("loading acoustic_transfer, %d bytes" % len(text))
+    for label, load in loaders:
+        seconds = min(timeit.repeat(lambda: load(io.StringIO(text)),
+                                    number=1, repeat=3))
+        print("  %-22s %8.2f ms %10.1f KiB peak" %
+              (label, seconds * 1e3, load_peak_kib(load, text)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmarks for Protocol.optimize_pipette_travel(): estimated travel saved
+and planning time for a script that copies the left half of three 384-well
+plates onto their right half, moving from plate to plate for every well as
+the loop over samples emits the transfers.
+
+Run from the repository root with::
+
+    python -m benchmarks.planning_bench
+
+"""
+from __future__ import print_function
+import time
+
+from autoprotocol.protocol import Protocol
+
+PLATES = 3
+
+
+def build_protocol():
+    p = Protocol()
+    plates = [p.ref("plate_%d" % i, None, "384-flat", discard=True)
+              for i in range(PLATES)]
+    for plate in plates:
+        plate.all_wells().set_volume("50:microliter")
+    for idx in range(192):
+        row, col = divmod(idx, 12)
+        for plate in plates:
+            p.transfer(plate.well(row * 24 + col),
+                       plate.well(row * 24 + col + 12), "5:microliter")
+    return p
+
+
+def main():
+    p = build_protocol()
+    start = time.time()
+    report = p.optimize_pipette_travel()
+    elapsed = time.time() - start
+    print("%d groups, %d reordered in %.2f s" %
+          (report.groups, report.reordered, elapsed))
+    print("estimated travel: %10.0f mm before, %10.0f mm after (%.0f%% saved)"
+          % (report.travel_before_mm, report.travel_after_mm,
+             100.0 * report.saved_mm / report.travel_before_mm))
+    print("container switches: %d before, %d after" %
+          (report.switches_before, report.switches_after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmarks for Protocol serialization: time taken by as_dict() as the
+number of refs grows, with a fixed number of transfers per ref and the
+instruction cache cleared before each call, repeated
+as_dict() calls while a protocol is built, repeated as_dict() calls as the
+number of unchanged instructions grows, and peak memory of json.dumps()
+against the streaming Protocol.dump().
+
+Run from the repository root with::
+
+    python -m benchmarks.protocol_bench
+
+"""
+from __future__ import print_function
+import json
+import os
+import timeit
+import tracemalloc
+
+from autoprotocol.protocol import Protocol
+
+REF_COUNTS = [10, 50, 100, 200]
+INSTRUCTION_COUNTS = [100, 1000, 10000]
+TRANSFERS_PER_REF = 96
+NUMBER = 3
+
+
+class _Unindexed(dict):
+    # Stands in for the container to ref name index, forcing the linear
+    # scan over refs on every lookup
+    def __setitem__(self, key, value):
+        pass
+
+
+def build_protocol(ref_count):
+    p = Protocol()
+    plates = [p.ref("plate_%d" % i, cont_type="96-flat", discard=True)
+              for i in range(ref_count)]
+    for src, dest in zip(plates, plates[1:] + plates[:1]):
+        p.transfer(src.all_wells(), dest.all_wells(), "5:microliter")
+    return p
+
+
+def per_transfer_usec(p, ref_count):
+    def serialize():
+        # Refify every instruction rather than copying cached ones
+        p._refified = {}
+        p._refified_list = None
+        p.as_dict()
+
+    seconds = min(timeit.repeat(serialize, number=NUMBER, repeat=3))
+    return seconds / (NUMBER * ref_count * TRANSFERS_PER_REF) * 1e6
+
+
+def build_checking_protocol(cached=True):
+    # Serializes after every instruction, as validation while building does
+    p = Protocol()
+    if not cached:
+        p._refify_instructions = lambda: [p._refify(i.data)
+                                          for i in p.instructions]
+    plates = [p.ref("plate_%d" % i, cont_type="96-flat", discard=True)
+              for i in range(4)]
+    for src in plates:
+        for dest in plates:
+            p.transfer(src.all_wells(), dest.all_wells(), "5:microliter")
+            p.incubate(dest, "ambient", "1:minute")
+            p.as_dict()
+    return p
+
+
+def repeat_usec(instruction_count):
+    # as_dict() of a protocol left unchanged since the last call, and after
+    # editing its last instruction
+    p = Protocol()
+    plate = p.ref("plate", cont_type="96-flat", discard=True)
+    for i in range(instruction_count):
+        p.incubate(plate, "warm_37", "%d:minute" % (i + 1))
+    p.as_dict()
+    unchanged = min(timeit.repeat(p.as_dict, number=NUMBER, repeat=3))
+
+    def edit():
+        p.instructions[-1].data["where"] = "warm_37"
+        p.as_dict()
+
+    edited = min(timeit.repeat(edit, number=NUMBER, repeat=3))
+    return unchanged / NUMBER * 1e6, edited / NUMBER * 1e6
+
+
+def build_acoustic_protocol(ref_count):
+    p = Protocol()
+    plates = [p.ref("echo_%d" % i, cont_type="384-echo", discard=True)
+              for i in range(ref_count)]
+    for plate in plates:
+        plate.all_wells().set_volume("50:microliter")
+    for src, dest in zip(plates, plates[1:] + plates[:1]):
+        p.acoustic_transfer(src.all_wells(), dest.all_wells(),
+                            "25:nanoliter")
+    return p
+
+
+def peak_kib(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024.0
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    print("as_dict() time per transfer, %d transfers per ref" %
+          TRANSFERS_PER_REF)
+    for ref_count in REF_COUNTS:
+        p = build_protocol(ref_count)
+        indexed = per_transfer_usec(p, ref_count)
+        p._container_refs = _Unindexed()
+        scanned = per_transfer_usec(p, ref_count)
+        print("%4d refs: %8.2f usec indexed, %8.2f usec scanning refs" %
+              (ref_count, indexed, scanned))
+
+    uncached = min(timeit.repeat(lambda: build_checking_protocol(False),
+                                 number=1, repeat=3))
+    cached = min(timeit.repeat(build_checking_protocol, number=1, repeat=3))
+    print("building with as_dict() after each step: %.3f s uncached, "
+          "%.3f s cached" % (uncached, cached))
+
+    print("repeated as_dict() time per call")
+    for instruction_count in INSTRUCTION_COUNTS:
+        print("%6d instructions: %8.1f usec unchanged, %8.1f usec after "
+              "editing one" % ((instruction_count,) +
+                               repeat_usec(instruction_count)))
+
+    print("peak memory serializing acoustic transfers between 384 plates")
+    with open(os.devnull, "w") as devnull:
+        for ref_count in [5, 20]:
+            p = build_acoustic_protocol(ref_count)
+            dumps = peak_kib(
+                lambda: devnull.write(json.dumps(p.as_dict(), indent=2)))
+            dump = peak_kib(lambda: p.dump(devnull, indent=2))
+            print("%4d refs: %10.1f KiB json.dumps, %10.1f KiB dump" %
+                  (ref_count, dumps, dump))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmarks for Protocol.transfer_many() against calling Protocol.transfer()
+for each pair of wells, for 10000 transfers between two 384-well plates,
+the tips used to add two reagents to a 384-well plate with and without
+conserve_tips, and the time per tip load of multi-milliliter transfers.
+
+Run from the repository root with::
+
+    python -m benchmarks.transfer_bench
+
+"""
+from __future__ import print_function
+import random
+import timeit
+
+from autoprotocol.protocol import Protocol
+from autoprotocol.unit import UnitArray
+
+TRANSFERS = 10000
+
+
+def make_pairs():
+    rnd = random.Random(0)
+    return ([rnd.randrange(384) for _ in range(TRANSFERS)],
+            [rnd.randrange(384) for _ in range(TRANSFERS)],
+            [rnd.choice([1, 2.5, 5]) for _ in range(TRANSFERS)])
+
+
+def make_protocol():
+    p = Protocol()
+    src = p.ref("src", None, "384-flat", discard=True)
+    dest = p.ref("dest", None, "384-flat", discard=True)
+    src.all_wells().set_volume("80:microliter")
+    return p, src, dest
+
+
+def looped(pairs):
+    p, src, dest = make_protocol()
+    for s, d, v in zip(*pairs):
+        p.transfer(src.well(s), dest.well(d), "%s:microliter" % v)
+    return p
+
+
+def bulk(pairs):
+    p, src, dest = make_protocol()
+    p.transfer_many(src, dest, pairs[0], pairs[1],
+                    UnitArray(pairs[2], "microliter"))
+    return p
+
+
+def reagent_tips(conserve_tips):
+    # Buffer goes into empty wells, then enzyme on top of the buffer
+    p = Protocol()
+    reagents = p.ref("reagents", None, "96-deep", discard=True)
+    reagents.wells(0, 1).set_volume("1900:microliter")
+    plate = p.ref("plate", None, "384-flat", discard=True)
+    plate.all_wells().set_volume("0:microliter")
+    p.transfer(reagents.well(0), plate.all_wells(), "4:microliter",
+               conserve_tips=conserve_tips)
+    p.transfer(reagents.well(1), plate.all_wells(), "1:microliter",
+               conserve_tips=conserve_tips, mix_after=True)
+    return sum(len(i.groups) for i in p.instructions if i.op == "pipette")
+
+
+def large_transfers():
+    p = Protocol()
+    src = p.ref("src", None, "res-sw96-hp", discard=True)
+    dest = p.ref("dest", None, "res-sw96-hp", discard=True)
+    src.well(0).set_volume("200:milliliter")
+    for _ in range(20):
+        p.transfer(src.well(0), dest.well(0), "9876.5:microliter",
+                   mix_after=True)
+    return p
+
+
+def main():
+    pairs = make_pairs()
+    assert looped(pairs).as_dict() == bulk(pairs).as_dict()
+    loop_s = min(timeit.repeat(lambda: looped(pairs), number=1, repeat=3))
+    bulk_s = min(timeit.repeat(lambda: bulk(pairs), number=1, repeat=3))
+    print("%d transfers" % TRANSFERS)
+    print("transfer() per pair: %8.1f ms" % (loop_s * 1e3))
+    print("transfer_many():     %8.1f ms" % (bulk_s * 1e3))
+    print("speedup:             %8.1fx" % (loop_s / bulk_s))
+    large_s = min(timeit.repeat(large_transfers, number=1, repeat=3))
+    loads = len(large_transfers().instructions[-1].groups)
+    print("%d tip loads of large transfers: %.1f usec per load" %
+          (loads, large_s / loads * 1e6))
+    print("tips to add two reagents to a 384-well plate: %d, %d with "
+          "conserve_tips" % (reagent_tips(False), reagent_tips(True)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmarks for Unit construction, conversion and serialization.
+
+Run from the repository root with::
+
+    python -m benchmarks.unit_bench
+
+"""
+from __future__ import print_function
+import timeit
+
+from autoprotocol import unit
+from autoprotocol.unit import Unit, _UNIT_CACHE, _UNIT_STR_CACHE
+
+LITERALS = ["0:microliter", "900:microliter", "100:microliter/second",
+            "10:microliter", "25:nanoliter"]
+NUMBER = 20000
+
+
+def parse_literals():
+    for s in LITERALS:
+        Unit.fromstring(s)
+
+
+CONVERSIONS = [(Unit(1, "microliter"), "nanoliter"),
+               (Unit(2, "milliliter"), "microliter"),
+               (Unit(90, "second"), "minute"),
+               (Unit(100, "microliter/second"), "milliliter/second")]
+
+
+def convert_units():
+    for u, target in CONVERSIONS:
+        u.to(target)
+
+
+def convert_units_pint():
+    # Disables the factor table so every conversion goes through Pint
+    lookup = unit._conversion_factor
+    unit._conversion_factor = lambda src, dst: None
+    try:
+        convert_units()
+    finally:
+        unit._conversion_factor = lookup
+
+
+# Results of arithmetic are not interned and do not keep their string, so
+# serializing them relies on the string cache alone
+SERIALIZED = [Unit(0.5, "microliter") * 3,
+              Unit(10, "microliter") - Unit(2.5, "microliter"),
+              Unit(100, "microliter/second") / 4,
+              Unit(25, "nanoliter") * 8]
+
+
+def serialize_units():
+    for u in SERIALIZED:
+        str(u)
+
+
+def per_call_usec(stmt, calls=len(LITERALS)):
+    seconds = min(timeit.repeat(stmt, number=NUMBER, repeat=3))
+    return seconds / (NUMBER * calls) * 1e6
+
+
+def main():
+    maxsize = _UNIT_CACHE.maxsize
+    _UNIT_CACHE.clear()
+    _UNIT_CACHE.maxsize = 0
+    try:
+        uncached = per_call_usec(parse_literals)
+    finally:
+        _UNIT_CACHE.maxsize = maxsize
+    cached = per_call_usec(parse_literals)
+    print("Unit parse, uncached: %8.2f usec/call" % uncached)
+    print("Unit parse, cached:   %8.2f usec/call" % cached)
+    print("speedup:              %8.1fx" % (uncached / cached))
+
+    pint_to = per_call_usec(convert_units_pint, len(CONVERSIONS))
+    table_to = per_call_usec(convert_units, len(CONVERSIONS))
+    print("Unit.to, Pint:        %8.2f usec/call" % pint_to)
+    print("Unit.to, factor table:%8.2f usec/call" % table_to)
+    print("speedup:              %8.1fx" % (pint_to / table_to))
+
+    maxsize = _UNIT_STR_CACHE.maxsize
+    _UNIT_STR_CACHE.clear()
+    _UNIT_STR_CACHE.maxsize = 0
+    try:
+        uncached = per_call_usec(serialize_units, len(SERIALIZED))
+    finally:
+        _UNIT_STR_CACHE.maxsize = maxsize
+    cached = per_call_usec(serialize_units, len(SERIALIZED))
+    print("str(Unit), uncached:  %8.2f usec/call" % uncached)
+    print("str(Unit), cached:    %8.2f usec/call" % cached)
+    print("speedup:              %8.1fx" % (uncached / cached))
+
+
+if __name__ == "__main__":
+    main()
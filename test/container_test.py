@@ -1,5 +1,7 @@
 import sys
 import pytest
+from array import array
+from autoprotocol import container
 from autoprotocol.container import Container, Well, WellGroup
 from autoprotocol.unit import Unit
 
@@ -55,6 +57,33 @@ class TestContainerWellRef:
             self.c.robotize(["A1", 0.1])
 
 
+class TestLazyWells:
+
+    @pytest.fixture(autouse=True)
+    def make_container(self, dummy_96):
+        self.c = dummy_96
+
+    def test_wells_materialized_on_access(self):
+        c = Container(None, self.c.container_type)
+        assert (c._well_list is None)
+        assert (len(c._wells) == 96)
+        assert (c._wells.materialized() == [])
+        col = c.wells_from(0, 8, columnwise=True)
+        assert ([w.index for w in col] == list(range(0, 96, 12)))
+        assert (c._wells.materialized() == col.wells)
+        assert (c.well("H1") is col[-1])
+        assert (c._wells[-1].index == 95)
+        assert (len(c.all_wells()) == 96)
+
+    def test_well_slots(self):
+        w = Container(None, self.c.container_type).well(0)
+        with pytest.raises(AttributeError):
+            w.undefined_attribute = True
+        assert (w._properties is None)
+        w.properties["key"] = "value"
+        assert (w.properties == {"key": "value"})
+
+
 class TestContainerWellGroupConstruction:
 
     @pytest.fixture(autouse=True)
@@ -217,6 +246,37 @@ class TestWellVolume:
         with pytest.raises(ValueError):
             self.c.well(2).set_volume("1:milliliter")
 
+    def test_fixed_point_volume(self):
+        from autoprotocol.unit import _volume_to_pl
+        w = self.c.well(0).set_volume("10:microliter")
+        for _ in range(3):
+            w._add_volume(_volume_to_pl("0.1:microliter"))
+        assert (w._volume == 10300000)
+        assert (str(w.volume) == "10.3:microliter")
+        w._remove_volume(_volume_to_pl("300:nanoliter"))
+        assert (w.volume == Unit(10, "microliter"))
+        # Wells without a volume are not debited
+        self.c.well(1)._remove_volume(_volume_to_pl("1:microliter"))
+        assert (self.c.well(1).volume is None)
+        self.c.well(1).volume = Unit(0.1, "milliliter")
+        assert (self.c.well(1).volume.unit == "microliter")
+        assert (self.c.well(1).volume == Unit(100, "microliter"))
+
+    def test_columnar_volumes(self):
+        from autoprotocol.container import _NO_VOLUME
+        self.c.all_wells().set_volume("30:microliter")
+        assert (list(self.c._volumes) == [30000000] * 15)
+        self.c.wells(0, 1).set_volume("10:microliter")
+        assert (self.c.well(1)._volume == 10000000)
+        self.c.well(2).volume = None
+        assert (self.c._volumes[2] == _NO_VOLUME)
+        self.c._add_volumes([2, 3], 5000000)
+        assert (self.c.well(2).volume == Unit(5, "microliter"))
+        assert (self.c.well(3).volume == Unit(35, "microliter"))
+        with pytest.raises(ValueError):
+            self.c.wells(4, 5).set_volume("201:microliter")
+        assert (self.c.well(4).volume == Unit(30, "microliter"))
+
     def test_default_true_max_vol(self, dummy_384, dummy_tube):
         assert (dummy_tube.container_type.true_max_vol_ul ==
                 dummy_tube.container_type.well_volume_ul)
@@ -313,6 +373,15 @@ class TestWellName:
         self.c.well(0).set_name("sample")
         assert (self.c.well(0).name == "sample")
 
+    def test_annotated_indices(self):
+        self.c.well(7).set_name("sample")
+        self.c.well(3).set_properties({"key": "value"})
+        self.c.well(1).properties
+        # Properties which were only read are not annotations
+        assert (self.c._annotated_indices() == [3, 7])
+        self.c.well(7).set_name(None)
+        assert (7 not in self.c._annotated_indices())
+
 
 class TestWellGroupName:
 
@@ -353,6 +422,22 @@ class TestWellGroupList:
         assert (prop_and_val[0] == ws[2])
         assert (prop_and_val[1] == ws[3])
 
+    def test_wells_with_property_index(self):
+        ws = self.c.all_wells()
+        self.c.well(4).set_properties({"sample": "s1"})
+        self.c.well(2).add_properties({"sample": "s2", "dilution": "1"})
+        assert ([w.index for w in ws.wells_with("sample")] == [2, 4])
+        assert (self.c._indices_with("dilution") == {2})
+        # Properties modified directly are re-indexed before the next query
+        self.c.well(7).properties["sample"] = "s3"
+        del self.c.well(2).properties["sample"]
+        assert ([w.index for w in ws.wells_with("sample")] == [4, 7])
+        self.c.well(4).set_properties({})
+        assert ([w.index for w in ws.wells_with("sample")] == [7])
+        assert ("sample" not in self.c._indexed_keys.get(4, ()))
+        self.c.well(9).set_name("named")
+        assert (self.c._annotated_indices() == [2, 7, 9])
+
     def test_pop(self):
         ws = self.c.wells_from('A1', 3)
         assert (ws[0] == ws.pop(0))
@@ -373,9 +458,112 @@ class TestWellGroupList:
         assert (len(ws) == 5)
 
 
+class TestCachedLayouts:
+
+    def test_layouts_shared(self, dummy_type, dummy_384):
+        c = Container(None, dummy_type)
+        c2 = Container(None, dummy_type)
+        cols = c.all_wells(columnwise=True)
+        assert (cols._runs[0][1] is c2.all_wells(columnwise=True)._runs[0][1])
+        assert (c.wells_from("B2", 3, columnwise=True)._runs[0][1] is
+                cols._runs[0][1])
+        assert ([w.index for w in c.wells_from(1, -2)] == [])
+        assert ([w.index for w in c.wells_from(13, 5)] == [13, 14])
+        quad = dummy_384.quadrant(3)
+        assert (quad._runs[0][1] is dummy_384.quadrant("B2")._runs[0][1])
+        assert ([quad[0].index, quad[1].index, quad[12].index] ==
+                [25, 27, 73])
+
+
+class TestWellGroupRuns:
+
+    @pytest.fixture(autouse=True)
+    def make_containers(self, dummy_type):
+        self.c = Container(None, dummy_type)
+        self.c2 = Container(None, dummy_type)
+
+    def test_subgroup_and_add_without_wells(self):
+        ws = self.c.all_wells() + self.c2.wells_from(0, 3)
+        part = ws.subgroup(13, 17)
+        assert (part._wells is None)
+        assert (part._runs[0][1] is ws._runs[0][1])
+        assert (len(part) == 4)
+        assert ([(w.container, w.index) for w in part] ==
+                [(self.c, 13), (self.c, 14), (self.c2, 0), (self.c2, 1)])
+        assert (part[-1] is self.c2.well(1))
+        assert (part[2] is self.c2.well(0))
+        with pytest.raises(IndexError):
+            part[4]
+        with pytest.raises(IndexError):
+            part[-5]
+        assert (self.c._wells.materialized() == [self.c.well(13),
+                                                 self.c.well(14)])
+        assert ([w.index for w in ws[::5]] == [0, 5, 10, 0])
+
+    def test_stepped_subgroup(self):
+        ws = self.c.all_wells() + self.c2.wells_from(0, 3)
+        wells = ([(self.c, i) for i in range(15)] +
+                 [(self.c2, i) for i in range(3)])
+        part = ws.subgroup(None, None, 5)
+        assert (part._wells is None)
+        assert (ws._wells is None)
+        assert (self.c._wells.materialized() == [])
+        for key in [slice(None, None, 5), slice(None, None, -1),
+                    slice(14, 2, -3), slice(1, 16, 2), slice(20, 30, 2)]:
+            part = ws.subgroup(key.start, key.stop, key.step)
+            assert ([(w.container, w.index) for w in part] == wells[key])
+        assert (ws._wells is None)
+
+    def test_slice_returns_list(self):
+        ws = self.c.all_wells()
+        count = len(ws)
+        part = ws[:2]
+        assert (isinstance(part, list))
+        assert (part == [self.c.well(0), self.c.well(1)])
+        assert (ws[:2] + [self.c2.well(0)] ==
+                [self.c.well(0), self.c.well(1), self.c2.well(0)])
+        part.append(self.c2.well(1))
+        assert (len(ws) == count)
+        assert (ws[count - 1:count + 5] == [self.c.well(count - 1)])
+        ws.wells
+        assert (isinstance(ws[::4], list))
+
+    def test_materialized_wells_are_authoritative(self):
+        ws = self.c.wells_from(0, 3)
+        ws.wells.append(self.c2.well(0))
+        assert (len(ws) == 4)
+        assert (ws[3] is self.c2.well(0))
+        assert (ws.subgroup(1)._wells == ws.wells[1:])
+
+    def test_indices(self):
+        assert (self.c.wells_from(1, 3).indices() == ["A2", "A3", "A4"])
+        assert ((self.c.wells(0) + self.c.well(3)).indices() == ["A1", "A4"])
+        with pytest.raises(AssertionError):
+            (self.c.wells(0) + self.c2.wells(0)).indices()
+        with pytest.raises(ValueError):
+            WellGroup._from_indices(self.c, [0, 15])
+
+
 class TestContainerVolumes:
     def test_true_vol_default(self, dummy_tube, dummy_96):
         assert (dummy_96.container_type.true_max_vol_ul ==
                 dummy_96.container_type.well_volume_ul)
         assert (dummy_tube.container_type.true_max_vol_ul ==
                 dummy_tube.container_type.well_volume_ul)
+
+    def test_volume_storage(self, dummy_96, monkeypatch):
+        typecode = container._VOLUME_TYPECODE
+        assert (typecode == "d" or array(typecode).itemsize >= 8)
+        assert (array(typecode, [container._NO_VOLUME])[0] ==
+                container._NO_VOLUME)
+        # Larger than a 32-bit integer, as in an 80 mL reservoir
+        dummy_96.well(0)._volume = 80 * 10 ** 9
+        assert (dummy_96.well(0)._volume == 80 * 10 ** 9)
+
+        # Without a 64-bit integer typecode, doubles are used
+        def narrow_array(typecode, *args):
+            if typecode in ("q", "l") and not args:
+                return array("i")
+            return array(typecode, *args)
+        monkeypatch.setattr(container, "array", narrow_array)
+        assert (container._volume_typecode() == "d")
@@ -54,6 +54,35 @@ class TestContainerRobotize:
             dummy_type.humanize("A1")
 
 
+class TestWellNameTables:
+    def test_1536_rows(self, dummy_1536):
+        ct = dummy_1536.container_type
+        assert (ct.humanize(0) == "A1")
+        assert (ct.humanize(25 * 48) == "Z1")
+        assert (ct.humanize(26 * 48) == "AA1")
+        assert (ct.humanize(1535) == "AF48")
+        assert (ct.robotize("AF48") == 1535)
+        assert (ct.robotize("aa1") == 26 * 48)
+        assert (ct.decompose("AB3") == (27, 2))
+        with pytest.raises(ValueError):
+            ct.robotize("AG1")
+
+    def test_robotize_many(self, dummy_type):
+        assert (dummy_type.robotize_many(["A1", "b2", 14, "3", "A01"]) ==
+                [0, 6, 14, 3, 0])
+        assert (dummy_type.robotize_many([]) == [])
+        with pytest.raises(ValueError):
+            dummy_type.robotize_many(["A1", "D1"])
+        with pytest.raises(TypeError):
+            dummy_type.robotize_many(["A1", 1.0])
+
+    def test_well_coordinates(self, dummy_1536):
+        ct = dummy_1536.container_type
+        assert (ct.well_coordinates("A1") == (0.0, 0.0))
+        assert (ct.well_coordinates("B3") == (4.5, 2.25))
+        assert (ct.well_coordinates(1535) == (47 * 2.25, 31 * 2.25))
+
+
 class TestAllContainerTypes:
     def test_all_container_types(self):
         from autoprotocol.container_type import _CONTAINER_TYPES
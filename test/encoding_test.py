@@ -0,0 +1,138 @@
+import io
+import json
+import pytest
+from autoprotocol import encoding
+from autoprotocol.encoding import resolve_backend, get_encoder, dumps, \
+    iterload, cbor_dumps, cbor_loads
+from autoprotocol.instruction import Incubate
+from autoprotocol.protocol import Protocol
+
+
+def build_protocol():
+    p = Protocol()
+    src = p.ref("src", None, "96-flat", discard=True)
+    echo = p.ref("echo", None, "384-echo", storage="cold_4")
+    src.all_wells().set_volume("100:microliter")
+    echo.all_wells().set_volume("50:microliter")
+    src.well(0).set_name(u"sample \u00b5")
+    p.transfer(src.wells_from(0, 8), src.wells_from(8, 8), "5.5:microliter")
+    p.acoustic_transfer(echo.wells_from(0, 16), echo.wells_from(16, 16),
+                        "25:nanoliter")
+    p.incubate(src, "warm_37", "10:minute")
+    return p
+
+
+class TestResolveBackend:
+
+    def test_default_and_env(self, monkeypatch):
+        monkeypatch.delenv(encoding.JSON_BACKEND_ENV, raising=False)
+        assert (resolve_backend() == "json")
+        monkeypatch.setenv(encoding.JSON_BACKEND_ENV, "json")
+        assert (resolve_backend() == "json")
+        monkeypatch.setenv(encoding.JSON_BACKEND_ENV, "simplejson")
+        with pytest.raises(ValueError):
+            resolve_backend()
+        with pytest.raises(ValueError):
+            resolve_backend("simplejson")
+
+    def test_missing_backend_falls_back(self, monkeypatch):
+        monkeypatch.setitem(encoding._MODULES, "orjson", None)
+        monkeypatch.setitem(encoding._MODULES, "ujson", None)
+        assert (resolve_backend("orjson") == "json")
+        assert (resolve_backend("auto") == "json")
+        assert (isinstance(get_encoder(2, "ujson"), json.JSONEncoder))
+
+
+class TestBackendOutput:
+
+    def test_stdlib_identical(self):
+        p = build_protocol()
+        assert (dumps(p.as_dict(), 2, "json") ==
+                json.dumps(p.as_dict(), indent=2))
+        assert (dumps(p.as_dict(), None, "json") ==
+                json.dumps(p.as_dict(), separators=(",", ":")))
+        inst = Incubate("src", "warm_37", "10:minute")
+        assert (inst.json() == json.dumps(inst.data, indent=2))
+        assert (inst.json(indent=None) ==
+                json.dumps(inst.data, separators=(",", ":")))
+
+    @pytest.mark.parametrize("backend", ["orjson", "ujson"])
+    def test_normalized_identical(self, backend):
+        pytest.importorskip(backend)
+        p = build_protocol()
+        expected = json.loads(json.dumps(p.as_dict(), indent=2))
+        for indent in (None, 2):
+            out = dumps(p.as_dict(), indent, backend)
+            assert (json.loads(out) == expected)
+            streamed = "".join(p.iterencode(indent, backend))
+            assert (json.loads(streamed) == expected)
+        assert ("\n" not in "".join(p.iterencode(None, backend)))
+        if backend == "orjson":
+            assert (dumps(p.as_dict(), 2, backend) ==
+                    json.dumps(p.as_dict(), indent=2, ensure_ascii=False))
+
+
+class TestIterload:
+
+    def test_chunk_boundaries(self):
+        doc = {"instructions": [{"op": u"\u00b5", "n": 123456789}, [],
+                                {"op": "seal"}],
+               "refs": {"a": {"new": "96-flat"}}, "count": 1234567,
+               "empty": []}
+        text = json.dumps(doc, ensure_ascii=False, indent=1)
+        expected = [("instructions", i) for i in doc["instructions"]]
+        for chunk_size in (1, 3, 64, 65536):
+            for fp in (io.StringIO(text), io.BytesIO(text.encode("utf-8"))):
+                members = list(iterload(fp, chunk_size=chunk_size))
+                assert (members[:3] == expected)
+                assert (dict(members[3:]) ==
+                        {k: doc[k] for k in ("refs", "count", "empty")})
+        assert (list(iterload(' {"instructions": [ ]} ')) == [])
+        assert (list(iterload(text, stream_keys=()))[0] ==
+                ("instructions", doc["instructions"]))
+
+    def test_invalid(self):
+        for text in ['{"a": 1', '{"a": 1} x', '[1]', '{"a" 1}', '{1: 2}']:
+            with pytest.raises(ValueError):
+                list(iterload(text, chunk_size=2))
+
+
+class TestCBOR:
+
+    def test_values(self):
+        values = [0, 23, 24, 255, 256, 65536, 2 ** 32, 2 ** 64 - 1, -1, -25,
+                  -2 ** 64, 1.5, 0.1, 1e300, True, False, None, "", "ab",
+                  u"\u00b5" * 10, [], {}, {"a": [1, 2.5, {"b": None}]}]
+        for value in values:
+            decoded = cbor_loads(cbor_dumps(value))
+            assert (decoded == value)
+            assert (type(decoded) is type(value))
+        # Floats are only narrowed to single precision when exact
+        assert (len(cbor_dumps(1.5)) == len(cbor_dumps(0.1)) - 4)
+        with pytest.raises(ValueError):
+            cbor_dumps(2 ** 64)
+        with pytest.raises(TypeError):
+            cbor_dumps({1: "a"})
+        with pytest.raises(TypeError):
+            cbor_dumps(object())
+
+    def test_stringrefs(self):
+        # Only strings at least as long as a reference to them are interned
+        data = cbor_dumps(["plate/17", "plate/17", "ab", "ab"])
+        assert (data == b"\xd9\x01\x00\x84\x68plate/17\xd8\x19\x00"
+                        b"\x62ab\x62ab")
+        data = cbor_dumps(["s%d" % i for i in range(30)] * 2)
+        assert (cbor_loads(data) == ["s%d" % i for i in range(30)] * 2)
+
+    def test_protocol_round_trip(self):
+        doc = build_protocol().as_dict()
+        data = cbor_dumps(doc)
+        assert (json.dumps(cbor_loads(data), indent=2) ==
+                json.dumps(doc, indent=2))
+        assert (len(data) < len(json.dumps(doc, separators=(",", ":"))))
+
+    def test_invalid(self):
+        for data in [b"", b"\xd9\x01\x00\x83", b"\x18", b"\x01\x02",
+                     b"\x9f\xff", b"\xd8\x19\x00", b"\xc1\x00"]:
+            with pytest.raises(ValueError):
+                cbor_loads(data)
@@ -1,7 +1,10 @@
 import pytest
-from autoprotocol.harness import ProtocolInfo, Manifest, seal_on_store
+from autoprotocol.harness import ProtocolInfo, Manifest, seal_on_store, run
 from autoprotocol import Protocol, Unit, Well, WellGroup
+import gzip
+import io
 import json
+import sys
 
 
 class TestManifest:
@@ -602,3 +605,56 @@ class TestManifest:
         self.protocol.uncover(test2)
         seal_on_store(self.protocol)
         assert (self.protocol.instructions[-1].lid == "low_evaporation")
+
+
+class TestRunOutput:
+
+    def run(self, tmpdir, monkeypatch, *options):
+        config = tmpdir.join("config.json")
+        config.write(json.dumps({"parameters": {}}))
+        monkeypatch.setattr(sys, "argv", ["run", str(config)] +
+                            list(options))
+
+        def transfer(protocol, params):
+            plate = protocol.ref("plate", None, "96-flat", discard=True)
+            plate.all_wells().set_volume("100:microliter")
+            protocol.transfer(plate.wells_from(0, 4), plate.wells_from(4, 4),
+                              "5:microliter")
+
+        run(transfer, seal_after_run=False)
+
+    def test_stdout(self, tmpdir, monkeypatch, capsys):
+        self.run(tmpdir, monkeypatch)
+        out = capsys.readouterr()[0]
+        assert (out.endswith("}\n"))
+        assert (json.loads(out)["instructions"][0]["op"] == "pipette")
+        self.run(tmpdir, monkeypatch, "--compact")
+        compact = capsys.readouterr()[0]
+        assert ("\n" not in compact.rstrip("\n"))
+        assert (json.loads(compact) == json.loads(out))
+
+    def test_output_file(self, tmpdir, monkeypatch, capsys):
+        self.run(tmpdir, monkeypatch)
+        expected = capsys.readouterr()[0]
+        path = str(tmpdir.join("protocol.json"))
+        self.run(tmpdir, monkeypatch, "--output", path)
+        assert (capsys.readouterr()[0] == "")
+        with io.open(path, encoding="utf-8") as f:
+            assert (f.read() == expected)
+        path = str(tmpdir.join("protocol.json.gz"))
+        self.run(tmpdir, monkeypatch, "--output", path, "--compress", "gzip")
+        with gzip.open(path, "rb") as f:
+            assert (f.read().decode("utf-8") == expected)
+        with pytest.raises(SystemExit):
+            self.run(tmpdir, monkeypatch, "--compress", "bzip2")
+
+    def test_zstd(self, tmpdir, monkeypatch, capsys):
+        zstandard = pytest.importorskip("zstandard")
+        self.run(tmpdir, monkeypatch)
+        expected = capsys.readouterr()[0]
+        path = str(tmpdir.join("protocol.json.zst"))
+        self.run(tmpdir, monkeypatch, "--output", path, "--compress", "zstd")
+        with io.open(path, "rb") as f:
+            data = zstandard.ZstdDecompressor().decompressobj().decompress(
+                f.read())
+        assert (data.decode("utf-8") == expected)
@@ -0,0 +1,208 @@
+import random
+import pytest
+from autoprotocol.planning import plan_group_order, group_wells, \
+    split_volume, tip_capacity, SourceAllocator, FILL_POLICIES, pool_sources
+from autoprotocol.protocol import Protocol
+
+
+def transfer_group(source, dest):
+    return {"transfer": [{"from": source, "to": dest,
+                          "volume": "5:microliter"}]}
+
+
+class TestSplitVolume:
+
+    def test_split_volume(self):
+        assert (split_volume(0, 900) == (0, 0))
+        assert (split_volume(900, 900) == (0, 900))
+        assert (split_volume(901, 900) == (1, 1))
+        assert (split_volume(1800, 900) == (1, 900))
+        assert (split_volume(10 ** 12 + 7, 900) == (1111111111, 107))
+        with pytest.raises(ValueError):
+            split_volume(10, 0)
+
+    def test_tip_capacity(self):
+        assert (tip_capacity() == tip_capacity("unlisted"))
+        assert (str(tip_capacity()) == "900.0:microliter")
+
+
+def scan_allocate(volumes, current, pl, policy):
+    # Reference allocation scanning every source
+    if current is not None and volumes[current] >= pl:
+        return current
+    fits = [i for i, vol in enumerate(volumes)
+            if vol is not None and vol >= pl and i != current]
+    if not fits:
+        return None
+    if policy == "best_fit":
+        return min(fits, key=lambda i: (volumes[i], i))
+    if policy == "least_sources":
+        return min(fits, key=lambda i: (-volumes[i], i))
+    return fits[0]
+
+
+class TestSourceAllocator:
+
+    def test_matches_scan(self):
+        rnd = random.Random(0)
+        for policy in FILL_POLICIES:
+            for _ in range(50):
+                volumes = [rnd.choice([None, 0, 10, 40, 75, 100])
+                           for _ in range(rnd.randrange(1, 12))]
+                allocator = SourceAllocator(volumes, policy)
+                current = None
+                for _ in range(30):
+                    if rnd.random() < 0.2:
+                        i = rnd.randrange(len(volumes))
+                        allocator.add(i, 15)
+                        volumes[i] = (volumes[i] or 0) + 15
+                        continue
+                    pl = rnd.choice([0, 5, 10, 30])
+                    expected = scan_allocate(volumes, current, pl, policy)
+                    assert (allocator.allocate(pl) == expected)
+                    if expected is None:
+                        break
+                    current = expected
+                    volumes[current] -= pl
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            SourceAllocator([1], "worst_fit")
+
+
+class TestPoolSources:
+
+    def test_direct(self):
+        plan = pool_sources([11, 21, 31, 41], [10, 20, 30])
+        assert (plan.direct)
+        assert (plan.sources == plan.dests == [0, 1, 2])
+        assert (plan.volumes == [10, 20, 30])
+
+    def test_pooled(self):
+        plan = pool_sources([30, 0, 50], [20, 20, 0, 20])
+        assert (not plan.direct)
+        assert (list(zip(plan.sources, plan.dests, plan.volumes)) ==
+                [(0, 0, 20), (0, 1, 10), (1, 1, 0), (2, 1, 10),
+                 (2, 3, 20)])
+        assert (plan.volumes == [20, 10, 0, 10, 20])
+        # Sources are only drawn down to a multiple of the step
+        plan = pool_sources([37, 60], [25, 50], 25)
+        assert (list(zip(plan.sources, plan.dests, plan.volumes)) ==
+                [(0, 0, 25), (1, 1, 50)])
+        plan = pool_sources([60, 60], [25, 25, 50], 25)
+        assert (list(zip(plan.sources, plan.dests, plan.volumes)) ==
+                [(0, 0, 25), (0, 1, 25), (1, 2, 50)])
+
+    def test_errors(self):
+        with pytest.raises(RuntimeError):
+            pool_sources([10, 10], [15, 10])
+        with pytest.raises(RuntimeError):
+            pool_sources([30, 30], [60], 25)
+        with pytest.raises(ValueError):
+            pool_sources([10, None], [15])
+
+
+class TestGroupWells:
+
+    def test_reads_and_writes(self):
+        p = Protocol()
+        c = p.ref("c", None, "96-flat", discard=True)
+        c.all_wells().set_volume("100:microliter")
+        p.distribute(c.well(0), c.wells(1, 2), "5:microliter",
+                     allow_carryover=True)
+        p.consolidate(c.wells(3, 4), c.well(5), "5:microliter")
+        p.mix(c.well(6))
+        distribute, consolidate, mix = p.instructions[-1].groups
+        reads, writes, path = group_wells(distribute)
+        assert (writes == [(c, 0), (c, 1), (c, 2)])
+        assert (path == [(c, 0), (c, 1), (c, 2)])
+        reads, writes, path = group_wells(consolidate)
+        assert ((c, 3) in reads and (c, 4) in reads)
+        assert (writes == [(c, 5)])
+        assert (group_wells(mix)[1] == [(c, 6)])
+
+
+class TestPlanGroupOrder:
+
+    def test_reduces_travel(self):
+        p = Protocol()
+        a = p.ref("a", None, "96-flat", discard=True)
+        b = p.ref("b", None, "96-flat", discard=True)
+        groups = []
+        for i in range(4):
+            groups.append(transfer_group(a.well(i), a.well(i + 8)))
+            groups.append(transfer_group(b.well(i), b.well(i + 8)))
+        order, report = plan_group_order(groups)
+        assert (sorted(order[:4]) == [0, 2, 4, 6])
+        assert (report.switches_before == 7)
+        assert (report.switches_after == 1)
+        assert (report.saved_mm > 0)
+        # Already in the best order
+        order, report = plan_group_order([groups[i] for i in order])
+        assert (order == list(range(8)))
+        assert (report.saved_mm == 0)
+        with pytest.raises(ValueError):
+            plan_group_order(groups, window=0)
+
+    def test_hazards(self):
+        p = Protocol()
+        a = p.ref("a", None, "96-flat", discard=True)
+        b = p.ref("b", None, "96-flat", discard=True)
+        # b/0 is written by group 1 and read by group 3, group 2 writes a/1
+        # which group 0 reads, and group 4 is unknown so nothing crosses it
+        groups = [transfer_group(a.well(1), b.well(1)),
+                  transfer_group(a.well(0), b.well(0)),
+                  transfer_group(b.well(2), a.well(1)),
+                  transfer_group(b.well(0), a.well(2)),
+                  {"unknown": {}},
+                  transfer_group(a.well(3), a.well(4))]
+        order, _ = plan_group_order(groups)
+        for before, after in [(1, 3), (0, 2), (3, 4), (4, 5)]:
+            assert (order.index(before) < order.index(after))
+
+    def test_tip_carryover(self):
+        p = Protocol()
+        a = p.ref("a", None, "96-flat", discard=True)
+        b = p.ref("b", None, "96-flat", discard=True)
+        # Group 1 reuses its tip, so a/1 may hold liquid from a/91, as may
+        # a/5 after a consolidate with carryover.  Groups 2 and 4 start
+        # next to where the previous group ends but read those wells
+        one_tip = transfer_group(a.well(90), a.well(91))
+        one_tip["transfer"].append({"from": a.well(1), "to": a.well(92),
+                                    "volume": "5:microliter"})
+        consolidate = {"consolidate": {
+            "from": [{"well": a.well(80), "volume": "5:microliter"},
+                     {"well": a.well(5), "volume": "5:microliter"}],
+            "to": a.well(81), "allow_carryover": True}}
+        groups = [transfer_group(b.well(0), a.well(2)),
+                  one_tip,
+                  transfer_group(a.well(1), a.well(3)),
+                  consolidate,
+                  transfer_group(a.well(5), a.well(6))]
+        assert ((a, 1) in group_wells(one_tip)[1])
+        assert ((a, 5) in group_wells(consolidate)[1])
+        order, _ = plan_group_order(groups)
+        for before, after in [(1, 2), (3, 4)]:
+            assert (order.index(before) < order.index(after))
+
+    def test_protocol(self):
+        p = Protocol()
+        src = p.ref("src", None, "96-flat", discard=True)
+        dest = p.ref("dest", None, "96-flat", discard=True)
+        src.all_wells().set_volume("100:microliter")
+        dest.all_wells().set_volume("100:microliter")
+        for i in range(8):
+            p.transfer(src.well(i), dest.well(i), "5:microliter")
+            p.transfer(dest.well(95 - i), src.well(95 - i), "5:microliter")
+        p.cover(dest)
+        p.transfer(src.well(0), src.well(1), "5:microliter")
+        groups = list(p.instructions[0].groups)
+        p.as_dict()
+        report = p.optimize_pipette_travel()
+        assert (report.groups == 17)
+        assert (report.travel_after_mm < report.travel_before_mm)
+        assert (p.instructions[0].groups != groups)
+        assert (sorted(p.instructions[0].groups, key=groups.index) == groups)
+        # The cached serialization is refreshed
+        assert (p.as_dict()["instructions"][0]["groups"][1]["transfer"][0] ==
+                p._refify(p.instructions[0].groups[1]["transfer"][0]))
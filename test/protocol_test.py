@@ -1,9 +1,15 @@
+import copy
+import io
+import json
 import pytest
 from autoprotocol.container import Container, WellGroup
-from autoprotocol.instruction import Thermocycle, Incubate, Spin
+from autoprotocol.instruction import Thermocycle, Incubate, Spin, Pipette, \
+    Seal, Absorbance, MeasureMass, Uncover
 from autoprotocol.pipette_tools import *  # NOQA
 from autoprotocol.protocol import Protocol, Ref
-from autoprotocol.unit import Unit, UnitError
+from autoprotocol.unit import Unit, UnitArray, UnitError
+from autoprotocol.encoding import cbor_loads
+from autoprotocol.planning import tip_capacity
 from autoprotocol.harness import _add_dye_to_preview_refs, \
     _convert_provision_instructions, _convert_dispense_instructions
 
@@ -242,6 +248,25 @@ class TestDistribute():
             "20:microliter"), c.well("A2"), "5:microliter")
         assert ("distribute" in p.instructions[-1].groups[-1])
 
+    def test_fill_policy(self, dummy_protocol):
+        def fill(policy):
+            p = Protocol()
+            c = p.ref("test", None, "96-deep", discard=True)
+            srcs = c.wells_from(0, 3)
+            for w, v in zip(srcs.wells, [50, 200, 100]):
+                w.set_volume("%d:microliter" % v)
+            p.distribute(srcs, c.wells_from(8, 8), "20:microliter",
+                         fill_policy=policy)
+            return [(g["distribute"]["from"].index,
+                     len(g["distribute"]["to"]))
+                    for g in p.instructions[-1].groups]
+
+        assert (fill("first_fit") == [(0, 2), (1, 6)])
+        assert (fill("best_fit") == [(0, 2), (2, 5), (1, 1)])
+        assert (fill("least_sources") == [(1, 8)])
+        with pytest.raises(ValueError):
+            fill("worst_fit")
+
     def test_unit_conversion(self, dummy_protocol):
         p = dummy_protocol
         c = p.ref("test", None, "96-flat", discard=True)
@@ -370,10 +395,10 @@ class TestTransfer():
     def test_one_source(self, dummy_protocol):
         p = dummy_protocol
         c = p.ref("test", None, "96-flat", discard=True)
-        with pytest.raises(RuntimeError):
+        with pytest.raises(RuntimeError, match="volume attribute"):
             p.transfer(c.wells_from(0, 2),
                        c.wells_from(2, 2), "40:microliter", one_source=True)
-        with pytest.raises(RuntimeError):
+        with pytest.raises(RuntimeError, match="not enough volume"):
             p.transfer(c.wells_from(0, 2).set_volume("1:microliter"),
                        c.wells_from(1, 5), "10:microliter", one_source=True)
         p.transfer(c.wells_from(0, 2).set_volume("50:microliter"),
@@ -420,6 +445,58 @@ class TestTransfer():
         p.transfer(c.well(0), c.well(1), "1000:microliter", one_tip=True)
         assert (1 == len(p.instructions[0].groups))
 
+    def test_tip_capacity(self, dummy_protocol):
+        p = dummy_protocol
+        c = p.ref("test", None, "96-deep", discard=True)
+        c.well(0).set_volume("1900:microliter")
+        p.transfer(c.well(0), c.well(1), "1799.9:microliter", mix_after=True)
+        assert ([str(g["transfer"][0]["volume"])
+                 for g in p.instructions[-1].groups] ==
+                ["900.0:microliter", "899.9:microliter"])
+        assert (str(p.instructions[-1].groups[1]["transfer"][0]["mix_after"]
+                    ["volume"]) == "449.95:microliter")
+        assert (c.well(1).volume == Unit(1799.9, "microliter"))
+        p.transfer(c.well(0), c.well(2), "100:microliter", tip_type="small",
+                   tip_capacity="0.04:milliliter", one_tip=True,
+                   new_group=True)
+        assert ([str(x["volume"])
+                 for x in p.instructions[-1].groups[0]["transfer"]] ==
+                ["40.0:microliter", "40.0:microliter", "20.0:microliter"])
+        assert (c.well(0).volume == Unit(0.1, "microliter"))
+        c.well(3).set_volume("100:microliter")
+        p.transfer_many(c, c, [3], [4], "70:microliter",
+                        tip_capacity=Unit(30, "microliter"))
+        assert ([str(g["transfer"][0]["volume"])
+                 for g in p.instructions[-1].groups[-3:]] ==
+                ["30.0:microliter", "30.0:microliter", "10.0:microliter"])
+        for capacity in ["0:microliter", "0.1:picoliter"]:
+            with pytest.raises(ValueError):
+                p.transfer(c.well(3), c.well(5), "10:microliter",
+                           tip_capacity=capacity)
+            with pytest.raises(ValueError):
+                p.transfer_many(c, c, [3], [5], "10:microliter",
+                                tip_capacity=capacity)
+        assert (c.well(3).volume == Unit(30, "microliter"))
+
+    def test_protocol_tip_capacity(self):
+        p = Protocol(tip_capacities={"small": "0.2:milliliter"})
+        assert (str(p.tip_capacity("small")) == "200.0:microliter")
+        assert (p.tip_capacity("large") == tip_capacity("large"))
+        p.set_tip_capacity(None, "30:microliter")
+        assert (str(Protocol().tip_capacity()) == "900.0:microliter")
+        c = p.ref("test", None, "96-deep", discard=True)
+        c.well(0).set_volume("1000:microliter")
+        p.transfer(c.well(0), c.well(1), "70:microliter")
+        p.transfer(c.well(0), c.well(2), "500:microliter", tip_type="small")
+        assert ([str(g["transfer"][0]["volume"])
+                 for g in p.instructions[-1].groups] ==
+                ["30.0:microliter", "30.0:microliter", "10.0:microliter",
+                 "200.0:microliter", "200.0:microliter", "100.0:microliter"])
+        with pytest.raises(ValueError):
+            p.set_tip_capacity("small", "0:microliter")
+        with pytest.raises(ValueError):
+            Protocol(tip_capacities={"small": "0:microliter"})
+
     def test_unit_conversion(self, dummy_protocol):
         p = dummy_protocol
         c = p.ref("test", None, "96-flat", discard=True)
@@ -515,6 +592,132 @@ class TestTransfer():
             assert ("mix_before" not in
                     p.instructions[0].groups[i]["transfer"][0])
 
+    def test_unit_array_volumes(self, dummy_protocol):
+        p = dummy_protocol
+        c = p.ref("test", None, "96-flat", discard=True)
+        p.transfer(c.wells_from(0, 3), c.wells_from(3, 3),
+                   UnitArray([0.005, 0.01, 0.015], "milliliter"))
+        p.transfer(c.wells_from(0, 3), c.wells_from(6, 3),
+                   ["5:microliter", "10:microliter", "15:microliter"])
+        volumes = [g["transfer"][0]["volume"]
+                   for g in p.instructions[-1].groups]
+        assert (volumes[:3] == volumes[3:6])
+        assert ([str(w.volume) for w in c.wells_from(3, 3)] ==
+                ["5.0:microliter", "10.0:microliter", "15.0:microliter"])
+        with pytest.raises(RuntimeError):
+            p.transfer(c.wells_from(0, 3), c.wells_from(3, 3),
+                       UnitArray([5, 10], "microliter"))
+        p.consolidate(c.wells_from(0, 2), c.well(9),
+                      UnitArray([1, 2], "microliter"))
+        assert (c.well(9).volume == Unit(3, "microliter"))
+
+    def test_transfer_many(self):
+        def transfer_pairs(bulk, volumes, **kwargs):
+            p = Protocol()
+            src = p.ref("src", None, "96-flat", discard=True)
+            dest = p.ref("dest", None, "96-deep", discard=True)
+            src.all_wells().set_volume("300:microliter")
+            dest.well(5).set_volume("0:microliter")
+            dest.cover = "universal"
+            pairs = [(i % 96, (i * 7) % 96) for i in range(40)]
+            if bulk:
+                p.transfer_many(src, dest, [s for s, _ in pairs],
+                                [d for _, d in pairs], volumes, **kwargs)
+            else:
+                if not isinstance(volumes, list):
+                    volumes = [volumes] * len(pairs)
+                for (s, d), v in zip(pairs, volumes):
+                    p.transfer(src.well(s), dest.well(d), v, **kwargs)
+            return p, list(src._volumes) + list(dest._volumes)
+
+        cases = [
+            ("5:microliter", {}),
+            (["%d:microliter" % (i % 3) for i in range(40)],
+             {"mix_after": True, "aspirate_speed": "50:microliter/second"}),
+            (["950.3:microliter", "1900.1:microliter"] * 20,
+             {"mix_before": True, "mix_vol": "10:microliter"}),
+            ("5:microliter", {"new_group": True, "tip_type": "x"})
+        ]
+        for volumes, kwargs in cases:
+            looped, looped_volumes = transfer_pairs(False, volumes, **kwargs)
+            bulk, bulk_volumes = transfer_pairs(True, volumes, **kwargs)
+            assert (bulk.as_dict() == looped.as_dict())
+            assert (bulk_volumes == looped_volumes)
+        assert (isinstance(bulk.instructions[0], Uncover))
+
+        p = Protocol()
+        c = p.ref("c", None, "96-flat", discard=True)
+        c.all_wells().set_volume("100:microliter")
+        p.transfer(c.wells("A1", "A2"), c.wells(2, 3),
+                   UnitArray([1000, 5], "microliter"), one_tip=True)
+        p2 = Protocol()
+        c2 = p2.ref("c", None, "96-flat", discard=True)
+        c2.all_wells().set_volume("100:microliter")
+        p2.transfer_many(c2, c2, ["A1", "A2"], [2, 3],
+                         UnitArray([1000, 5], "microliter"), one_tip=True)
+        assert (p2.as_dict() == p.as_dict())
+        with pytest.raises(RuntimeError):
+            p2.transfer_many(c2, c2, [0, 1], [2], "5:microliter")
+        with pytest.raises(RuntimeError):
+            p2.transfer_many(c2, c2, [0, 1], [2, 3], ["5:microliter"])
+        with pytest.raises(RuntimeError):
+            p2.transfer_many(c2, c2, [0], [2], "5:microliter", mix_vol=None)
+        with pytest.raises(ValueError):
+            p2.transfer_many(c2, c2, [96], [2], "5:microliter")
+        with pytest.raises(TypeError):
+            p2.transfer_many(c2.well(0), c2, [0], [2], "5:microliter")
+
+    def test_conserve_tips(self):
+        p = Protocol()
+        c = p.ref("c", None, "96-flat", discard=True)
+        c.wells(0, 1).set_volume("200:microliter")
+        c.wells_from(2, 11).set_volume("0:microliter")
+        c.well(5).set_volume("10:microliter")
+        p.transfer(c.well(0), c.wells_from(2, 6), "10:microliter",
+                   conserve_tips=True)
+        # The tip is changed after dispensing into well 5, which holds liquid
+        assert ([[x["to"].index for x in g["transfer"]]
+                 for g in p.instructions[-1].groups] ==
+                [[2, 3, 4, 5], [6, 7]])
+        assert (c.well(0).volume == Unit(140, "microliter"))
+        p.transfer(c.wells(0, 1), c.wells(8, 9, 10), "70:microliter",
+                   one_source=True, conserve_tips=True, new_group=True)
+        assert (len(p.instructions[-1].groups) == 1)
+        assert ([x["from"].index for x in
+                 p.instructions[-1].groups[0]["transfer"]] == [0, 0, 1])
+        count = len(p.instructions)
+        p.transfer(c.well(1), c.wells(11, 12), "5:microliter",
+                   conserve_tips=True, mix_after=True, new_group=True)
+        assert (len(p.instructions) == count + 2)
+
+        p2 = Protocol()
+        c2 = p2.ref("c", None, "96-flat", discard=True)
+        c2.wells_from(2, 9).set_volume("0:microliter")
+        c2.well(5).set_volume("10:microliter")
+        p2.transfer_many(c2, c2, [0, 0, 0, 0, 1, 1, 0], [2, 5, 6, 7, 8, 9, 10],
+                         "5:microliter", conserve_tips=True)
+        assert ([len(g["transfer"]) for g in p2.instructions[-1].groups] ==
+                [2, 2, 2, 1])
+        with pytest.raises(RuntimeError):
+            p2.transfer(c2.well(0), c2.well(1), "5:microliter", one_tip=True,
+                        conserve_tips=True)
+
+    def test_conserve_tips_unknown_volume(self):
+        # A destination whose volume is unknown may already hold liquid
+        p = Protocol()
+        c = p.ref("c", None, "96-flat", discard=True)
+        c.well(0).set_volume("200:microliter")
+        c.wells(2, 4).set_volume("0:microliter")
+        p.transfer(c.well(0), c.wells(2, 3, 4, 5), "10:microliter",
+                   conserve_tips=True)
+        assert ([[x["to"].index for x in g["transfer"]]
+                 for g in p.instructions[-1].groups] ==
+                [[2, 3], [4, 5]])
+        p.transfer_many(c, c, [0, 0, 0, 0], [6, 7, 8, 9], "10:microliter",
+                        conserve_tips=True)
+        assert ([len(g["transfer"]) for g in p.instructions[-1].groups] ==
+                [2, 2, 1, 1, 1, 1])
+
 
 class TestConsolidate():
 
@@ -912,6 +1115,18 @@ class TestRefify():
         assert ("randomstring" == p._refify(s))
         assert (24 == p._refify(i))
 
+    def test_ref_for_container(self, dummy_protocol):
+        p = dummy_protocol
+        plate = p.ref("plate", None, "96-flat", discard=True)
+        assert (p._container_refs == {plate: "plate"})
+        assert (p._ref_for_container(plate) == "plate")
+        # Refs not added through ref() are found by scanning refs
+        p2 = Protocol(refs={"other": p.refs["plate"]})
+        assert (p2._ref_for_container(plate) == "other")
+        assert (p2._container_refs == {plate: "other"})
+        del p2.refs["other"]
+        assert (p2._ref_for_container(plate) is None)
+
 
 class TestOuts():
 
@@ -931,6 +1146,276 @@ class TestOuts():
                 ['test'] == 'foo')
 
 
+class TestDump():
+
+    def test_dump_matches_as_dict(self, dummy_protocol):
+        p = dummy_protocol
+        assert ("".join(p.iterencode()) ==
+                json.dumps(p.as_dict(), separators=(",", ":")))
+        src = p.ref("src", None, "96-flat", discard=True)
+        dest = p.ref("dest", None, "96-flat", storage="cold_4")
+        src.all_wells().set_volume("100:microliter")
+        src.well(3).set_name("sample")
+        dest.well(0).set_properties({"key": "value"})
+        p.transfer(src.wells_from(0, 4), dest.wells_from(0, 4),
+                   "5:microliter")
+        p.incubate(dest, "warm_37", "10:minute")
+        p.add_time_constraint({"mark": src, "state": "start"},
+                              {"mark": dest, "state": "end"}, "1:minute")
+        for indent in (None, 0, 2, "\t"):
+            out = io.StringIO()
+            p.dump(out, indent=indent)
+            separators = (",", ":") if indent is None else None
+            assert (out.getvalue() == json.dumps(p.as_dict(), indent=indent,
+                                                 separators=separators))
+        # Each instruction is encoded as its own chunk
+        chunks = list(p.iterencode())
+        assert (sum('"op":' in c for c in chunks) ==
+                len(p.instructions))
+
+
+class TestInstructionCache():
+
+    def cached(self, p, i):
+        return p._refified[p.instructions[i]][1]
+
+    def test_cached_until_mutated(self, dummy_protocol):
+        p = dummy_protocol
+        src = p.ref("src", None, "96-flat", discard=True)
+        echo = p.ref("echo", None, "384-echo", discard=True)
+        src.all_wells().set_volume("100:microliter")
+        echo.all_wells().set_volume("50:microliter")
+        p.transfer(src.well(0), src.well(1), "5:microliter")
+        p.as_dict()
+        first = self.cached(p, 0)
+        assert (p.as_dict()["instructions"][0] == first)
+        assert (self.cached(p, 0) is first)
+        # Appending groups to the last pipette invalidates its cached form
+        p.transfer(src.well(2), src.well(3), "5:microliter")
+        pipette = p.as_dict()["instructions"][0]
+        assert (self.cached(p, 0) is not first)
+        assert (len(pipette["groups"]) == 2)
+        pipette = self.cached(p, 0)
+        p.acoustic_transfer(echo.well(0), echo.well(1), "25:nanoliter")
+        p.as_dict()
+        p.acoustic_transfer(echo.well(2), echo.well(3), "25:nanoliter")
+        assert (len(p.as_dict()["instructions"][1]["groups"][0]["transfer"])
+                == 2)
+        acoustic = self.cached(p, 1)
+        assert (self.cached(p, 0) is pipette)
+        p.provision("rs18s8x4qbsvjz", src.well(5), "10:microliter")
+        assert (p.as_dict()["instructions"][2]["resource_id"] ==
+                "rs18s8x4qbsvjz")
+        _convert_provision_instructions(p, 0, 2, "rs_dye")
+        assert (p.as_dict()["instructions"][2]["resource_id"] == "rs_dye")
+        assert (self.cached(p, 1) is acoustic)
+
+    def test_output_is_shared(self, dummy_protocol):
+        p = dummy_protocol
+        src = p.ref("src", None, "96-flat", discard=True)
+        src.all_wells().set_volume("100:microliter")
+        p.transfer(src.well(0), src.well(1), "5:microliter")
+        p.incubate(src, "warm_37", "10:minute")
+        out = p.as_dict()["instructions"]
+        assert (p.as_dict()["instructions"] is out)
+        p.incubate(src, "warm_37", "10:minute")
+        new_out = p.as_dict()["instructions"]
+        assert (new_out is not out)
+        assert (new_out[0] is out[0] and new_out[1] is out[1])
+
+    def test_direct_data_edits(self, dummy_protocol):
+        p = dummy_protocol
+        plate = p.ref("plate", None, "96-flat", discard=True)
+        p.incubate(plate, "warm_37", "10:minute")
+        assert (p.as_dict()["instructions"][-1]["where"] == "warm_37")
+        p.instructions[-1].data["where"] = "cold_4"
+        assert (p.as_dict()["instructions"][-1]["where"] == "cold_4")
+        del p.instructions[-1].data["co2_percent"]
+        assert ("co2_percent" not in p.as_dict()["instructions"][-1])
+        p.instructions[-1].data["co2_percent"] = 5
+        assert (p.as_dict()["instructions"][-1]["co2_percent"] == 5)
+
+    def test_nested_data_edits(self, dummy_protocol):
+        p = dummy_protocol
+        src = p.ref("src", None, "96-flat", discard=True)
+        p.transfer(src.well(0), src.well(1), "5:microliter")
+        p.as_dict()
+        p.instructions[0].groups[0]["transfer"][0]["volume"] = \
+            Unit(6, "microliter")
+        groups = p.as_dict()["instructions"][0]["groups"]
+        assert (groups[0]["transfer"][0]["volume"] == "6.0:microliter")
+        assert (json.loads("".join(p.iterencode()))["instructions"][0][
+            "groups"] == groups)
+        out = io.StringIO()
+        p.dump(out)
+        assert (json.loads(out.getvalue())["instructions"][0]["groups"] ==
+                groups)
+        assert (p.instructions[0]._cacheable)
+        del p.instructions[0].groups[0]["transfer"][0]["to"]
+        assert ("to" not in
+                p.as_dict()["instructions"][0]["groups"][0]["transfer"][0])
+
+    def test_added_values_edited(self, dummy_protocol):
+        p = dummy_protocol
+        src = p.ref("src", None, "96-flat", discard=True)
+        src.all_wells().set_volume("100:microliter")
+        p.transfer(src.well(0), src.well(1), "5:microliter")
+        pipette = p.instructions[-1]
+        # Edits to a dict added to the data cannot be detected, so the
+        # instruction is no longer cached
+        group = {"transfer": [{"from": src.well(2), "to": src.well(3),
+                               "volume": Unit(5, "microliter")}]}
+        pipette.groups.append(group)
+        assert (len(p.as_dict()["instructions"][-1]["groups"]) == 2)
+        group["transfer"][0]["volume"] = Unit(7, "microliter")
+        assert (p.as_dict()["instructions"][-1]["groups"][1]["transfer"][0][
+            "volume"] == "7.0:microliter")
+        assert (not pipette._cacheable)
+        # As are instructions appended directly and ones holding WellGroups
+        groups = [{"mix": [{"well": src.well(4), "volume": "5:microliter"}]}]
+        p.append(Pipette(groups))
+        p.measure_volume(src.wells(0, 1), "volumes")
+        p.as_dict()
+        groups[0]["mix"][0]["volume"] = "6:microliter"
+        p.instructions[-1].object.append(src.well(2))
+        out = p.as_dict()["instructions"]
+        assert (out[-2]["groups"][0]["mix"][0]["volume"] == "6:microliter")
+        assert (out[-1]["object"] == ["src/0", "src/1", "src/2"])
+        # Replacing data
+        p.instructions[0].data = dict(p.instructions[0].data, op="changed")
+        assert (p.as_dict()["instructions"][0]["op"] == "changed")
+
+    def test_copied_instructions(self, dummy_protocol):
+        p = dummy_protocol
+        plate = p.ref("plate", None, "96-flat", discard=True)
+        p.incubate(plate, "warm_37", "10:minute")
+        p.as_dict()
+        # Edits to copies are not reported to them, so they are not cached
+        p.instructions[-1] = copy.copy(p.instructions[-1])
+        p.instructions.append(copy.deepcopy(p.instructions[-1]))
+        p.instructions[-2].data["where"] = "cold_4"
+        p.instructions[-1].data["where"] = "cold_20"
+        assert ([i["where"] for i in p.as_dict()["instructions"][-2:]] ==
+                ["cold_4", "cold_20"])
+
+    def test_invalidated_by_refs(self, dummy_protocol):
+        p = dummy_protocol
+        plate = Container(None, p.container_type("96-flat"))
+        p.cover(plate)
+        assert (p.as_dict()["instructions"][0]["object"] is None)
+        p.refs["plate"] = Ref("plate", {"discard": True}, plate)
+        assert (p.as_dict()["instructions"][0]["object"] == "plate")
+        # Renaming a ref leaves the number of refs unchanged
+        p.refs["renamed"] = p.refs.pop("plate")
+        assert (p.as_dict()["instructions"][0]["object"] == "renamed")
+        p.instructions = []
+        p.as_dict()
+        assert (p._refified == {})
+
+    def test_ref_replaced(self, dummy_protocol):
+        p = dummy_protocol
+        first = p.ref("first", None, "96-flat", discard=True)
+        second = Container(None, p.container_type("96-flat"))
+        p.cover(first)
+        p.cover(second)
+        out = p.as_dict()["instructions"]
+        assert ([i["object"] for i in out] == ["first", None])
+        # Replaces the ref with one for another container, keeping its name
+        p.refs["first"] = Ref("first", {"discard": True}, second)
+        out = p.as_dict()["instructions"]
+        assert ([i["object"] for i in out] == [None, "first"])
+        p.refs["first"].container = first
+        out = p.as_dict()["instructions"]
+        assert ([i["object"] for i in out] == ["first", None])
+
+    def test_streaming_does_not_cache(self, dummy_protocol):
+        p = dummy_protocol
+        plate = p.ref("plate", None, "96-flat", discard=True)
+        p.incubate(plate, "warm_37", "10:minute")
+        p.dump(io.StringIO())
+        assert (p._refified == {})
+        expected = json.dumps(p.as_dict(), separators=(",", ":"))
+        assert ("".join(p.iterencode()) == expected)
+        p.instructions[-1].data["where"] = "cold_4"
+        assert (json.loads("".join(p.iterencode()))["instructions"][-1][
+            "where"] == "cold_4")
+
+
+class TestLoad():
+
+    def make_protocol(self):
+        p = Protocol()
+        src = p.ref("src", None, "96-flat", discard=True)
+        pcr = p.ref("pcr", None, "96-pcr", storage="cold_4")
+        tube = p.ref("tube", "ct1xae8jabbe6", "micro-1.5", storage="cold_20")
+        src.all_wells().set_volume("100:microliter")
+        tube.well(0).set_volume("1000:microliter")
+        src.well(0).set_name("sample")
+        pcr.well(3).set_properties({"dilution": "1:10"})
+        p.transfer(src.wells_from(0, 8), pcr.wells_from(0, 8),
+                   "5:microliter", mix_after=True)
+        p.distribute(tube.well(0), src.wells_from(8, 4), "10:microliter")
+        p.seal(pcr)
+        p.thermocycle(pcr, [{"cycles": 1, "steps": [
+            {"temperature": "95:celsius", "duration": "1:minute"}]}])
+        p.absorbance(src, src.wells_from(0, 4), "600:nanometer", "src")
+        p.measure_mass([src, pcr], "mass")
+        p.add_time_constraint({"mark": src, "state": "start"},
+                              {"mark": 1, "state": "end"}, "5:minute")
+        return p
+
+    def test_from_dict(self):
+        doc = self.make_protocol().as_dict()
+        p = Protocol.from_dict(doc, container_types={"tube": "micro-1.5"})
+        assert (p.as_dict() == doc)
+        assert ([type(i) for i in p.instructions] ==
+                [Pipette, Seal, Thermocycle, Absorbance, MeasureMass])
+        src = p.refs["src"].container
+        transfer = p.instructions[0].groups[0]["transfer"][0]
+        assert (transfer["from"] is src.well(0))
+        assert (transfer["volume"] == Unit(5, "microliter"))
+        assert (p.instructions[0].groups[-1]["distribute"]["from"] is
+                p.refs["tube"].container.well(0))
+        assert (p.instructions[3].object is src)
+        assert (p.instructions[3].dataref == "src")
+        assert (p.instructions[4].object == [src, p.refs["pcr"].container])
+        assert (p.time_constraints[0]["from"]["ref_start"] is src)
+        assert (src.well(0).name == "sample")
+        assert (p.refs["pcr"].container.well(3).properties ==
+                {"dilution": "1:10"})
+        assert (p.refs["tube"].container.id == "ct1xae8jabbe6")
+        assert (p.refs["pcr"].container.storage == "cold_4")
+        with pytest.raises(RuntimeError):
+            Protocol.from_dict(doc)
+        with pytest.raises(RuntimeError):
+            Protocol.from_dict(doc, container_types={"tube": "nonexistent"})
+
+    def test_from_json(self):
+        doc = self.make_protocol().as_dict()
+        types = {"tube": "micro-1.5"}
+        out = io.StringIO()
+        self.make_protocol().dump(out, indent=2)
+        p = Protocol.from_json(out.getvalue(), container_types=types)
+        assert (p.as_dict() == doc)
+        # Refs ahead of the instructions are loaded before any instruction
+        data = json.dumps({"refs": doc["refs"],
+                           "instructions": doc["instructions"]})
+        p = Protocol.from_json(io.BytesIO(data.encode("utf-8")), types)
+        assert (p.as_dict()["instructions"] == doc["instructions"])
+        assert (isinstance(p.instructions[1], Seal))
+        with pytest.raises(ValueError):
+            Protocol.from_json(data[:-1], types)
+
+    def test_from_cbor(self):
+        p = self.make_protocol()
+        doc = p.as_dict()
+        data = p.as_cbor()
+        assert (json.dumps(cbor_loads(data)) == json.dumps(doc))
+        loaded = Protocol.from_cbor(data, {"tube": "micro-1.5"})
+        assert (loaded.as_dict() == doc)
+        assert (isinstance(loaded.instructions[0], Pipette))
+
+
 class TestInstructionIndex():
 
     def test_instruction_index(self, dummy_protocol):
@@ -1421,6 +1906,52 @@ class TestAcousticTransfer:
             p.instructions[-1].data["groups"][0]["transfer"][0]["from"] ==
             echo.well(0))
 
+    def test_one_source_exact_volumes(self, dummy_protocol):
+        p = dummy_protocol
+        echo = p.ref("echo", None, "384-echo", discard=True)
+        dest = p.ref("dest", None, "384-flat", discard=True)
+        p.acoustic_transfer(echo.wells(0, 1).set_volume("0.3:microliter"),
+                            dest.wells_from(0, 5), "0.1:microliter",
+                            one_source=True)
+        transfers = p.instructions[-1].data["groups"][0]["transfer"]
+        assert ([str(t["volume"]) for t in transfers] ==
+                ["100.0:nanoliter"] * 5)
+        assert (echo.well(0).volume == Unit(0, "microliter"))
+        assert (str(echo.well(1).volume) == "0.1:microliter")
+
+    def test_one_source_droplets(self, dummy_protocol):
+        p = dummy_protocol
+        echo = p.ref("echo", None, "384-echo", discard=True)
+        dest = p.ref("dest", None, "384-flat", discard=True)
+        # Only whole droplets are drawn from each source well
+        p.acoustic_transfer(echo.wells(0, 1).set_volume("30:nanoliter"),
+                            dest.well(0), "50:nanoliter", one_source=True)
+        transfers = p.instructions[-1].data["groups"][0]["transfer"]
+        assert ([str(t["volume"]) for t in transfers] ==
+                ["25.0:nanoliter"] * 2)
+        # Enough liquid in total, but not in whole droplets
+        with pytest.raises(RuntimeError):
+            p.acoustic_transfer(echo.wells(2, 3).set_volume("40:nanoliter"),
+                                dest.well(1), "75:nanoliter",
+                                one_source=True)
+
+    def test_unit_array_volumes(self, dummy_protocol):
+        p = dummy_protocol
+        echo = p.ref("echo", None, "384-echo", discard=True)
+        dest = p.ref("dest", None, "384-flat", discard=True)
+        p.acoustic_transfer(echo.wells(0, 1).set_volume("2:microliter"),
+                            dest.wells(0, 1),
+                            UnitArray([25, 50], "nanoliter"))
+        transfers = p.instructions[-1].data["groups"][0]["transfer"]
+        assert ([t["volume"] for t in transfers] ==
+                [Unit(0.025, "microliter"), Unit(0.05, "microliter")])
+        with pytest.raises(RuntimeError):
+            p.acoustic_transfer(echo.wells(0, 1), dest.wells(0, 1),
+                                UnitArray([25, 30], "nanoliter"))
+        with pytest.raises(RuntimeError):
+            p.acoustic_transfer(echo.wells(0, 1), dest.wells(0, 1),
+                                UnitArray([25, 25.0001], "nanoliter"))
+
     def test_droplet_size(self, dummy_protocol):
         p = dummy_protocol
         echo = p.ref("echo", None, "384-echo", discard=True)
@@ -1432,6 +1963,33 @@ class TestAcousticTransfer:
         with pytest.raises(RuntimeError):
             p.acoustic_transfer(echo.wells(0, 1).set_volume("2:microliter"),
                                 dest.wells(0, 1), "1.31:microliter")
+        # Not a multiple, although it rounds to one in picoliters
+        with pytest.raises(RuntimeError):
+            p.acoustic_transfer(echo.well(0), dest.well(0),
+                                "25.0001:nanoliter")
+        with pytest.raises(RuntimeError):
+            p.acoustic_transfer(echo.well(0), dest.well(0),
+                                "25.0000001:nanoliter")
+        for droplet_size in ["0.4:picoliter", "0:nanoliter",
+                             "2.5:picoliter"]:
+            with pytest.raises(ValueError):
+                p.acoustic_transfer(echo.well(0), dest.well(0),
+                                    "25:nanoliter", droplet_size=droplet_size)
+        p.acoustic_transfer(echo.well(0), dest.well(0), "0.075:microliter")
+        transfers = p.instructions[-1].data["groups"][0]["transfer"]
+        assert (str(transfers[-1]["volume"]) == "75.0:nanoliter")
+
+    def test_one_source_volume_strings(self, dummy_protocol):
+        p = dummy_protocol
+        echo = p.ref("echo", None, "384-echo", discard=True)
+        dest = p.ref("dest", None, "384-flat", discard=True)
+        source = echo.wells_from(0, 4).set_volume("0.35:microliter")
+        p.acoustic_transfer(source, dest.wells_from(0, 2), "0.6:microliter",
+                            one_source=True)
+        transfers = p.instructions[-1].data["groups"][0]["transfer"]
+        assert ([str(t["volume"]) for t in transfers] ==
+                ["350.0:nanoliter", "250.0:nanoliter", "100.0:nanoliter",
+                 "350.0:nanoliter", "150.0:nanoliter"])
 
 
 class TestMix():
@@ -174,3 +174,185 @@ class TestUnitMath:
         assert almost_equal(Unit(2 * 10 ** 18, 'attosecond').to('second'),
                             Unit(2, 'second'),
                             eps)
+
+
+class TestUnitCache:
+    def test_interned(self):
+        assert (Unit("10:microliter") is Unit("10:microliter"))
+        assert (Unit(10, "microliter") is Unit(10, "microliter"))
+        assert (Unit.fromstring("10:microliter") is Unit("10:microliter"))
+        assert (Unit(10, "microliter") is not Unit(10, "nanoliter"))
+        assert (str(Unit(10, "microliter")) == "10.0:microliter")
+
+    def test_immutable(self):
+        u = Unit("15:microliter")
+        with pytest.raises(AttributeError):
+            u._magnitude = 20
+        with pytest.raises(AttributeError):
+            u.ito("nanoliter")
+        assert (Unit("15:microliter") == Unit(15, "microliter"))
+        # Derived Units are new objects and are not interned
+        v = u + Unit(5, "microliter")
+        v._magnitude = 25
+        assert (v == Unit(25, "microliter"))
+
+    def test_errors_not_cached(self):
+        from autoprotocol.unit import UnitStringError, UnitValueError
+        for _ in range(2):
+            with pytest.raises(UnitStringError):
+                Unit("10microliter")
+            with pytest.raises(UnitValueError):
+                Unit("ten:microliter")
+
+    def test_negative_zero(self):
+        assert (str(Unit(-0.0, "microliter")) == "-0.0:microliter")
+        assert (str(Unit(0, "microliter")) == "0.0:microliter")
+
+    def test_cached_str(self):
+        from autoprotocol.unit import _UNIT_STR_CACHE
+        u = Unit(10, "microliter")
+        assert (str(u) == "10.0:microliter")
+        assert (str(u) is str(u))
+        derived = u + Unit(5, "microliter")
+        assert (str(derived) == "15.0:microliter")
+        assert ((float, 15.0, derived._units) in _UNIT_STR_CACHE)
+        # Mutating a derived Unit must not return a stale string
+        derived._magnitude = 20.0
+        assert (str(derived) == "20.0:microliter")
+        assert (str(Unit(2, "meter/second**2")) == "2.0:meter/second^2")
+
+    def test_lru_eviction(self):
+        from autoprotocol.unit import _LRUCache
+        cache = _LRUCache(2)
+        cache["a"] = 1
+        cache["b"] = 2
+        assert (cache.get("a") == 1)
+        cache["c"] = 3
+        assert ("b" not in cache)
+        assert ("a" in cache and "c" in cache)
+        assert (len(cache) == 2)
+        disabled = _LRUCache(0)
+        disabled["a"] = 1
+        assert (disabled.get("a") is None)
+
+
+class TestFixedPointVolume:
+    def test_volume_to_pl(self):
+        from autoprotocol.unit import _volume_to_pl
+        assert (_volume_to_pl("1:microliter") == 10 ** 6)
+        assert (_volume_to_pl("25:nanoliter") == 25000)
+        assert (_volume_to_pl(Unit(0.1, "milliliter")) == 10 ** 8)
+        assert (_volume_to_pl("0.3:microliter") == 300000)
+
+    def test_pl_to_volume(self):
+        from autoprotocol.unit import _pl_to_volume
+        assert (_pl_to_volume(300000) == Unit(0.3, "microliter"))
+        assert (str(_pl_to_volume(25000)) == "0.025:microliter")
+
+
+class TestConversionFactors:
+    def test_common_conversions(self):
+        assert (str(Unit(1, "milliliter").to("microliter")) ==
+                "1000.0:microliter")
+        assert (Unit(1, "microliter").to("nanoliter").magnitude ==
+                pytest.approx(1000))
+        assert (Unit(2, "hour").to("minute") == Unit(120, "minute"))
+        assert (Unit(20, "microliter/second").to("milliliter/second")
+                .magnitude == pytest.approx(0.02))
+        assert (Unit(1, "standard_gravity").to("meter/second**2")
+                .magnitude == pytest.approx(9.80665))
+        assert (Unit(5, "milliliter") > Unit(900, "microliter"))
+        assert (Unit(1, "microliter") + Unit(1, "milliliter") ==
+                Unit(1001, "microliter"))
+
+    def test_fallback_to_pint(self):
+        from autoprotocol.unit import _conversion_factor, _units_container
+        celsius = _units_container("celsius")
+        kelvin = _units_container("kelvin")
+        assert (_conversion_factor(celsius, kelvin) is None)
+        assert (Unit(20, "celsius").to("kelvin") == Unit(293.15, "kelvin"))
+        assert (_conversion_factor(_units_container("microliter"),
+                                   _units_container("second")) is None)
+        with pytest.raises(Exception):
+            Unit(1, "microliter").to("second")
+
+
+class TestUnitArray:
+    def test_construction(self):
+        from autoprotocol.unit import UnitArray
+        volumes = UnitArray(["5:microliter", "0.01:milliliter"])
+        assert (volumes.unit == "microliter")
+        assert (list(volumes.magnitudes) == [5, 10])
+        assert (volumes[1] == Unit(10, "microliter"))
+        assert (list(volumes) == [Unit(5, "microliter"),
+                                  Unit(10, "microliter")])
+        assert (volumes[1:] == UnitArray([10], "microliter"))
+        assert (UnitArray(volumes, "milliliter").unit == "milliliter")
+        with pytest.raises(ValueError):
+            UnitArray([5, 10])
+
+    def test_vectorized_operations(self):
+        from autoprotocol.unit import UnitArray
+        volumes = UnitArray([0.005, 0.01, 0.015], "milliliter")
+        assert (volumes.to("microliter") ==
+                UnitArray([5, 10, 15], "microliter"))
+        assert (volumes.sum() == Unit(0.03, "milliliter"))
+        assert ((volumes < "12:microliter") == [True, True, False])
+        assert ((volumes >= UnitArray([4, 20, 10], "microliter")) ==
+                [True, False, True])
+        remainders = UnitArray([5, 10, 15], "microliter") % "4:microliter"
+        assert (remainders == UnitArray([1, 2, 3], "microliter"))
+        assert (volumes._picoliters() == [5000000, 10000000, 15000000])
+        with pytest.raises(ValueError):
+            volumes < UnitArray([1], "microliter")
+
+    def test_bulk_volumes(self):
+        from autoprotocol.unit import UnitArray, _UNIT_CACHE
+        volumes = UnitArray([0.025, 0.0250001, 0.075, 0.025], "microliter")
+        assert (volumes._exact_picoliters() == [25000, None, 75000, 25000])
+        # Equal elements share one immutable Unit, which is not interned
+        _UNIT_CACHE.clear()
+        elements = volumes._elements()
+        list(volumes)
+        volumes[2]
+        assert (len(_UNIT_CACHE) == 0)
+        assert (elements[0] is elements[3])
+        assert (elements == [Unit(0.025, "microliter"),
+                             Unit(0.0250001, "microliter"),
+                             Unit(0.075, "microliter"),
+                             Unit(0.025, "microliter")])
+        with pytest.raises(AttributeError):
+            elements[0]._magnitude = 1
+
+
+class TestLazyRegistry:
+    def test_import_does_not_build_registry(self):
+        # Run in a fresh interpreter as the test session has already built
+        # the registry
+        import subprocess
+        import sys
+        code = ("import autoprotocol, autoprotocol.harness\n"
+                "from autoprotocol import unit\n"
+                "assert unit._UnitRegistry is None\n"
+                "assert str(unit.Unit(1, 'microliter')) == '1.0:microliter'\n"
+                "assert unit._UnitRegistry is not None\n")
+        subprocess.check_call([sys.executable, "-c", code])
+
+    def test_container_types_loaded_on_access(self):
+        from autoprotocol.container_type import _CONTAINER_TYPES
+        assert ("96-flat" in _CONTAINER_TYPES)
+        assert (_CONTAINER_TYPES["96-flat"].well_volume_ul ==
+                Unit(340, "microliter"))
+        assert (len(_CONTAINER_TYPES) == len(list(_CONTAINER_TYPES.keys())))
+
+    def test_container_types_registration(self, monkeypatch):
+        from autoprotocol.container_type import _CONTAINER_TYPES
+        from autoprotocol.protocol import Protocol
+        p = Protocol()
+        with pytest.raises(ValueError) as e:
+            p.container_type("custom-flat")
+        assert ("384-flat, 384-flat-clear-clear" in str(e.value))
+        monkeypatch.setitem(_CONTAINER_TYPES, "custom-flat",
+                            _CONTAINER_TYPES["96-flat"])
+        assert (p.container_type("custom-flat") is
+                _CONTAINER_TYPES["96-flat"])